@@ -0,0 +1,582 @@
+"""
+Vectorized Bar Engine for Module 1
+
+Batch-oriented replacement for the per-tick MinuteBarAgg / TickBarAgg loops of
+the streaming ingestors. A whole batch of ticks (int64 ts in ns, float64
+bid/ask) is split into bar segments and reduced with NumPy segment reductions.
+The open (partial) bar of every frame is carried across batch boundaries, so
+the emitted bars are identical to feeding the same ticks one by one.
+
+Any list of time / tick frames, information-driven frames (volume, dollar,
+tick-imbalance and tick-run bars) and price-driven frames (range and Renko
+bars, sized in pips), see ``bar_kernels``, can be built in the same scan.
+Volume comes from an optional per-tick volume array and is reported as
+v_sum; without it every tick counts as one unit for the volume and dollar
+frames and v_sum stays 0. Two interchangeable engines are available (config
+key ``engine``): ``numpy`` (default) reduces segments with
+``ufunc.reduceat``; ``numba`` runs the compiled multi-frame kernel in
+``bar_kernels`` which writes finished bars directly into column buffers.
+"""
+
+from __future__ import annotations
+import re
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from .schema import BAR_SCHEMA, TICKS_SLICE_SCHEMA
+from . import bar_kernels as K
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+ENGINES = ("numpy", "numba")
+
+DEFAULT_BAR_FRAMES = [
+    {"type": "time", "unit": "1m"},
+    {"type": "tick", "count": 100},
+    {"type": "tick", "count": 1000},
+]
+
+_UNIT_NS = {"s": 1_000_000_000, "m": NS_PER_MINUTE, "h": 60 * NS_PER_MINUTE, "d": 1440 * NS_PER_MINUTE}
+
+# Information-driven frame types: kind, frame name suffix, config key of the size parameter
+_INFO_TYPES = {
+    "volume": (K.KIND_VOLUME, "vol", "threshold"),
+    "dollar": (K.KIND_DOLLAR, "dol", "threshold"),
+    "tick_imbalance": (K.KIND_TICK_IMBALANCE, "tib", "expected_ticks"),
+    "tick_run": (K.KIND_TICK_RUN, "trb", "expected_ticks"),
+}
+DEFAULT_EWMA_SPAN = 20
+# Price-driven frame types: kind, frame name suffix; the size is given in pips
+_PRICE_TYPES = {
+    "range": (K.KIND_RANGE, "rng"),
+    "renko": (K.KIND_RENKO, "rnk"),
+}
+DEFAULT_PIP_SIZE = 0.0001
+
+# Per-bar partial state; a carried bar is a dict of length-1 arrays with these keys
+_STATE_KEYS = (
+    "t_open_ns", "t_close_ns", "o", "h", "l", "c",
+    "o_bid", "o_ask", "c_bid", "c_ask", "spread_sum", "v_sum", "n",
+    "tick_first_id", "tick_last_id",
+)
+_INT_STATE_KEYS = ("t_open_ns", "t_close_ns", "n", "tick_first_id", "tick_last_id")
+# Kernel state slots of the same keys
+_ISTATE_SLOTS = {"n": K.S_N, "t_open_ns": K.S_OPEN, "t_close_ns": K.S_CLOSE,
+                 "tick_first_id": K.S_FIRST, "tick_last_id": K.S_LAST}
+_FSTATE_SLOTS = {"o": K.S_O, "h": K.S_H, "l": K.S_L, "c": K.S_C, "o_bid": K.S_OBID, "o_ask": K.S_OASK,
+                 "c_bid": K.S_CBID, "c_ask": K.S_CASK, "spread_sum": K.S_SPREAD, "v_sum": K.S_VSUM}
+# Information-driven state that outlives a bar (bar_kernels xstate slots)
+_XSTATE_SLOTS = {"cum": K.X_CUM, "down": K.X_DOWN, "n": K.X_N, "expected_ticks": K.X_ET,
+                 "expected_imbalance": K.X_EB, "last_price": K.X_LASTPX, "last_sign": K.X_LASTB,
+                 "low": K.X_LO, "high": K.X_HI, "base": K.X_BASE}
+
+
+def timestamps_to_ns(arr) -> np.ndarray:
+    """Convert an Arrow timestamp (any unit / tz) or int64 array to int64 ns."""
+    if isinstance(arr, pa.ChunkedArray):
+        arr = arr.combine_chunks()
+    if pa.types.is_timestamp(arr.type):
+        if arr.type.unit != "ns":
+            arr = pc.cast(arr, pa.timestamp("ns", tz=arr.type.tz))
+        arr = arr.cast(pa.int64())
+    return arr.to_numpy(zero_copy_only=False).astype(np.int64, copy=False)
+
+
+def _number_name(x: float) -> str:
+    return str(int(x)) if float(x).is_integer() else f"{x:g}"
+
+
+def parse_bar_frames(bar_frames: List[Dict[str, Any]],
+                     pip_size: float = DEFAULT_PIP_SIZE) -> List[Tuple[str, int, Any]]:
+    """
+    Turn config bar_frames into (frame_name, kind, param) specs.
+
+    Time frames take a unit like "30s", "1m", "15m", "1h" (param = period in
+    ns, name = unit); tick frames take a count (param = count, name = "<N>t").
+    Volume and dollar frames take a threshold ("<X>vol", "<X>dol"),
+    tick_imbalance and tick_run frames an expected_ticks and optional
+    ewma_span ("<E>tib", "<E>trb"); their param is (threshold, EWMA alpha).
+    Range and renko frames take a size in pips ("<P>rng", "<P>rnk"), converted
+    with pip_size (or the frame's own pip_size, "_p<pip>" in the name) to
+    param (size, 0.0).
+    Duplicates are dropped, invalid entries raise ValueError.
+    """
+    specs: List[Tuple[str, int, Any]] = []
+    seen = set()
+    for frame in bar_frames:
+        ftype = frame.get("type")
+        if ftype == "time":
+            unit = str(frame.get("unit", ""))
+            m = re.fullmatch(r"(\d+)([smhd])", unit)
+            if not m or int(m.group(1)) <= 0:
+                raise ValueError(f"Invalid time frame unit: {unit!r}")
+            spec = (unit, K.KIND_TIME, int(m.group(1)) * _UNIT_NS[m.group(2)])
+        elif ftype == "tick":
+            count = int(frame.get("count", 0))
+            if count <= 0:
+                raise ValueError(f"Invalid tick frame count: {count}")
+            spec = (f"{count}t", K.KIND_TICK, count)
+        elif ftype in _INFO_TYPES:
+            kind, suffix, key = _INFO_TYPES[ftype]
+            size = float(frame.get(key, 0))
+            span = int(frame.get("ewma_span", DEFAULT_EWMA_SPAN))
+            if size <= 0 or span <= 0:
+                raise ValueError(f"Invalid {ftype} frame: {key}={frame.get(key)!r}, ewma_span={span}")
+            name = f"{_number_name(size)}{suffix}"
+            if span != DEFAULT_EWMA_SPAN and kind in (K.KIND_TICK_IMBALANCE, K.KIND_TICK_RUN):
+                name += f"_s{span}"
+            spec = (name, kind, (size, 2.0 / (span + 1)))
+        elif ftype in _PRICE_TYPES:
+            kind, suffix = _PRICE_TYPES[ftype]
+            pips = float(frame.get("pips", 0))
+            pip = float(frame.get("pip_size", pip_size))
+            if pips <= 0 or pip <= 0:
+                raise ValueError(f"Invalid {ftype} frame: pips={frame.get('pips')!r}, pip_size={pip}")
+            name = f"{_number_name(pips)}{suffix}"
+            if pip != pip_size:
+                name += f"_p{_number_name(pip)}"
+            spec = (name, kind, (pips * pip, 0.0))
+        else:
+            raise ValueError(f"Unknown bar frame type: {ftype!r}")
+        if spec[0] not in seen:
+            seen.add(spec[0])
+            specs.append(spec)
+    return specs
+
+
+def _reduce_segments(starts: np.ndarray, ts: np.ndarray, bid: np.ndarray,
+                     ask: np.ndarray, price: np.ndarray, spread: np.ndarray,
+                     first_tick_id: int, volume: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Reduce consecutive tick segments (given by their start offsets) to bar state."""
+    n = len(ts)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    ends[-1] = n - 1
+    return {
+        "t_open_ns": ts[starts], "t_close_ns": ts[ends],
+        "o": price[starts], "h": np.maximum.reduceat(price, starts),
+        "l": np.minimum.reduceat(price, starts), "c": price[ends],
+        "o_bid": bid[starts], "o_ask": ask[starts],
+        "c_bid": bid[ends], "c_ask": ask[ends],
+        "spread_sum": np.add.reduceat(spread, starts),
+        "v_sum": np.zeros(len(starts)) if volume is None else np.add.reduceat(volume.astype(np.float64), starts),
+        "n": (ends - starts + 1).astype(np.int64),
+        "tick_first_id": first_tick_id + starts.astype(np.int64),
+        "tick_last_id": first_tick_id + ends.astype(np.int64),
+    }
+
+
+def _merge_carry(carry: Dict[str, np.ndarray], seg: Dict[str, np.ndarray]) -> None:
+    """Fold a carried partial bar into the first segment of a batch (in place)."""
+    for key in ("t_open_ns", "o", "o_bid", "o_ask", "tick_first_id"):
+        seg[key][0] = carry[key][0]
+    seg["h"][0] = max(seg["h"][0], carry["h"][0])
+    seg["l"][0] = min(seg["l"][0], carry["l"][0])
+    seg["spread_sum"][0] += carry["spread_sum"][0]
+    seg["v_sum"][0] += carry["v_sum"][0]
+    seg["n"][0] += carry["n"][0]
+
+
+def bars_to_table(state: Dict[str, np.ndarray], symbol: str, frame: str,
+                  sl: slice = slice(None)) -> pa.Table:
+    """Build a BAR_SCHEMA table from reduced bar state without per-bar dicts."""
+    n = state["n"][sl]
+    k = len(n)
+    return pa.Table.from_arrays([
+        pa.repeat(pa.scalar(symbol, pa.string()), k),
+        pa.repeat(pa.scalar(frame, pa.string()), k),
+        pa.array(state["t_open_ns"][sl], pa.int64()), pa.array(state["t_close_ns"][sl], pa.int64()),
+        pa.array(state["o"][sl]), pa.array(state["h"][sl]),
+        pa.array(state["l"][sl]), pa.array(state["c"][sl]),
+        pa.array(state["o_bid"][sl]), pa.array(state["o_ask"][sl]),
+        pa.array(state["c_bid"][sl]), pa.array(state["c_ask"][sl]),
+        pa.array(state["spread_sum"][sl] / n),
+        pa.array(n.astype(np.int32)),
+        pa.array(state["v_sum"][sl], pa.float64()),
+        pa.array(state["tick_first_id"][sl], pa.int64()), pa.array(state["tick_last_id"][sl], pa.int64()),
+        pa.array(np.zeros(k, dtype=np.int32)),
+    ], schema=BAR_SCHEMA)
+
+
+class _SegmentBarAgg:
+    """Common carry/emit logic; subclasses only decide where bars start."""
+
+    def __init__(self, symbol: str, frame: str):
+        self.symbol = symbol; self.frame = frame
+        self.carry: Optional[Dict[str, np.ndarray]] = None
+
+    def _segment_starts(self, ts: np.ndarray, first_tick_id: int, price: np.ndarray,
+                        volume: Optional[np.ndarray]) -> Tuple[np.ndarray, bool]:
+        """Return segment start offsets and whether segment 0 continues the carry."""
+        raise NotImplementedError
+
+    def _last_complete(self, state: Dict[str, np.ndarray]) -> bool:
+        return False
+
+    def add_batch(self, ts: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+                  first_tick_id: int, price: Optional[np.ndarray] = None,
+                  spread: Optional[np.ndarray] = None,
+                  volume: Optional[np.ndarray] = None) -> Optional[pa.Table]:
+        if len(ts) == 0:
+            return None
+        if price is None: price = (bid + ask) * 0.5
+        if spread is None: spread = ask - bid
+        starts, continues = self._segment_starts(ts, first_tick_id, price, volume)
+        state = _reduce_segments(starts, ts, bid, ask, price, spread, first_tick_id, volume)
+        if continues:
+            _merge_carry(self.carry, state)
+        elif self.carry is not None:
+            # Carried bar is closed by this batch; emit it ahead of the new bars
+            state = {k: np.concatenate([self.carry[k], state[k]]) for k in _STATE_KEYS}
+        if self._last_complete(state):
+            self.carry = None
+            done = slice(None)
+        else:
+            self.carry = {k: state[k][-1:].copy() for k in _STATE_KEYS}
+            done = slice(0, len(state["n"]) - 1)
+        if done.stop == 0:
+            return None
+        return bars_to_table(state, self.symbol, self.frame, done)
+
+    def finish(self) -> Optional[pa.Table]:
+        """Emit the open partial bar (end of input)."""
+        if self.carry is None:
+            return None
+        table = bars_to_table(self.carry, self.symbol, self.frame)
+        self.carry = None
+        return table
+
+
+class VecTimeBarAgg(_SegmentBarAgg):
+    """Left-closed time bars; a new bar starts whenever the time bucket changes."""
+
+    def __init__(self, symbol: str, frame: str = "1m", period_ns: int = NS_PER_MINUTE):
+        super().__init__(symbol, frame)
+        self.period_ns = int(period_ns)
+
+    def _segment_starts(self, ts, first_tick_id, price, volume):
+        bucket = ts // self.period_ns
+        starts = np.concatenate(([0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1))
+        continues = (self.carry is not None
+                     and bucket[0] == self.carry["t_open_ns"][0] // self.period_ns)
+        return starts, continues
+
+
+class VecTickBarAgg(_SegmentBarAgg):
+    """
+    Fixed tick-count bars of N ticks; remainders carry into the next batch.
+
+    Bars are aligned to the global tick id (bar = tick_id // N), so a stream
+    that starts at a tick id inside a bar opens with a short head bar that
+    completes the bar of an earlier stream (see batch_ingest).
+    """
+
+    def __init__(self, symbol: str, N: int, frame: Optional[str] = None):
+        super().__init__(symbol, frame or f"{N}t")
+        self.N = int(N)
+
+    def _segment_starts(self, ts, first_tick_id, price, volume):
+        first_len = self.N - first_tick_id % self.N
+        starts = np.concatenate(([0], np.arange(first_len, len(ts), self.N)))
+        return starts, self.carry is not None
+
+    def _last_complete(self, state):
+        return (int(state["tick_last_id"][-1]) + 1) % self.N == 0
+
+
+class _InfoBarAgg(_SegmentBarAgg):
+    """
+    Information-driven bars (bar_kernels.info_tick); a bar closes at a tick.
+
+    The state that outlives a bar is kept in the kernel's xstate layout, so
+    both engines share one definition and snapshot format.
+    """
+
+    def __init__(self, symbol: str, frame: str, kind: int, threshold: float, alpha: float):
+        super().__init__(symbol, frame)
+        self.kind = kind
+        self.threshold = float(threshold); self.alpha = float(alpha)
+        self.xstate = K.new_xstate(np.array([kind]), np.array([[self.threshold, self.alpha]]))
+        self._closed_last = False
+
+    def _closes(self, price: np.ndarray, volume: Optional[np.ndarray]) -> np.ndarray:
+        raise NotImplementedError
+
+    def _segment_starts(self, ts, first_tick_id, price, volume):
+        closes = self._closes(price, volume)
+        self._closed_last = len(closes) > 0 and closes[-1] == len(ts) - 1
+        starts = np.concatenate(([0], closes[closes < len(ts) - 1] + 1))
+        return starts, self.carry is not None
+
+    def _last_complete(self, state):
+        return self._closed_last
+
+
+class VecVolumeBarAgg(_InfoBarAgg):
+    """Volume or dollar bars: cumulative sums instead of a per-tick loop."""
+
+    def _closes(self, price, volume):
+        amount = np.ones(len(price)) if volume is None else volume.astype(np.float64)
+        if self.kind == K.KIND_DOLLAR:
+            amount = amount * price
+        # Same sequential additions as info_tick, starting from the carried total
+        cum = np.cumsum(np.concatenate(([self.xstate[0, K.X_CUM]], amount)))
+        self.xstate[0, K.X_CUM] = cum[-1]
+        bucket = np.floor(cum / self.threshold)
+        return np.flatnonzero(bucket[1:] > bucket[:-1])
+
+
+class VecImbalanceBarAgg(_InfoBarAgg):
+    """Tick-imbalance and tick-run bars; the adaptive threshold needs a sequential scan."""
+
+    def _closes(self, price, volume):
+        return K.info_closes(self.xstate, 0, self.kind, self.threshold, self.alpha,
+                             np.ascontiguousarray(price, dtype=np.float64), np.ones(len(price)))
+
+
+class VecPriceBarAgg(VecImbalanceBarAgg):
+    """Range and Renko bars; each close depends on the prices since the previous one."""
+
+
+class _NumbaMultiFrame:
+    """All frames in one compiled scan; open bars live in K.new_state() arrays."""
+
+    def __init__(self, symbol: str, specs: List[Tuple[str, int, Any]], basis: str,
+                 buffer_bars: int):
+        self.symbol = symbol
+        self.names = [name for name, _, _ in specs]
+        self.kinds = np.array([kind for _, kind, _ in specs], dtype=np.int64)
+        info = [kind in K.INFO_KINDS for _, kind, _ in specs]
+        self.params = np.array([0 if i else param for i, (_, _, param) in zip(info, specs)], dtype=np.int64)
+        self.fparams = np.array([param if i else (0.0, 0.0) for i, (_, _, param) in zip(info, specs)],
+                                dtype=np.float64).reshape(len(specs), 2)
+        self.basis = K.BASIS_CODES[basis]
+        self.buffer_bars = int(buffer_bars)
+        self.istate, self.fstate = K.new_state(len(specs))
+        self.xstate = K.new_xstate(self.kinds, self.fparams)
+
+    def _tables(self, out_i, out_f, counts, out: Dict[str, List[pa.Table]]):
+        for f, name in enumerate(self.names):
+            k = int(counts[f])
+            if k == 0:
+                continue
+            bi, bf = out_i[f], out_f[f]
+            state = {
+                "t_open_ns": bi[K.O_OPEN, :k], "t_close_ns": bi[K.O_CLOSE, :k],
+                "n": bi[K.O_N, :k],
+                "tick_first_id": bi[K.O_FIRST, :k], "tick_last_id": bi[K.O_LAST, :k],
+                "o": bf[K.S_O, :k], "h": bf[K.S_H, :k], "l": bf[K.S_L, :k], "c": bf[K.S_C, :k],
+                "o_bid": bf[K.S_OBID, :k], "o_ask": bf[K.S_OASK, :k],
+                "c_bid": bf[K.S_CBID, :k], "c_ask": bf[K.S_CASK, :k],
+                "spread_sum": bf[K.S_SPREAD, :k], "v_sum": bf[K.S_VSUM, :k],
+            }
+            out.setdefault(name, []).append(bars_to_table(state, self.symbol, name))
+
+    def add_batch(self, ts, bid, ask, first_tick_id, volume=None) -> Dict[str, pa.Table]:
+        out: Dict[str, List[pa.Table]] = {}
+        vol = np.zeros(len(ts)) if volume is None else np.ascontiguousarray(volume, dtype=np.float64)
+        pos = 0
+        while pos < len(ts):
+            out_i, out_f = K.new_buffers(len(self.names), self.buffer_bars)
+            counts = np.zeros(len(self.names), dtype=np.int64)
+            pos = K.multi_frame_kernel(ts, bid, ask, vol, volume is None, pos, first_tick_id, self.basis,
+                                       self.kinds, self.params, self.fparams, self.istate, self.fstate,
+                                       self.xstate, out_i, out_f, counts)
+            self._tables(out_i, out_f, counts, out)
+        return {name: _concat(tables) for name, tables in out.items()}
+
+    def open_bars(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        bars = {}
+        for f, name in enumerate(self.names):
+            bars[name] = None
+            if self.istate[f, K.S_N] > 0:
+                bars[name] = {key: int(self.istate[f, slot]) for key, slot in _ISTATE_SLOTS.items()}
+                bars[name].update({key: float(self.fstate[f, slot]) for key, slot in _FSTATE_SLOTS.items()})
+        return bars
+
+    def frame_state(self) -> Dict[str, Dict[str, float]]:
+        return {name: {key: float(self.xstate[f, slot]) for key, slot in _XSTATE_SLOTS.items()}
+                for f, name in enumerate(self.names) if self.kinds[f] in K.INFO_KINDS}
+
+    def restore(self, open_bars: Dict[str, Optional[Dict[str, Any]]],
+                frame_state: Dict[str, Dict[str, float]]):
+        self.istate, self.fstate = K.new_state(len(self.names))
+        self.xstate = K.new_xstate(self.kinds, self.fparams)
+        for f, name in enumerate(self.names):
+            for key, slot in _XSTATE_SLOTS.items():
+                if name in frame_state:
+                    self.xstate[f, slot] = frame_state[name].get(key, self.xstate[f, slot])
+            bar = open_bars.get(name)
+            if bar is None:
+                continue
+            for key, slot in _ISTATE_SLOTS.items():
+                self.istate[f, slot] = bar[key]
+            for key, slot in _FSTATE_SLOTS.items():
+                self.fstate[f, slot] = bar.get(key, 0.0)
+            # Bucket bounds as set by the kernel when the bar opened
+            p = int(self.params[f])
+            if self.kinds[f] == K.KIND_TIME:
+                self.istate[f, K.S_BSTART] = bar["t_open_ns"] // p * p
+                self.istate[f, K.S_BEND] = self.istate[f, K.S_BSTART] + p
+            elif self.kinds[f] == K.KIND_TICK:
+                self.istate[f, K.S_BEND] = (bar["tick_first_id"] // p + 1) * p
+
+    def finish(self) -> Dict[str, pa.Table]:
+        out: Dict[str, List[pa.Table]] = {}
+        out_i, out_f = K.new_buffers(len(self.names), 1)
+        counts = np.zeros(len(self.names), dtype=np.int64)
+        K.flush_kernel(self.istate, self.fstate, out_i, out_f, counts)
+        self._tables(out_i, out_f, counts, out)
+        return {name: _concat(tables) for name, tables in out.items()}
+
+
+def _concat(tables: List[pa.Table]) -> pa.Table:
+    return tables[0] if len(tables) == 1 else pa.concat_tables(tables)
+
+
+class BarEngine:
+    """
+    Builds any number of bar frames from the same tick batches.
+
+    bar_frames uses the config format of the ingest modules, e.g.
+    [{"type": "time", "unit": "5m"}, {"type": "tick", "count": 250},
+     {"type": "dollar", "threshold": 5e6}, {"type": "tick_imbalance", "expected_ticks": 200},
+     {"type": "range", "pips": 10}, {"type": "renko", "pips": 5}].
+    With engine="numba" all frames are updated in a single compiled scan;
+    with engine="numpy" each frame is a few vectorized reductions over the
+    shared price/spread arrays. first_tick_id numbers the first tick (for a
+    stream that continues an earlier one); pip_size converts the pips of
+    range and renko frames to price units.
+    """
+
+    def __init__(self, symbol: str, bar_frames: Optional[List[Dict[str, Any]]] = None,
+                 engine: str = "numpy", price_basis: str = "mid",
+                 buffer_bars: int = 8192, first_tick_id: int = 0, pip_size: float = DEFAULT_PIP_SIZE):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown bar engine: {engine} (expected one of {ENGINES})")
+        if price_basis not in K.BASIS_CODES:
+            raise ValueError(f"Unknown basis: {price_basis}")
+        self.symbol = symbol
+        self.engine = engine
+        self.price_basis = price_basis
+        specs = parse_bar_frames(DEFAULT_BAR_FRAMES if bar_frames is None else bar_frames, pip_size)
+        self.frames = [name for name, _, _ in specs]
+        self.next_tick_id = int(first_tick_id)
+        self.aggregators: Dict[str, _SegmentBarAgg] = {}
+        self._kernel: Optional[_NumbaMultiFrame] = None
+        if engine == "numba":
+            self._kernel = _NumbaMultiFrame(symbol, specs, price_basis, buffer_bars)
+        else:
+            for name, kind, param in specs:
+                if kind == K.KIND_TIME:
+                    self.aggregators[name] = VecTimeBarAgg(symbol, name, param)
+                elif kind == K.KIND_TICK:
+                    self.aggregators[name] = VecTickBarAgg(symbol, param, name)
+                elif kind in (K.KIND_VOLUME, K.KIND_DOLLAR):
+                    self.aggregators[name] = VecVolumeBarAgg(symbol, name, kind, *param)
+                elif kind in (K.KIND_RANGE, K.KIND_RENKO):
+                    self.aggregators[name] = VecPriceBarAgg(symbol, name, kind, *param)
+                else:
+                    self.aggregators[name] = VecImbalanceBarAgg(symbol, name, kind, *param)
+
+    @classmethod
+    def default(cls, symbol: str, engine: str = "numpy") -> "BarEngine":
+        """Frames produced by the streaming ingestors: 1m, 100t and 1000t."""
+        return cls(symbol, DEFAULT_BAR_FRAMES, engine)
+
+    def _price(self, bid: np.ndarray, ask: np.ndarray) -> np.ndarray:
+        if self.price_basis == "bid":
+            return bid
+        if self.price_basis == "ask":
+            return ask
+        return (bid + ask) * 0.5
+
+    def add_batch(self, ts: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+                  volume: Optional[np.ndarray] = None) -> Dict[str, pa.Table]:
+        """Aggregate one batch; returns the bars completed per frame."""
+        first_tick_id = self.next_tick_id
+        self.next_tick_id += len(ts)
+        if self._kernel is not None:
+            return self._kernel.add_batch(ts, bid, ask, first_tick_id, volume)
+        price = self._price(bid, ask)
+        spread = ask - bid
+        out = {}
+        for frame, agg in self.aggregators.items():
+            table = agg.add_batch(ts, bid, ask, first_tick_id, price, spread, volume)
+            if table is not None:
+                out[frame] = table
+        return out
+
+    def add_record_batch(self, batch: pa.RecordBatch, ts_col: str = "timestamp",
+                         bid_col: str = "bid", ask_col: str = "ask",
+                         volume_col: str = "volume") -> Dict[str, pa.Table]:
+        ts = timestamps_to_ns(batch.column(ts_col))
+        bid = batch.column(bid_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        ask = batch.column(ask_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        volume = None
+        if volume_col in batch.schema.names:
+            volume = batch.column(volume_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        return self.add_batch(ts, bid, ask, volume)
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        JSON-serializable aggregation state: the next tick id, the open
+        (partial) bar of every frame and the running state of the
+        information-driven frames. Engine-independent, so a state saved by
+        the numpy engine can be restored into the numba engine and vice versa.
+        """
+        if self._kernel is not None:
+            open_bars = self._kernel.open_bars()
+            frame_state = self._kernel.frame_state()
+        else:
+            open_bars = {
+                frame: None if agg.carry is None else {
+                    key: (int if key in _INT_STATE_KEYS else float)(agg.carry[key][0]) for key in _STATE_KEYS}
+                for frame, agg in self.aggregators.items()
+            }
+            frame_state = {
+                frame: {key: float(agg.xstate[0, slot]) for key, slot in _XSTATE_SLOTS.items()}
+                for frame, agg in self.aggregators.items() if isinstance(agg, _InfoBarAgg)
+            }
+        return {"next_tick_id": self.next_tick_id, "open_bars": open_bars, "frame_state": frame_state}
+
+    def set_state(self, state: Dict[str, Any]) -> "BarEngine":
+        """Continue from a get_state() snapshot (frames must match)."""
+        open_bars = state["open_bars"]
+        if set(open_bars) != set(self.frames):
+            raise ValueError(f"Bar engine state has frames {sorted(open_bars)}, engine has {sorted(self.frames)}")
+        self.next_tick_id = int(state["next_tick_id"])
+        frame_state = state.get("frame_state", {})
+        if self._kernel is not None:
+            self._kernel.restore(open_bars, frame_state)
+        else:
+            for frame, agg in self.aggregators.items():
+                bar = open_bars[frame]
+                agg.carry = None if bar is None else {
+                    key: np.array([bar.get(key, 0.0)], dtype=np.int64 if key in _INT_STATE_KEYS else np.float64)
+                    for key in _STATE_KEYS}
+                if isinstance(agg, _InfoBarAgg) and frame in frame_state:
+                    for key, slot in _XSTATE_SLOTS.items():
+                        agg.xstate[0, slot] = frame_state[frame].get(key, agg.xstate[0, slot])
+        return self
+
+    def finish(self) -> Dict[str, pa.Table]:
+        if self._kernel is not None:
+            return self._kernel.finish()
+        out = {}
+        for frame, agg in self.aggregators.items():
+            table = agg.finish()
+            if table is not None:
+                out[frame] = table
+        return out
+
+
+def tick_slice_table(ts: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+                     first_tick_id: int, N: int) -> pa.Table:
+    """Tick-to-bar linkage for fixed N-tick bars (bar_idx = tick_id // N)."""
+    tick_id = np.arange(first_tick_id, first_tick_id + len(ts), dtype=np.int64)
+    return pa.Table.from_arrays([
+        pa.array(tick_id // N), pa.array(tick_id),
+        pa.array(ts, pa.int64()), pa.array(bid), pa.array(ask),
+    ], schema=TICKS_SLICE_SCHEMA)
@@ -0,0 +1,282 @@
+"""
+Numba kernels for the bar engine (Module 1)
+
+A single stateful kernel scans a tick batch once and updates every configured
+frame per tick, writing finished bars straight into preallocated NumPy column
+buffers. The open bar of frame f is kept in small typed arrays so it
+survives across batches:
+
+    istate[f] (int64):   [n, t_open_ns, t_close_ns, tick_first_id, tick_last_id,
+                          bucket_start, bucket_end]  (ns for time, tick id for tick bars)
+    fstate[f] (float64): [o, h, l, c, o_bid, o_ask, c_bid, c_ask, spread_sum, v_sum]
+    xstate[f] (float64): state of the information- and price-driven frames
+                         that outlives a bar (see info_tick)
+
+Output buffers hold one column per row so each column slice is contiguous and
+can be handed to Arrow without copying:
+
+    out_i[f] (int64, 5 x cap):    t_open_ns, t_close_ns, n, tick_first_id, tick_last_id
+    out_f[f] (float64, 10 x cap): o, h, l, c, o_bid, o_ask, c_bid, c_ask, spread_sum, v_sum
+
+Information- and price-driven frames close a bar at the tick that satisfies
+the rule:
+
+    volume / dollar   the cumulative volume (or price * volume) crosses the
+                      next multiple of the threshold; overshoot counts
+                      towards the next bar, so bars average the threshold
+    tick_imbalance    |sum of tick signs| >= E[T] * E[|b|]
+    tick_run          max(#up ticks, #down ticks) >= E[T] * max(P[up], 1 - P[up])
+    range             high - low of the bar reaches the range size
+    renko             the price completes a brick: it reaches one brick size
+                      above the last brick's top or below its bottom (so a
+                      reversal needs two bricks); a jump over several bricks
+                      closes one bar
+
+Renko bricks sit on a grid of brick size anchored at the first price, kept
+as integer brick indices so long streams do not accumulate rounding.
+
+Tick signs follow the tick rule on the bar price (unchanged price repeats the
+previous sign). E[T] (ticks per bar), E[|b|] (|imbalance| per tick) and P[up]
+are EWMAs over closed bars with alpha = 2 / (ewma_span + 1), started at
+expected_ticks, 1 / sqrt(expected_ticks) (a random walk's imbalance) and 0.5.
+E[T] is kept within [expected_ticks / ET_CLIP, expected_ticks * ET_CLIP] so
+the threshold cannot collapse or run away.
+"""
+
+import numpy as np
+from numba import njit
+
+# Frame kinds
+KIND_TIME, KIND_TICK = 0, 1
+KIND_VOLUME, KIND_DOLLAR, KIND_TICK_IMBALANCE, KIND_TICK_RUN = 2, 3, 4, 5
+KIND_RANGE, KIND_RENKO = 6, 7
+INFO_KINDS = (KIND_VOLUME, KIND_DOLLAR, KIND_TICK_IMBALANCE, KIND_TICK_RUN, KIND_RANGE, KIND_RENKO)
+# Price basis for o/h/l/c
+BASIS_MID, BASIS_BID, BASIS_ASK = 0, 1, 2
+BASIS_CODES = {"mid": BASIS_MID, "bid": BASIS_BID, "ask": BASIS_ASK}
+
+# istate slots
+S_N, S_OPEN, S_CLOSE, S_FIRST, S_LAST, S_BSTART, S_BEND = 0, 1, 2, 3, 4, 5, 6
+ISTATE_SIZE = 7
+# fstate slots
+S_O, S_H, S_L, S_C, S_OBID, S_OASK, S_CBID, S_CASK, S_SPREAD, S_VSUM = 0, 1, 2, 3, 4, 5, 6, 7, 8, 9
+FSTATE_SIZE = 10
+# out_i rows
+O_OPEN, O_CLOSE, O_N, O_FIRST, O_LAST = 0, 1, 2, 3, 4
+OUT_I_ROWS = 5
+OUT_F_ROWS = 10
+# xstate slots: cumulative volume/dollar, signed imbalance or up ticks | down ticks | ticks in bar |
+# E[T] | E[|b|] or P[up] | last price | last tick sign | range bar low/high or renko brick
+# bottom/top index | renko grid anchor
+X_CUM, X_DOWN, X_N, X_ET, X_EB, X_LASTPX, X_LASTB, X_LO, X_HI, X_BASE = 0, 1, 2, 3, 4, 5, 6, 7, 8, 9
+XSTATE_SIZE = 10
+# fparams columns: threshold (volume/dollar), expected_ticks or range/brick size, EWMA alpha
+P_THRESHOLD, P_ALPHA = 0, 1
+ET_CLIP = 4.0
+# Relative tolerance for price-size comparisons (prices are decimal grid values in binary floats)
+SIZE_EPS = 1e-9
+
+
+def new_state(n_frames: int):
+    """Empty (no open bar) kernel state for n_frames frames."""
+    return (np.zeros((n_frames, ISTATE_SIZE), dtype=np.int64),
+            np.zeros((n_frames, FSTATE_SIZE), dtype=np.float64))
+
+
+def new_xstate(kinds: np.ndarray, fparams: np.ndarray) -> np.ndarray:
+    """Initial information-driven state per frame (unused rows for time/tick frames)."""
+    xstate = np.zeros((len(kinds), XSTATE_SIZE), dtype=np.float64)
+    xstate[:, X_LASTPX] = np.nan
+    xstate[:, X_BASE] = np.nan
+    for f in range(len(kinds)):
+        e0 = fparams[f, P_THRESHOLD]
+        if kinds[f] == KIND_TICK_IMBALANCE:
+            xstate[f, X_ET], xstate[f, X_EB] = e0, 1.0 / np.sqrt(e0)
+        elif kinds[f] == KIND_TICK_RUN:
+            xstate[f, X_ET], xstate[f, X_EB] = e0, 0.5
+    return xstate
+
+
+def new_buffers(n_frames: int, cap: int):
+    return (np.empty((n_frames, OUT_I_ROWS, cap), dtype=np.int64),
+            np.empty((n_frames, OUT_F_ROWS, cap), dtype=np.float64))
+
+
+@njit
+def _price(bid, ask, basis):
+    if basis == BASIS_BID:
+        return bid
+    if basis == BASIS_ASK:
+        return ask
+    return (bid + ask) * 0.5
+
+
+@njit
+def _add_tick(istate, fstate, f, ts, bid, ask, px, tick_id, vol):
+    if istate[f, S_N] == 0:
+        istate[f, S_OPEN] = ts
+        istate[f, S_FIRST] = tick_id
+        fstate[f, S_O] = px; fstate[f, S_H] = px; fstate[f, S_L] = px
+        fstate[f, S_OBID] = bid; fstate[f, S_OASK] = ask
+        fstate[f, S_SPREAD] = 0.0
+        fstate[f, S_VSUM] = 0.0
+    if px > fstate[f, S_H]: fstate[f, S_H] = px
+    if px < fstate[f, S_L]: fstate[f, S_L] = px
+    fstate[f, S_C] = px; fstate[f, S_CBID] = bid; fstate[f, S_CASK] = ask
+    fstate[f, S_SPREAD] += ask - bid
+    fstate[f, S_VSUM] += vol
+    istate[f, S_CLOSE] = ts
+    istate[f, S_LAST] = tick_id
+    istate[f, S_N] += 1
+
+
+@njit
+def _emit_bar(istate, fstate, f, out_i, out_f, counts):
+    k = counts[f]
+    out_i[f, O_OPEN, k] = istate[f, S_OPEN]
+    out_i[f, O_CLOSE, k] = istate[f, S_CLOSE]
+    out_i[f, O_N, k] = istate[f, S_N]
+    out_i[f, O_FIRST, k] = istate[f, S_FIRST]
+    out_i[f, O_LAST, k] = istate[f, S_LAST]
+    for j in range(OUT_F_ROWS):
+        out_f[f, j, k] = fstate[f, j]
+    istate[f, S_N] = 0
+    counts[f] = k + 1
+
+
+@njit
+def info_tick(xstate, f, kind, px, amount, threshold, alpha):
+    """
+    Feed one tick to an information-driven frame; True if it closes the bar.
+
+    amount is the tick's volume (volume bars) or price * volume (dollar
+    bars); threshold is the bar size, the range/brick size in price units
+    or, for imbalance/run bars, expected_ticks.
+    """
+    if kind == KIND_VOLUME or kind == KIND_DOLLAR:
+        before = xstate[f, X_CUM]
+        xstate[f, X_CUM] = before + amount
+        return np.floor(xstate[f, X_CUM] / threshold) > np.floor(before / threshold)
+    if kind == KIND_RANGE:
+        if xstate[f, X_N] == 0 or px < xstate[f, X_LO]:
+            xstate[f, X_LO] = px
+        if xstate[f, X_N] == 0 or px > xstate[f, X_HI]:
+            xstate[f, X_HI] = px
+        xstate[f, X_N] += 1.0
+        if xstate[f, X_HI] - xstate[f, X_LO] < threshold * (1.0 - SIZE_EPS):
+            return False
+        xstate[f, X_N] = 0.0
+        return True
+    if kind == KIND_RENKO:
+        if np.isnan(xstate[f, X_BASE]):
+            xstate[f, X_BASE] = px
+        pos = (px - xstate[f, X_BASE]) / threshold
+        if pos >= xstate[f, X_HI] + 1.0 - SIZE_EPS:
+            xstate[f, X_HI] = np.floor(pos + SIZE_EPS)
+            xstate[f, X_LO] = xstate[f, X_HI] - 1.0
+            return True
+        if pos <= xstate[f, X_LO] - 1.0 + SIZE_EPS:
+            xstate[f, X_LO] = np.ceil(pos - SIZE_EPS)
+            xstate[f, X_HI] = xstate[f, X_LO] + 1.0
+            return True
+        return False
+    d = px - xstate[f, X_LASTPX]
+    sign = 1.0 if d > 0 else (-1.0 if d < 0 else xstate[f, X_LASTB])
+    xstate[f, X_LASTPX] = px
+    xstate[f, X_LASTB] = sign
+    xstate[f, X_N] += 1.0
+    if kind == KIND_TICK_IMBALANCE:
+        xstate[f, X_CUM] += sign
+        closed = abs(xstate[f, X_CUM]) >= xstate[f, X_ET] * xstate[f, X_EB]
+    else:
+        if sign > 0:
+            xstate[f, X_CUM] += 1.0
+        elif sign < 0:
+            xstate[f, X_DOWN] += 1.0
+        p_up = xstate[f, X_EB]
+        closed = max(xstate[f, X_CUM], xstate[f, X_DOWN]) >= xstate[f, X_ET] * max(p_up, 1.0 - p_up)
+    if not closed:
+        return False
+    n = xstate[f, X_N]
+    et = xstate[f, X_ET] + alpha * (n - xstate[f, X_ET])
+    xstate[f, X_ET] = min(max(et, threshold / ET_CLIP), threshold * ET_CLIP)
+    if kind == KIND_TICK_IMBALANCE:
+        xstate[f, X_EB] += alpha * (abs(xstate[f, X_CUM]) / n - xstate[f, X_EB])
+    elif xstate[f, X_CUM] + xstate[f, X_DOWN] > 0:
+        up = xstate[f, X_CUM] / (xstate[f, X_CUM] + xstate[f, X_DOWN])
+        xstate[f, X_EB] += alpha * (up - xstate[f, X_EB])
+    xstate[f, X_CUM] = 0.0
+    xstate[f, X_DOWN] = 0.0
+    xstate[f, X_N] = 0.0
+    return True
+
+
+@njit
+def info_closes(xstate, f, kind, threshold, alpha, price, amount):
+    """Offsets of the ticks that close a bar of one information-driven frame."""
+    closes = np.empty(len(price), dtype=np.int64)
+    k = 0
+    for i in range(len(price)):
+        if info_tick(xstate, f, kind, price[i], amount[i], threshold, alpha):
+            closes[k] = i
+            k += 1
+    return closes[:k]
+
+
+@njit
+def multi_frame_kernel(ts, bid, ask, vol, unit_volume, start, first_tick_id, basis, kinds, params, fparams,
+                       istate, fstate, xstate, out_i, out_f, counts):
+    """
+    Single pass over ticks[start:] updating every frame.
+
+    kinds[f] is KIND_TIME (params[f] = period in ns), KIND_TICK
+    (params[f] = ticks per bar, bars end where (tick_id + 1) % N == 0) or an
+    information- or price-driven kind (fparams[f] = threshold or size,
+    alpha; see info_tick).
+    vol feeds v_sum; with unit_volume every tick counts as volume 1 for the
+    volume and dollar frames. Stops early when any frame's buffer is full
+    and returns the index of the next unprocessed tick.
+    """
+    n_frames = len(kinds)
+    cap = out_i.shape[2]
+    for i in range(start, len(ts)):
+        for f in range(n_frames):
+            if counts[f] == cap:
+                return i
+        t = ts[i]; b = bid[i]; a = ask[i]; v = vol[i]
+        px = _price(b, a, basis)
+        tick_id = first_tick_id + i
+        for f in range(n_frames):
+            kind = kinds[f]
+            if kind == KIND_TIME:
+                # Bucket bounds are cached on open to avoid a division per tick
+                if istate[f, S_N] > 0 and (t >= istate[f, S_BEND] or t < istate[f, S_BSTART]):
+                    _emit_bar(istate, fstate, f, out_i, out_f, counts)
+                if istate[f, S_N] == 0:
+                    p = params[f]
+                    istate[f, S_BSTART] = (t // p) * p
+                    istate[f, S_BEND] = istate[f, S_BSTART] + p
+                _add_tick(istate, fstate, f, t, b, a, px, tick_id, v)
+            elif kind == KIND_TICK:
+                # Tick bars are aligned to the global tick id (bar = tick_id // N)
+                if istate[f, S_N] == 0:
+                    istate[f, S_BEND] = (tick_id // params[f] + 1) * params[f]
+                _add_tick(istate, fstate, f, t, b, a, px, tick_id, v)
+                if tick_id + 1 == istate[f, S_BEND]:
+                    _emit_bar(istate, fstate, f, out_i, out_f, counts)
+            else:
+                _add_tick(istate, fstate, f, t, b, a, px, tick_id, v)
+                amount = 1.0 if unit_volume else v
+                if kind == KIND_DOLLAR:
+                    amount *= px
+                if info_tick(xstate, f, kind, px, amount, fparams[f, P_THRESHOLD], fparams[f, P_ALPHA]):
+                    _emit_bar(istate, fstate, f, out_i, out_f, counts)
+    return len(ts)
+
+
+@njit
+def flush_kernel(istate, fstate, out_i, out_f, counts):
+    """Emit the open bar of every frame, if any (end of input)."""
+    for f in range(istate.shape[0]):
+        if istate[f, S_N] > 0:
+            _emit_bar(istate, fstate, f, out_i, out_f, counts)
@@ -0,0 +1,158 @@
+"""
+Hive-partitioned bar store for Module 1
+
+Bars of all symbols and frames live under one root, partitioned as
+
+    <root>/symbol=EURUSD/frame=1m/year=2025/month=1/part-<token>-<i>.parquet
+
+Rows are sorted by t_open_ns within every partition and written in bounded
+row groups with Parquet statistics, so read_bars() can skip whole months
+through the directory names and row groups inside a month through the
+t_open_ns min/max statistics (predicate pushdown via pyarrow.dataset).
+Labeling, features and splitter accept a store root wherever they take a bar
+file (see read_input).
+"""
+
+from __future__ import annotations
+import pathlib, uuid
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from .schema import BAR_SCHEMA
+from .ipc_cache import read_table
+from .parquet_profiles import writer_options
+
+PARTITION_SCHEMA = pa.schema([
+    ("symbol", pa.string()), ("frame", pa.string()),
+    ("year", pa.int16()), ("month", pa.int8()),
+])
+ROW_GROUP_ROWS = 65_536
+WRITE_MODES = ("overwrite", "append")
+
+PathLike = Union[str, pathlib.Path]
+TimeLike = Union[str, int, pd.Timestamp, None]
+
+
+def _partitioning() -> ds.Partitioning:
+    return ds.partitioning(PARTITION_SCHEMA, flavor="hive")
+
+
+def is_bar_store(path: PathLike) -> bool:
+    """True for a store root (a directory with symbol=... partitions)."""
+    path = pathlib.Path(path)
+    return path.is_dir() and any(p.is_dir() and p.name.startswith("symbol=") for p in path.iterdir())
+
+
+def _to_ns(value: TimeLike) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.value)
+
+
+def _file_schema(table: pa.Table) -> pa.Schema:
+    """Columns that end up inside the files (partition keys live in the paths)."""
+    return pa.schema([f for f in table.schema if f.name not in PARTITION_SCHEMA.names])
+
+
+def write_bars(bars: Union[pa.Table, pd.DataFrame], root: PathLike, mode: str = "overwrite",
+               row_group_rows: int = ROW_GROUP_ROWS, basename: Optional[str] = None) -> List[str]:
+    """
+    Write BAR_SCHEMA bars into the store; returns the written files.
+
+    mode="overwrite" replaces every (symbol, frame, month) partition the bars
+    touch and leaves the others alone; mode="append" adds files next to the
+    existing ones (the caller guarantees the bars are new). A fixed basename
+    makes a repeated append write the same files again instead of adding
+    duplicates.
+    """
+    if mode not in WRITE_MODES:
+        raise ValueError(f"Unknown write mode: {mode} (expected one of {WRITE_MODES})")
+    table = bars if isinstance(bars, pa.Table) else pa.Table.from_pandas(bars, preserve_index=False)
+    table = table.select(BAR_SCHEMA.names).cast(BAR_SCHEMA)
+    if table.num_rows == 0:
+        return []
+    t_open = pc.cast(table.column("t_open_ns"), pa.timestamp("ns", tz="UTC"))
+    table = table.append_column("year", pc.cast(pc.year(t_open), pa.int16()))
+    table = table.append_column("month", pc.cast(pc.month(t_open), pa.int8()))
+    table = table.sort_by([("symbol", "ascending"), ("frame", "ascending"), ("t_open_ns", "ascending")])
+
+    written: List[str] = []
+    ds.write_dataset(
+        table, str(root), format="parquet", partitioning=_partitioning(),
+        basename_template=f"part-{basename or uuid.uuid4().hex}-{{i}}.parquet",
+        file_options=ds.ParquetFileFormat().make_write_options(**writer_options(_file_schema(table), "bars")),
+        min_rows_per_group=min(row_group_rows, table.num_rows), max_rows_per_group=row_group_rows,
+        existing_data_behavior="delete_matching" if mode == "overwrite" else "overwrite_or_ignore",
+        file_visitor=lambda f: written.append(f.path),
+    )
+    return written
+
+
+def _month_bound(field_year: ds.Expression, field_month: ds.Expression, ns: int, lower: bool) -> ds.Expression:
+    ts = pd.Timestamp(ns, tz="UTC")
+    if lower:
+        return (field_year > ts.year) | ((field_year == ts.year) & (field_month >= ts.month))
+    return (field_year < ts.year) | ((field_year == ts.year) & (field_month <= ts.month))
+
+
+def bar_filter(symbol: Optional[str] = None, frame: Optional[str] = None,
+               start: TimeLike = None, end: TimeLike = None) -> Optional[ds.Expression]:
+    """
+    Dataset filter for a symbol/frame/time range (bars with start <= t_open_ns < end).
+
+    The year/month terms prune partitions, the t_open_ns terms prune row groups.
+    """
+    terms = []
+    if symbol is not None:
+        terms.append(ds.field("symbol") == symbol)
+    if frame is not None:
+        terms.append(ds.field("frame") == frame)
+    start_ns, end_ns = _to_ns(start), _to_ns(end)
+    year, month = ds.field("year"), ds.field("month")
+    if start_ns is not None:
+        terms += [_month_bound(year, month, start_ns, lower=True), ds.field("t_open_ns") >= start_ns]
+    if end_ns is not None:
+        # end is exclusive; the month holding end - 1 ns is the last one needed
+        terms += [_month_bound(year, month, end_ns - 1, lower=False), ds.field("t_open_ns") < end_ns]
+    if not terms:
+        return None
+    expr = terms[0]
+    for term in terms[1:]:
+        expr = expr & term
+    return expr
+
+
+def read_bars(root: PathLike, symbol: Optional[str] = None, frame: Optional[str] = None,
+              start: TimeLike = None, end: TimeLike = None,
+              columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load bars of a symbol/frame/time range from the store, in time order.
+
+    start/end take ISO strings, Timestamps (naive means UTC) or int ns.
+    """
+    dataset = ds.dataset(str(root), format="parquet", partitioning=_partitioning())
+    names = columns or BAR_SCHEMA.names
+    sort_keys = ["symbol", "frame", "t_open_ns"]
+    table = dataset.to_table(columns=list(dict.fromkeys(names + sort_keys)),
+                             filter=bar_filter(symbol, frame, start, end))
+    table = table.sort_by([(c, "ascending") for c in sort_keys]).select(names)
+    return table.to_pandas()
+
+
+def read_input(path: PathLike, config: Dict[str, Any]) -> pd.DataFrame:
+    """
+    Load a module input: a bar store root (filtered by the config keys
+    symbol, frame, start and end) or a single table file (read_table).
+    """
+    if is_bar_store(path):
+        return read_bars(path, config.get("symbol"), config.get("frame"), config.get("start"), config.get("end"))
+    return read_table(path)
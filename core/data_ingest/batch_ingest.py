@@ -0,0 +1,386 @@
+"""
+Parallel multi-file ingest for Module 1
+
+Ingests a list (or glob) of tick files, one file per worker process, into a
+single consistent dataset:
+
+1. Prepare (parallel): each worker loads one file (CSV as in data_ingest_v22,
+   or Parquet), normalizes, sorts and dedupes it and spills the ticks to an
+   Arrow IPC file; it reports the tick count, time range and the detected
+   timestamp format.
+2. Files are ordered by their first timestamp; the prefix sums of the tick
+   counts give every file its global tick id offset.
+3. Aggregate (parallel): each worker builds all bar frames for its file with
+   BarEngine(first_tick_id=offset), writes its normalized ticks and its
+   interior bars, and returns the first and last bar of every frame.
+4. Stitch: bars that straddle a file boundary (the partial last time bar,
+   tick-bar remainders) arrive as fragments with the same bucket key
+   (t_open_ns // period or tick_first_id // N) and are merged in file order.
+
+The result does not depend on worker scheduling and equals a single pass over
+the concatenated input. Files must not overlap in time; duplicates are only
+removed within a file. Only time and tick frames can be stitched this way;
+information- and price-driven frames (volume, dollar, imbalance, run, range,
+renko) are rejected.
+
+With append=True the dataset grows incrementally: every run adds one part
+file per bar frame (bars_<frame>/part-NNNNN.parquet) and raw_norm part, and
+the aggregator state (the open bar of every frame, the next global tick id,
+the last timestamp and its ticks, quality sketches) is kept in
+ingest_state.json next to the manifest. The next run continues from that
+state, so its cost depends only on the new files; the open bars are exposed
+to readers as bars_<frame>/tail.parquet until they are completed. Ticks at or
+before the last ingested timestamp (re-delivered data) are skipped.
+"""
+
+from __future__ import annotations
+import glob, json, os, pathlib, shutil, datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import errors as E
+from . import bar_kernels as K
+from .schema import BAR_SCHEMA
+from .bar_engine import DEFAULT_BAR_FRAMES, BarEngine, parse_bar_frames
+from .data_ingest_v22 import _bars_filename, _ensure_cols, _neg_spread_check, _normalize_time, _sort_and_dedupe
+from .quality import QualityAccumulator
+from .bar_store import write_bars
+from .parquet_profiles import open_writer, write_table
+from .timestamps import TimestampParser
+from .util import write_json, write_json_atomic
+
+MODULE_VERSION = "1.0"
+STAGING_DIR = ".batch_staging"
+STATE_FILE = "ingest_state.json"
+TAIL_FILE = "tail.parquet"
+
+
+def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
+    p = out_dir / "progress.jsonl"
+    with p.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "timestamp": dt.datetime.utcnow().isoformat(),
+            "module": "data_ingest_batch",
+            "step": step, "percent": pct, "message": msg
+        }) + "\n")
+
+
+def resolve_files(config: Dict[str, Any]) -> List[pathlib.Path]:
+    """Input files from config "files" (list) or "glob" (pattern)."""
+    files = config.get("files")
+    if files is None and config.get("glob"):
+        files = sorted(glob.glob(config["glob"]))
+    if not files:
+        raise ValueError(f"{E.IO_ERROR}: no input files (set 'files' or 'glob')")
+    return [pathlib.Path(f) for f in files]
+
+
+def _load_ticks(path: pathlib.Path, parser: Optional[TimestampParser] = None) -> pd.DataFrame:
+    parser = parser or TimestampParser()
+    if path.suffix == ".parquet":
+        table = pq.read_table(path, columns=["timestamp", "bid", "ask"])
+        df = table.select(["bid", "ask"]).to_pandas()
+        df.insert(0, "timestamp", table.column("timestamp").to_pandas())
+        df["ts_ns"] = parser(table.column("timestamp"))
+    else:
+        df = pd.read_csv(path)
+        _ensure_cols(df)
+        df = _normalize_time(df, parser)
+    df = _sort_and_dedupe(df)
+    _neg_spread_check(df)
+    return df
+
+
+def _prepare_file(args: Tuple[int, str, str, Optional[Dict[str, Any]], Optional[str]]) -> Dict[str, Any]:
+    """Phase 1 worker: normalized, sorted ticks of one file -> Arrow IPC."""
+    idx, path, staging, boundary, timestamp_format = args
+    parser = TimestampParser(timestamp_format)
+    df = _load_ticks(pathlib.Path(path), parser)
+    n_skipped = 0
+    if boundary is not None:
+        # Drop ticks an earlier append run has already ingested
+        seen = pd.MultiIndex.from_tuples([tuple(t) for t in boundary["ticks"]])
+        old = (df["ts_ns"] < boundary["ts"]) | (
+            (df["ts_ns"] == boundary["ts"]) & pd.MultiIndex.from_frame(df[["bid", "ask"]]).isin(seen))
+        n_skipped = int(old.sum())
+        df = df[~old]
+    ticks = pa.Table.from_pandas(df[["ts_ns", "bid", "ask"]], preserve_index=False)
+    spill = pathlib.Path(staging) / f"ticks-{idx:05d}.arrow"
+    with pa.OSFile(str(spill), "wb") as sink, pa.ipc.new_file(sink, ticks.schema) as writer:
+        writer.write_table(ticks)
+    n = len(df)
+    last_ts = int(df["ts_ns"].iloc[-1]) if n else None
+    return {
+        "index": idx, "path": path, "ticks_path": str(spill), "n_ticks": n, "n_skipped": n_skipped,
+        "timestamp_format": parser.format,
+        "first_ts": int(df["ts_ns"].iloc[0]) if n else None,
+        "last_ts": last_ts,
+        "last_ticks": df.loc[df["ts_ns"] == last_ts, ["bid", "ask"]].values.tolist() if n else [],
+    }
+
+
+def _aggregate_file(args: Tuple[Dict[str, Any], Dict[str, Any]]) -> Dict[str, Any]:
+    """Phase 2 worker: bars of one file at its global tick offset."""
+    info, settings = args
+    with pa.memory_map(info["ticks_path"], "r") as source:
+        ticks = pa.ipc.open_file(source).read_all()
+    ts = ticks.column("ts_ns").to_numpy()
+    bid = ticks.column("bid").to_numpy()
+    ask = ticks.column("ask").to_numpy()
+    staging = pathlib.Path(settings["staging"])
+    # Parts are numbered in time order so the directory reads back sorted
+    write_table(ticks, pathlib.Path(settings["raw_norm_dir"]) / f"part-{info['part']:05d}.parquet", "ticks")
+
+    engine = BarEngine(settings["symbol"], settings["bar_frames"], settings["engine"],
+                       settings["price_basis"], first_tick_id=info["tick_offset"])
+    tables = {frame: [] for frame in engine.frames}
+    for frame, table in engine.add_batch(ts, bid, ask).items():
+        tables[frame].append(table)
+    for frame, table in engine.finish().items():
+        tables[frame].append(table)
+
+    quality = QualityAccumulator(settings["max_gap_seconds"], method="sketch")
+    quality.update(ts, bid, ask)
+    edges, interiors = {}, {}
+    for frame, parts in tables.items():
+        bars = pa.concat_tables(parts) if parts else BAR_SCHEMA.empty_table()
+        # First and last bar may continue into the neighbouring files
+        edges[frame] = [bars.slice(0, 1)] if bars.num_rows else []
+        if bars.num_rows > 1:
+            edges[frame].append(bars.slice(bars.num_rows - 1, 1))
+        interior = bars.slice(1, max(bars.num_rows - 2, 0))
+        interiors[frame] = None
+        if interior.num_rows:
+            path = staging / f"bars-{frame}-{info['part']:05d}.parquet"
+            pq.write_table(interior, path)
+            interiors[frame] = str(path)
+    return {"part": info["part"], "edges": edges, "interiors": interiors, "quality": quality}
+
+
+def _bar_key(bar: pa.Table, kind: int, param: int) -> int:
+    if kind == K.KIND_TIME:
+        return bar.column("t_open_ns")[0].as_py() // param
+    return bar.column("tick_first_id")[0].as_py() // param
+
+
+def _stitch(a: pa.Table, b: pa.Table) -> pa.Table:
+    """Merge two fragments of the same bar (a precedes b)."""
+    ra, rb = a.to_pylist()[0], b.to_pylist()[0]
+    n = ra["n_ticks"] + rb["n_ticks"]
+    merged = dict(ra)
+    merged.update({
+        "t_close_ns": rb["t_close_ns"], "c": rb["c"], "c_bid": rb["c_bid"], "c_ask": rb["c_ask"],
+        "h": max(ra["h"], rb["h"]), "l": min(ra["l"], rb["l"]),
+        "spread_mean": (ra["spread_mean"] * ra["n_ticks"] + rb["spread_mean"] * rb["n_ticks"]) / n,
+        "n_ticks": n, "v_sum": ra["v_sum"] + rb["v_sum"],
+        "tick_last_id": rb["tick_last_id"], "gap_flag": max(ra["gap_flag"], rb["gap_flag"]),
+    })
+    return pa.Table.from_pylist([merged], schema=BAR_SCHEMA)
+
+
+def pool_map(fn, items: List[Any], workers: int) -> List[Any]:
+    """fn over items in a process pool of up to workers processes (in order; serial for one)."""
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=min(workers, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def load_state(out_dir: pathlib.Path) -> Optional[Dict[str, Any]]:
+    """Aggregator state of an append-mode dataset, or None for a fresh one."""
+    path = pathlib.Path(out_dir) / STATE_FILE
+    if not path.exists():
+        return None
+    with path.open(encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _bars_dir(frame: str) -> str:
+    return pathlib.Path(_bars_filename(frame)).stem
+
+
+def run(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Batch ingest of many files into one dataset (see module docstring).
+
+    Config: files | glob, out_dir, symbol, bar_frames, engine, price_basis,
+    max_gap_seconds, workers (default: CPU count), append, bar_store (root of
+    a partitioned bar store to write into as well).
+    """
+    out_dir = pathlib.Path(config["out_dir"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    files = resolve_files(config)
+    append = config.get("append", False)
+    state = load_state(out_dir) if append else None
+    prev = state or {}
+    settings = {
+        "symbol": config.get("symbol", prev.get("symbol", "UNKNOWN")),
+        "bar_frames": config.get("bar_frames") or prev.get("bar_frames") or DEFAULT_BAR_FRAMES,
+        "engine": config.get("engine", prev.get("engine", "numpy")),
+        "price_basis": config.get("price_basis", prev.get("price_basis", "mid")),
+        "max_gap_seconds": config.get("max_gap_seconds", prev.get("max_gap_seconds", 300)),
+    }
+    if state is not None:
+        for key, value in settings.items():
+            if key != "engine" and state[key] != value:
+                raise ValueError(f"Append config does not match the existing dataset: "
+                                 f"{key}={value!r}, dataset has {state[key]!r}")
+    symbol = settings["symbol"]
+    specs = {name: (kind, param) for name, kind, param in parse_bar_frames(settings["bar_frames"])}
+    path_dependent = [name for name, (kind, _) in specs.items() if kind in K.INFO_KINDS]
+    if path_dependent:
+        # Their boundaries depend on every earlier tick, so files cannot be aggregated independently
+        raise ValueError(f"Path-dependent bar frames {path_dependent} need a single pass; "
+                         f"use data_ingest_v22 or the streaming ingestors")
+    workers = int(config.get("workers") or os.cpu_count() or 1)
+    staging = out_dir / STAGING_DIR
+    raw_norm_dir = out_dir / "raw_norm"
+    shutil.rmtree(staging, ignore_errors=True)
+    if state is None:
+        (out_dir / STATE_FILE).unlink(missing_ok=True)
+        shutil.rmtree(raw_norm_dir, ignore_errors=True)
+        if append:
+            for frame in specs:
+                shutil.rmtree(out_dir / _bars_dir(frame), ignore_errors=True)
+    staging.mkdir()
+    raw_norm_dir.mkdir(exist_ok=True)
+    run_seq = prev.get("n_runs", 0)
+    boundary = {"ts": state["last_ts"], "ticks": state["last_ticks"]} if state and state["last_ts"] is not None else None
+
+    try:
+        _log_line(out_dir, "prepare", 5, f"normalizing {len(files)} files on {workers} workers")
+        ts_format = config.get("timestamp_format")
+        infos = pool_map(_prepare_file, [(i, str(f), str(staging), boundary, ts_format)
+                                          for i, f in enumerate(files)], workers)
+        n_skipped = sum(i["n_skipped"] for i in infos)
+        infos = sorted((i for i in infos if i["n_ticks"]), key=lambda i: (i["first_ts"], i["path"]))
+        first_tick_id = offset = prev.get("next_tick_id", 0)
+        for part, (before, info) in enumerate(zip([None] + infos[:-1], infos), start=prev.get("n_parts", 0)):
+            if before is not None and info["first_ts"] < before["last_ts"]:
+                raise ValueError(f"{E.UNSORTED_INPUT}: {info['path']} overlaps {before['path']}")
+            info["part"] = part
+            info["tick_offset"] = offset
+            offset += info["n_ticks"]
+
+        _log_line(out_dir, "aggregate", 40, f"building bars for {len(infos)} files")
+        settings.update({"staging": str(staging), "raw_norm_dir": str(raw_norm_dir)})
+        results = pool_map(_aggregate_file, [(info, settings) for info in infos], workers)
+
+        _log_line(out_dir, "stitch", 80, "stitching bars across file boundaries")
+        if state is not None:
+            quality = QualityAccumulator.from_dict(state["quality"])
+        else:
+            quality = QualityAccumulator(settings["max_gap_seconds"], method="sketch")
+        for result in results:
+            quality.merge(result["quality"])
+        frames_out, open_bars, n_bars_done = {}, {}, {}
+        for frame, (kind, param) in specs.items():
+            if append:
+                (out_dir / _bars_dir(frame)).mkdir(exist_ok=True)
+                bars_path = out_dir / _bars_dir(frame) / f"part-{run_seq:05d}.parquet"
+            else:
+                bars_path = out_dir / _bars_filename(frame)
+            n_bars = prev.get("n_bars", {}).get(frame, 0)
+            with open_writer(bars_path, BAR_SCHEMA, "bars") as writer:
+                def write(table: pa.Table):
+                    nonlocal n_bars
+                    writer.write_table(table)
+                    quality.update_bars(frame, table)
+                    n_bars += table.num_rows
+
+                open_bar: Optional[pa.Table] = None
+                if prev.get("open_bars", {}).get(frame):
+                    open_bar = pa.Table.from_pylist([state["open_bars"][frame]], schema=BAR_SCHEMA)
+                for result in results:
+                    edges = result["edges"][frame]
+                    if not edges:
+                        continue
+                    head = edges[0]
+                    if open_bar is not None and _bar_key(open_bar, kind, param) == _bar_key(head, kind, param):
+                        head = _stitch(open_bar, head)
+                    elif open_bar is not None:
+                        write(open_bar)
+                    if len(edges) == 1:
+                        open_bar = head
+                        continue
+                    write(head)
+                    if result["interiors"][frame]:
+                        write(pq.read_table(result["interiors"][frame]))
+                    open_bar = edges[1]
+                if open_bar is not None and not append:
+                    write(open_bar)
+            n_bars_done[frame] = n_bars
+            if append:
+                # The last bar may still grow with the next run; keep it out of the parts
+                open_bars[frame] = open_bar.to_pylist()[0] if open_bar is not None else None
+                bars_path = bars_path.parent
+            frames_out[frame] = {"path": str(bars_path.relative_to(out_dir)), "n_bars": n_bars}
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    inputs = prev.get("inputs", []) + [
+        {"path": i["path"], "n_ticks": i["n_ticks"], "tick_offset": i["tick_offset"],
+         "timestamp_format": i["timestamp_format"]} for i in infos]
+    if append:
+        last_ts, last_ticks = (boundary["ts"], boundary["ticks"]) if boundary else (None, [])
+        if infos:
+            last_ticks = infos[-1]["last_ticks"] + (last_ticks if infos[-1]["last_ts"] == last_ts else [])
+            last_ts = infos[-1]["last_ts"]
+        new_state = {
+            "module_version": MODULE_VERSION,
+            **{key: settings[key] for key in ("symbol", "bar_frames", "engine", "price_basis", "max_gap_seconds")},
+            "n_runs": run_seq + 1, "n_parts": prev.get("n_parts", 0) + len(infos),
+            "next_tick_id": offset, "last_ts": last_ts, "last_ticks": last_ticks,
+            "open_bars": open_bars, "n_bars": n_bars_done,
+            "inputs": inputs,
+            "quality": quality.to_dict(),
+        }
+        for frame, row in open_bars.items():
+            tail_path = out_dir / _bars_dir(frame) / TAIL_FILE
+            if row is None:
+                tail_path.unlink(missing_ok=True)
+                continue
+            tail = pa.Table.from_pylist([row], schema=BAR_SCHEMA)
+            write_table(tail, tail_path, "bars")
+            quality.update_bars(frame, tail)
+            frames_out[frame]["n_bars"] += 1
+
+    bar_store = config.get("bar_store")
+    if bar_store:
+        # Append runs add their completed bars only; open bars stay in the tail files
+        _log_line(out_dir, "bar_store", 90, f"writing bars to partitioned store {bar_store}")
+        for frame in specs:
+            written = out_dir / _bars_dir(frame) / f"part-{run_seq:05d}.parquet" if append \
+                else out_dir / _bars_filename(frame)
+            write_bars(pq.read_table(written), bar_store, "append" if state is not None else "overwrite",
+                       basename=f"{symbol}-{frame}-run{run_seq:05d}" if append else None)
+            frames_out[frame]["bar_store"] = {"root": str(bar_store), "symbol": symbol, "frame": frame}
+
+    write_json(out_dir / "quality_report.json", quality.report())
+    manifest = {
+        "run_ts": dt.datetime.utcnow().isoformat(),
+        "module": "data_ingest_batch",
+        "module_version": MODULE_VERSION,
+        "symbol": symbol,
+        "workers": workers,
+        "append": append,
+        "inputs": inputs,
+        "outputs": {
+            **frames_out,
+            "raw_norm": {"path": str(raw_norm_dir.relative_to(out_dir))},
+            "quality_report": {"path": "quality_report.json"},
+        },
+        "performance": {"total_ticks_processed": offset - first_tick_id, "skipped_ticks": n_skipped},
+    }
+    if append:
+        manifest["outputs"]["state"] = {"path": STATE_FILE}
+        manifest["run"] = run_seq
+    write_json(out_dir / "manifest.json", manifest)
+    if append:
+        # Written last: a run that fails before this point is simply repeated
+        write_json_atomic(out_dir / STATE_FILE, new_state)
+    _log_line(out_dir, "done", 100, f"ingested {offset - first_tick_id:,} ticks from {len(infos)} files")
+    return manifest
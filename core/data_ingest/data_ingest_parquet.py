@@ -2,14 +2,24 @@
 Core Implementation for Module 1: DataIngest v4.0 (Parquet Input)
 
 This version reads from clean Parquet files and implements robust streaming processing.
+Bars and tick slices go through one long-lived writer per output directory
+(part_writer.RollingParquetWriter): a row group per flush_every_bars bars,
+a new part file only when max_part_bytes is reached. An optional volume
+column feeds v_sum and the volume/dollar bar frames. The session calendar and
+outlier filter (tick_filter) drop ticks from each batch before the bars.
 '''
 from __future__ import annotations
-import os, pathlib, json, datetime as dt, uuid
-from typing import Dict, Any, List, Tuple
-import pandas as pd
-import pyarrow as pa
+import pathlib, json, datetime as dt
+from typing import Dict, Any
+import numpy as np
 import pyarrow.parquet as pq
 
+from .schema import BAR_SCHEMA, TICKS_SLICE_SCHEMA
+from .bar_engine import BarEngine, tick_slice_table, timestamps_to_ns
+from .quality import QualityAccumulator
+from .part_writer import RollingParquetWriter
+from .tick_filter import TickFilter
+
 # ---------- Config helpers ----------
 def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
     p = out_dir / "progress.jsonl"
@@ -20,35 +30,6 @@ def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
             "step": step, "percent": pct, "message": msg
         }) + "\n")
 
-def _atomic_write_table(table: pa.Table, out_dir: pathlib.Path, subdir: str, compression: str = "zstd"):
-    path_dir = out_dir / subdir
-    path_dir.mkdir(parents=True, exist_ok=True)
-    tmp = path_dir / (f".tmp-{uuid.uuid4().hex}.parquet")
-    final = path_dir / (f"part-{uuid.uuid4().hex}.parquet")
-    pq.write_table(table, tmp, compression=compression, use_dictionary=False)
-    os.replace(tmp, final)
-    return str(final)
-
-# ---------- Schemas ----------
-BAR_SCHEMA = pa.schema([
-    ("symbol", pa.string()), ("frame", pa.string()),
-    ("t_open_ns", pa.int64()), ("t_close_ns", pa.int64()),
-    ("o", pa.float64()), ("h", pa.float64()), ("l", pa.float64()), ("c", pa.float64()),
-    ("o_bid", pa.float64()), ("o_ask", pa.float64()), ("c_bid", pa.float64()), ("c_ask", pa.float64()),
-    ("spread_mean", pa.float64()), ("n_ticks", pa.int32()),
-    ("v_sum", pa.float64()),
-    ("tick_first_id", pa.int64()), ("tick_last_id", pa.int64()),
-    ("gap_flag", pa.int32()),
-])
-
-TICKS_SLICE_SCHEMA = pa.schema([
-    ("bar_idx", pa.int64()),
-    ("tick_id", pa.int64()),
-    ("timestamp", pa.int64()),
-    ("bid", pa.float64()),
-    ("ask", pa.float64())
-])
-
 # ---------- Aggregators ----------
 class MinuteBarAgg:
     def __init__(self, symbol: str, frame: str = "1m"):
@@ -144,6 +125,12 @@ class TickBarAgg:
         self.reset()
         return out
 
+def _write_quality_report(quality: QualityAccumulator, out_dir: pathlib.Path):
+    report = quality.report()
+    with (out_dir / "quality_report.json").open("w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    if quality.spill_path is not None:
+        quality.spill_path.unlink(missing_ok=True)
+
 # ---------- Main run ----------
 def run(config: Dict[str, Any]) -> Dict[str, Any]:
     out_dir = pathlib.Path(config["out_dir"]); out_dir.mkdir(parents=True, exist_ok=True)
@@ -151,103 +138,69 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     parquet_path = pathlib.Path(config["parquet"]["path"])
     chunksize = int(config.get("chunksize", 100_000))
     flush_every_bars = int(config.get("flush_every_bars", 1000))
+    max_part_bytes = config.get("max_part_bytes")
     _log_line(out_dir, "init", 1, "Starting DataIngest with Parquet input")
 
-    # Initialize aggregators
-    agg_1m = MinuteBarAgg(symbol, "1m")
-    agg_100t = TickBarAgg(symbol, 100)
-    agg_1000t = TickBarAgg(symbol, 1000)
-    
-    # Buffers
-    bars_1m: List[dict] = []
-    bars_100t: List[dict] = []
-    bars_1000t: List[dict] = []
-    tick_slice_buffer: List[Tuple[int,int,int,float,float]] = []
-    current_1000t_bar_idx = 0
-    global_tick_id = 0
+    engine = BarEngine(symbol, config.get("bar_frames"), config.get("engine", "numpy"),
+                       config.get("price_basis", "mid"), pip_size=config.get("pip_size", 0.0001))
+    bar_writers = {frame: RollingParquetWriter(out_dir / f"bars_{frame}", BAR_SCHEMA, "bars",
+                                               flush_every_bars, max_part_bytes)
+                   for frame in engine.frames}
+    slice_writer = RollingParquetWriter(out_dir / "tick_slices_1000t", TICKS_SLICE_SCHEMA, "slices",
+                                        max_file_bytes=max_part_bytes)
+    tick_filter = TickFilter.from_config(config)
+    spill = out_dir / ".quality-spread.bin"
+    quality = QualityAccumulator(config.get("max_gap_seconds", 300), spill,
+                                 method=config.get("quantile_method", "sketch"))
 
     # Read Parquet file in chunks
     parquet_file = pq.ParquetFile(parquet_path)
     total_rows = parquet_file.metadata.num_rows
     processed_rows = 0
 
-    for batch in parquet_file.iter_batches(batch_size=chunksize):
-        df = batch.to_pandas()
-        
-        for _, row in df.iterrows():
-            ts_ns = row['timestamp'].value  # Convert to nanoseconds
-            bid = float(row['bid'])
-            ask = float(row['ask'])
-
-            # Minute bars
-            if agg_1m.open_ns is not None and agg_1m.should_flush(ts_ns):
-                rec = agg_1m.flush()
-                if rec: bars_1m.append(rec)
-            agg_1m.add_tick(ts_ns, bid, ask, global_tick_id)
-
-            # 100-tick bars
-            if agg_100t.add_tick(ts_ns, bid, ask, global_tick_id):
-                bars_100t.append(agg_100t.flush("100t"))
-
-            # 1000-tick bars + tick slices
-            tick_slice_buffer.append((current_1000t_bar_idx, global_tick_id, ts_ns, bid, ask))
-            if agg_1000t.add_tick(ts_ns, bid, ask, global_tick_id):
-                bars_1000t.append(agg_1000t.flush("1000t"))
-                current_1000t_bar_idx += 1
-                
-                # Flush tick slices periodically
-                if len(tick_slice_buffer) >= 1000:
-                    slice_tbl = pa.Table.from_arrays([
-                        pa.array([r[0] for r in tick_slice_buffer], type=pa.int64()),
-                        pa.array([r[1] for r in tick_slice_buffer], type=pa.int64()),
-                        pa.array([r[2] for r in tick_slice_buffer], type=pa.int64()),
-                        pa.array([r[3] for r in tick_slice_buffer], type=pa.float64()),
-                        pa.array([r[4] for r in tick_slice_buffer], type=pa.float64()),
-                    ], schema=TICKS_SLICE_SCHEMA)
-                    _atomic_write_table(slice_tbl, out_dir, "tick_slices_1000t")
-                    tick_slice_buffer.clear()
-
-            global_tick_id += 1
-
-        processed_rows += len(df)
+    columns = ["timestamp", "bid", "ask"] + (["volume"] if "volume" in parquet_file.schema_arrow.names else [])
+    for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+        ts = timestamps_to_ns(batch.column("timestamp"))
+        bid = batch.column("bid").to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        ask = batch.column("ask").to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        volume = None
+        if "volume" in columns:
+            volume = batch.column("volume").to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        if tick_filter is not None:
+            keep = tick_filter.mask(ts, bid, ask)
+            if not keep.all():
+                ts, bid, ask = ts[keep], bid[keep], ask[keep]
+                volume = None if volume is None else volume[keep]
+
+        quality.update(ts, bid, ask)
+        first_tick_id = engine.next_tick_id
+        for frame, table in engine.add_batch(ts, bid, ask, volume).items():
+            bar_writers[frame].write(table)
+            quality.update_bars(frame, table)
+
+        # Tick slices for the 1000t bars
+        slice_writer.write(tick_slice_table(ts, bid, ask, first_tick_id, 1000))
+
+        processed_rows += batch.num_rows
         progress = int((processed_rows / total_rows) * 90)
         _log_line(out_dir, "processing", 10 + progress, f"Processed {processed_rows:,} / {total_rows:,} rows")
 
-        # Periodic flush of bars
-        if len(bars_1m) >= flush_every_bars:
-            _atomic_write_table(pa.Table.from_pylist(bars_1m, schema=BAR_SCHEMA), out_dir, "bars_1m")
-            bars_1m.clear()
-        if len(bars_100t) >= flush_every_bars:
-            _atomic_write_table(pa.Table.from_pylist(bars_100t, schema=BAR_SCHEMA), out_dir, "bars_100t")
-            bars_100t.clear()
-        if len(bars_1000t) >= flush_every_bars:
-            _atomic_write_table(pa.Table.from_pylist(bars_1000t, schema=BAR_SCHEMA), out_dir, "bars_1000t")
-            bars_1000t.clear()
-
     # Final flush
-    last = agg_1m.flush()
-    if last: bars_1m.append(last)
-    if bars_1m: _atomic_write_table(pa.Table.from_pylist(bars_1m, schema=BAR_SCHEMA), out_dir, "bars_1m")
-    if bars_100t: _atomic_write_table(pa.Table.from_pylist(bars_100t, schema=BAR_SCHEMA), out_dir, "bars_100t")
-    if bars_1000t: _atomic_write_table(pa.Table.from_pylist(bars_1000t, schema=BAR_SCHEMA), out_dir, "bars_1000t")
-    if tick_slice_buffer:
-        slice_tbl = pa.Table.from_arrays([
-            pa.array([r[0] for r in tick_slice_buffer], type=pa.int64()),
-            pa.array([r[1] for r in tick_slice_buffer], type=pa.int64()),
-            pa.array([r[2] for r in tick_slice_buffer], type=pa.int64()),
-            pa.array([r[3] for r in tick_slice_buffer], type=pa.float64()),
-            pa.array([r[4] for r in tick_slice_buffer], type=pa.float64()),
-        ], schema=TICKS_SLICE_SCHEMA)
-        _atomic_write_table(slice_tbl, out_dir, "tick_slices_1000t")
+    for frame, table in engine.finish().items():
+        bar_writers[frame].write(table)
+        quality.update_bars(frame, table)
+    for writer in (*bar_writers.values(), slice_writer):
+        writer.close()
 
+    _write_quality_report(quality, out_dir)
     manifest = {
         "run_ts": dt.datetime.utcnow().isoformat(),
         "module": "data_ingest_parquet",
+        "filters": tick_filter.report() if tick_filter is not None else None,
         "outputs": {
-            "bars_1m": {"path": str(out_dir / "bars_1m")},
-            "bars_100t": {"path": str(out_dir / "bars_100t")},
-            "bars_1000t": {"path": str(out_dir / "bars_1000t")},
-            "tick_slices_1000t": {"path": str(out_dir / "tick_slices_1000t")}
+            **{f"bars_{frame}": {"path": str(out_dir / f"bars_{frame}")} for frame in engine.frames},
+            "tick_slices_1000t": {"path": str(out_dir / "tick_slices_1000t")},
+            "quality_report": {"path": str(out_dir / "quality_report.json")}
         }
     }
     with (out_dir / "manifest.json").open("w", encoding="utf-8") as f: json.dump(manifest, f, indent=2)
@@ -1,16 +1,39 @@
 '''
 Core Implementation for Module 1: DataIngest v3.3 (Robust Timestamp Parsing)
 
-This version implements robust timestamp parsing using PyArrow's compute functions.
+This version implements robust timestamp parsing using PyArrow's compute functions:
+the timestamp format is detected from the first block (or taken from
+timestamp_format) and every block is parsed with that fixed format
+(timestamps.TimestampParser).
+
+The CSV is read in newline-aligned byte blocks. Every output directory has
+one long-lived writer (part_writer.RollingParquetWriter) that appends a row
+group per flush_every_bars bars (slices: per profile row-group size) and
+rolls to a new part once max_part_bytes is reached. Every
+checkpoint_every_batches blocks the writers finalize their current parts and
+checkpoint.json is replaced atomically with the input byte offset, the bar
+engine and quality state and the list of committed part files. run() with
+resume: true continues from the last checkpoint after discarding part files
+written after it and orphan .tmp-* files. time_zone_in, the session calendar
+and the outlier filter (tick_filter) run on every batch; the filter state
+is part of the checkpoint.
 '''
 from __future__ import annotations
-import os, pathlib, json, datetime as dt, uuid
-from typing import Dict, Any, List, Deque, Tuple
-from collections import deque
+import pathlib, json, datetime as dt
+from typing import Dict, Any, List
 import pyarrow as pa
-import pyarrow.compute as pc
 import pyarrow.csv as pacsv
-import pyarrow.parquet as pq
+
+from . import errors as E
+from .schema import BAR_SCHEMA, TICKS_SLICE_SCHEMA
+from .bar_engine import BarEngine, tick_slice_table
+from .quality import QualityAccumulator
+from .part_writer import RollingParquetWriter
+from .timestamps import TimestampParser
+from .tick_filter import NAIVE_FORMATS, TickFilter, localize_ns
+from .util import write_json_atomic
+
+CHECKPOINT_FILE = "checkpoint.json"
 
 # ---------- Config helpers ----------
 def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
@@ -22,35 +45,6 @@ def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
             "step": step, "percent": pct, "message": msg
         }) + "\n")
 
-def _atomic_write_table(table: pa.Table, out_dir: pathlib.Path, subdir: str, compression: str = "zstd"):
-    path_dir = out_dir / subdir
-    path_dir.mkdir(parents=True, exist_ok=True)
-    tmp = path_dir / (f".tmp-{uuid.uuid4().hex}.parquet")
-    final = path_dir / (f"part-{uuid.uuid4().hex}.parquet")
-    pq.write_table(table, tmp, compression=compression, use_dictionary=False)
-    os.replace(tmp, final)
-    return str(final)
-
-# ---------- Schemas ----------
-BAR_SCHEMA = pa.schema([
-    ("symbol", pa.string()), ("frame", pa.string()),
-    ("t_open_ns", pa.int64()), ("t_close_ns", pa.int64()),
-    ("o", pa.float64()), ("h", pa.float64()), ("l", pa.float64()), ("c", pa.float64()),
-    ("o_bid", pa.float64()), ("o_ask", pa.float64()), ("c_bid", pa.float64()), ("c_ask", pa.float64()),
-    ("spread_mean", pa.float64()), ("n_ticks", pa.int32()),
-    ("v_sum", pa.float64()),
-    ("tick_first_id", pa.int64()), ("tick_last_id", pa.int64()),
-    ("gap_flag", pa.int32()),
-])
-
-TICKS_SLICE_SCHEMA = pa.schema([
-    ("bar_idx", pa.int64()),
-    ("tick_id", pa.int64()),
-    ("timestamp", pa.int64()),
-    ("bid", pa.float64()),
-    ("ask", pa.float64())
-])
-
 # ---------- Aggregators ----------
 class MinuteBarAgg:
     def __init__(self, symbol: str, frame: str = "1m"):
@@ -146,6 +140,63 @@ class TickBarAgg:
         self.reset()
         return out
 
+def _open_writers(out_dir: pathlib.Path, frames, flush_every_bars: int,
+                  max_part_bytes) -> Dict[str, RollingParquetWriter]:
+    """One writer per bars_<frame> directory plus tick_slices_1000t."""
+    writers = {f"bars_{frame}": RollingParquetWriter(out_dir / f"bars_{frame}", BAR_SCHEMA, "bars",
+                                                     flush_every_bars, max_part_bytes)
+               for frame in frames}
+    writers["tick_slices_1000t"] = RollingParquetWriter(out_dir / "tick_slices_1000t", TICKS_SLICE_SCHEMA,
+                                                        "slices", max_file_bytes=max_part_bytes)
+    return writers
+
+# ---------- Checkpoints ----------
+def _iter_csv_blocks(csv_path: pathlib.Path, offset: int, block_bytes: int):
+    """Yield (block, end offset) of whole lines, starting at byte offset."""
+    with csv_path.open("rb") as f:
+        f.seek(offset)
+        carry = b""
+        while True:
+            data = f.read(block_bytes)
+            if not data:
+                if carry.strip():
+                    yield carry, offset + len(carry)
+                return
+            data = carry + data
+            cut = data.rfind(b"\n") + 1
+            if cut == 0:
+                carry = data
+                continue
+            block, carry = data[:cut], data[cut:]
+            offset += len(block)
+            yield block, offset
+
+def _input_fingerprint(csv_path: pathlib.Path) -> Dict[str, Any]:
+    st = csv_path.stat()
+    return {"path": str(csv_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _discard_uncommitted(out_dir: pathlib.Path, committed: List[str]):
+    """Remove .tmp-* files and part files that no checkpoint references."""
+    keep = set(committed)
+    for path in out_dir.glob(".tmp-*"):
+        path.unlink()
+    for sub in out_dir.iterdir():
+        if not sub.is_dir() or not sub.name.startswith(("bars_", "tick_slices_")):
+            continue
+        for path in sub.iterdir():
+            orphan = path.name.startswith("part-") and str(path.relative_to(out_dir)) not in keep
+            if path.name.startswith(".tmp-") or orphan:
+                path.unlink()
+
+def _write_checkpoint(out_dir: pathlib.Path, checkpoint: Dict[str, Any]):
+    write_json_atomic(out_dir / CHECKPOINT_FILE, checkpoint)
+
+def _write_quality_report(quality: QualityAccumulator, out_dir: pathlib.Path):
+    report = quality.report()
+    with (out_dir / "quality_report.json").open("w", encoding="utf-8") as f: json.dump(report, f, indent=2)
+    if quality.spill_path is not None:
+        quality.spill_path.unlink(missing_ok=True)
+
 # ---------- Main run ----------
 def run(config: Dict[str, Any]) -> Dict[str, Any]:
     out_dir = pathlib.Path(config["out_dir"]); out_dir.mkdir(parents=True, exist_ok=True)
@@ -153,9 +204,21 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     csv_path = pathlib.Path(config["csv"]["path"])
     chunksize_bytes = int(config.get("chunk_bytes", 64 * 1024 * 1024))
     flush_every_bars = int(config.get("flush_every_bars", 2000))
+    max_part_bytes = config.get("max_part_bytes")
+    checkpoint_every = int(config.get("checkpoint_every_batches", 8))
+    fingerprint = _input_fingerprint(csv_path)
+    checkpoint = None
+    if config.get("resume", False) and (out_dir / CHECKPOINT_FILE).exists():
+        with (out_dir / CHECKPOINT_FILE).open(encoding="utf-8") as f: checkpoint = json.load(f)
+        if checkpoint["input"] != fingerprint:
+            raise ValueError(f"{E.IO_ERROR}: {csv_path} changed since the checkpoint, cannot resume")
+        if checkpoint.get("complete"):
+            _log_line(out_dir, "done", 100, "already complete")
+            with (out_dir / "manifest.json").open(encoding="utf-8") as f: return json.load(f)
+    else:
+        (out_dir / CHECKPOINT_FILE).unlink(missing_ok=True)
     _log_line(out_dir, "init", 1, "init")
 
-    read_opts = pacsv.ReadOptions(block_size=chunksize_bytes, autogenerate_column_names=True)
     conv_opts = pacsv.ConvertOptions(
         column_types={
             "f0": pa.string(), "f1": pa.string(),
@@ -164,84 +227,94 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         include_columns=["f0", "f1", "f2", "f3"]
     )
     parse_opts = pacsv.ParseOptions(delimiter=",")
-    with pacsv.open_csv(csv_path, read_options=read_opts, convert_options=conv_opts, parse_options=parse_opts) as reader:
-        agg_1m = MinuteBarAgg(symbol, "1m")
-        agg_100t = TickBarAgg(symbol, 100)
-        agg_1000t = TickBarAgg(symbol, 1000)
-        bars_1m: List[dict] = []
-        bars_100t: List[dict] = []
-        bars_1000t: List[dict] = []
-        tick_slice_buffer: List[Tuple[int,int,int,float,float]] = []
-        current_1000t_bar_idx = 0
-        global_tick_id = 0
-
-        for batch in reader:
+    read_opts = pacsv.ReadOptions(autogenerate_column_names=True)
+    engine = BarEngine(symbol, config.get("bar_frames"), config.get("engine", "numpy"),
+                       config.get("price_basis", "mid"), pip_size=config.get("pip_size", 0.0001))
+    tick_filter = TickFilter.from_config(config)
+    spill = out_dir / ".quality-spread.bin"
+    if checkpoint is not None:
+        _discard_uncommitted(out_dir, checkpoint["parts"])
+        engine.set_state(checkpoint["engine"])
+        if tick_filter is not None:
+            tick_filter.set_state(checkpoint.get("tick_filter", {}))
+        quality = QualityAccumulator.from_dict(checkpoint["quality"])
+        offset, n_batches, committed = checkpoint["byte_offset"], checkpoint["batches"], checkpoint["parts"]
+        parser = TimestampParser(checkpoint.get("timestamp_format") or config.get("timestamp_format"))
+        _log_line(out_dir, "resume", 2, f"resuming at byte {offset:,} after {n_batches} batches")
+    else:
+        quality = QualityAccumulator(config.get("max_gap_seconds", 300), spill,
+                                     method=config.get("quantile_method", "sketch"))
+        offset, n_batches, committed = 0, 0, []
+        parser = TimestampParser(config.get("timestamp_format"))
+
+    writers = _open_writers(out_dir, engine.frames, flush_every_bars, max_part_bytes)
+
+    def parts() -> List[str]:
+        """Committed parts: those of earlier runs plus every part the writers finalized."""
+        return committed + [str(pathlib.Path(p).relative_to(out_dir)) for w in writers.values() for p in w.files]
+
+    def save_checkpoint(byte_offset: int):
+        _write_checkpoint(out_dir, {
+            "input": fingerprint, "byte_offset": byte_offset, "batches": n_batches,
+            "engine": engine.get_state(), "quality": quality.to_dict(),
+            "tick_filter": tick_filter.get_state() if tick_filter is not None else None,
+            "timestamp_format": parser.format, "parts": parts(), "complete": False,
+        })
+
+    for block, end in _iter_csv_blocks(csv_path, offset, chunksize_bytes):
+        parsed = pacsv.read_csv(pa.py_buffer(block), read_options=read_opts,
+                                parse_options=parse_opts, convert_options=conv_opts)
+        for batch in parsed.to_batches():
             sym, ts_str, bid, ask = batch.column(0), batch.column(1), batch.column(2), batch.column(3)
-            
-            try:
-                ts = pc.strptime(ts_str, format="%Y%m%d %H:%M:%S.%f", unit="ns")
-            except pa.lib.ArrowInvalid:
-                ts = pc.strptime(ts_str, format="%Y%m%d %H:%M:%S", unit="ns")
-
-            n = len(batch)
-            for i in range(n):
-                ts_ns = ts[i].as_py().value
-                b, a = float(bid[i].as_py()), float(ask[i].as_py())
-
-                if agg_1m.open_ns is not None and agg_1m.should_flush(ts_ns):
-                    rec = agg_1m.flush()
-                    if rec: bars_1m.append(rec)
-                agg_1m.add_tick(ts_ns, b, a, global_tick_id)
-
-                if agg_100t.add_tick(ts_ns, b, a, global_tick_id):
-                    bars_100t.append(agg_100t.flush("100t"))
-
-                tick_slice_buffer.append((current_1000t_bar_idx, global_tick_id, ts_ns, b, a))
-                if agg_1000t.add_tick(ts_ns, b, a, global_tick_id):
-                    bars_1000t.append(agg_1000t.flush("1000t"))
-                    current_1000t_bar_idx += 1
-                    if len(tick_slice_buffer) >= 1000:
-                        slice_tbl = pa.Table.from_arrays([
-                            pa.array([r[0] for r in tick_slice_buffer], type=pa.int64()),
-                            pa.array([r[1] for r in tick_slice_buffer], type=pa.int64()),
-                            pa.array([r[2] for r in tick_slice_buffer], type=pa.int64()),
-                            pa.array([r[3] for r in tick_slice_buffer], type=pa.float64()),
-                            pa.array([r[4] for r in tick_slice_buffer], type=pa.float64()),
-                        ], schema=TICKS_SLICE_SCHEMA)
-                        _atomic_write_table(slice_tbl, out_dir, "tick_slices_1000t")
-                        tick_slice_buffer.clear()
-                global_tick_id += 1
-
-            if len(bars_1m) >= flush_every_bars: _atomic_write_table(pa.Table.from_pylist(bars_1m, schema=BAR_SCHEMA), out_dir, "bars_1m"); bars_1m.clear()
-            if len(bars_100t) >= flush_every_bars: _atomic_write_table(pa.Table.from_pylist(bars_100t, schema=BAR_SCHEMA), out_dir, "bars_100t"); bars_100t.clear()
-            if len(bars_1000t) >= flush_every_bars: _atomic_write_table(pa.Table.from_pylist(bars_1000t, schema=BAR_SCHEMA), out_dir, "bars_1000t"); bars_1000t.clear()
-
-        last = agg_1m.flush()
-        if last: bars_1m.append(last)
-        if bars_1m: _atomic_write_table(pa.Table.from_pylist(bars_1m, schema=BAR_SCHEMA), out_dir, "bars_1m")
-        if bars_100t: _atomic_write_table(pa.Table.from_pylist(bars_100t, schema=BAR_SCHEMA), out_dir, "bars_100t")
-        if bars_1000t: _atomic_write_table(pa.Table.from_pylist(bars_1000t, schema=BAR_SCHEMA), out_dir, "bars_1000t")
-        if tick_slice_buffer:
-            slice_tbl = pa.Table.from_arrays([
-                pa.array([r[0] for r in tick_slice_buffer], type=pa.int64()),
-                pa.array([r[1] for r in tick_slice_buffer], type=pa.int64()),
-                pa.array([r[2] for r in tick_slice_buffer], type=pa.int64()),
-                pa.array([r[3] for r in tick_slice_buffer], type=pa.float64()),
-                pa.array([r[4] for r in tick_slice_buffer], type=pa.float64()),
-            ], schema=TICKS_SLICE_SCHEMA)
-            _atomic_write_table(slice_tbl, out_dir, "tick_slices_1000t")
 
+            ts_ns = parser(ts_str)
+            if parser.format in NAIVE_FORMATS:
+                ts_ns = localize_ns(ts_ns, config.get("time_zone_in"))
+            b = bid.to_numpy(zero_copy_only=False)
+            a = ask.to_numpy(zero_copy_only=False)
+            if tick_filter is not None:
+                keep = tick_filter.mask(ts_ns, b, a)
+                if not keep.all():
+                    ts_ns, b, a = ts_ns[keep], b[keep], a[keep]
+
+            quality.update(ts_ns, b, a)
+            first_tick_id = engine.next_tick_id
+            for frame, table in engine.add_batch(ts_ns, b, a).items():
+                writers[f"bars_{frame}"].write(table)
+                quality.update_bars(frame, table)
+            writers["tick_slices_1000t"].write(tick_slice_table(ts_ns, b, a, first_tick_id, 1000))
+
+        n_batches += 1
+        if checkpoint_every > 0 and n_batches % checkpoint_every == 0:
+            # Everything before `end` must be in finalized parts before the checkpoint points past it
+            for writer in writers.values():
+                writer.roll()
+            save_checkpoint(end)
+            _log_line(out_dir, "checkpoint", int(1 + 98 * end / max(fingerprint["size"], 1)),
+                      f"checkpoint at byte {end:,}")
+
+    for frame, table in engine.finish().items():
+        writers[f"bars_{frame}"].write(table)
+        quality.update_bars(frame, table)
+    for writer in writers.values():
+        writer.close()
+
+    _write_quality_report(quality, out_dir)
     manifest = {
         "run_ts": dt.datetime.utcnow().isoformat(),
         "module": "data_ingest_streaming",
+        "input": {"path": str(csv_path), "timestamp_format": parser.format},
+        "filters": tick_filter.report() if tick_filter is not None else None,
         "outputs": {
-            "bars_1m": {"path": str(out_dir / "bars_1m")},
-            "bars_100t": {"path": str(out_dir / "bars_100t")},
-            "bars_1000t": {"path": str(out_dir / "bars_1000t")},
-            "tick_slices_1000t": {"path": str(out_dir / "tick_slices_1000t")}
+            **{f"bars_{frame}": {"path": str(out_dir / f"bars_{frame}")} for frame in engine.frames},
+            "tick_slices_1000t": {"path": str(out_dir / "tick_slices_1000t")},
+            "quality_report": {"path": str(out_dir / "quality_report.json")}
         }
     }
     with (out_dir / "manifest.json").open("w", encoding="utf-8") as f: json.dump(manifest, f, indent=2)
+    if checkpoint_every > 0:
+        _write_checkpoint(out_dir, {"input": fingerprint, "byte_offset": fingerprint["size"],
+                                    "batches": n_batches, "parts": parts(), "complete": True})
     _log_line(out_dir, "done", 100, "done")
     return manifest
 
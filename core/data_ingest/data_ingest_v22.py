@@ -6,17 +6,39 @@ Key v2.2 Enhancements:
 2. Improved manifest with pip_size, bar_rules_id, export_slices
 3. Memory optimization with compression and row-groups
 4. Event-based tick slice organization for precise First-Hit-Logic
+5. Single-pass multi-frame bar building for arbitrary bar_frames lists
+6. Optional memory-mapped Arrow IPC cache of raw_norm and bars (ipc_cache)
+7. Out-of-core streaming mode with a memory ceiling (streaming, memory_limit_mb)
+8. Timestamp format detected once and parsed vectorized (timestamp_format)
+9. Optional fixed-point prices for raw_norm and CSR slices (price_encoding)
+10. Information-driven bar frames (volume, dollar, tick_imbalance, tick_run)
+    fed by an optional volume column
+11. Range and renko bar frames sized in pips of pip_size
+12. time_zone_in, session calendar (trim_weekend, holidays) and streaming
+    z-score outlier filter (outlier_zscore) applied in the ingest scan
 """
 
 from __future__ import annotations
 import pathlib, json, datetime as dt
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Union
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from . import errors as E
-from .schema import TICK_SCHEMA, BAR_COLUMNS, SCHEMA_VERSION, BAR_RULES_ID
+from .schema import TICK_SCHEMA, BAR_SCHEMA, SCHEMA_VERSION, BAR_RULES_ID
 from .util import sha256_of_file, write_json
+from .bar_engine import BarEngine
+from .tick_store import TickSliceStoreWriter
+from .ipc_cache import ipc_sibling, write_ipc
+from .external_sort import ExternalSorter, dedupe_sorted
+from .quality import QualityAccumulator
+from .bar_store import write_bars
+from .timestamps import TimestampParser
+from .tick_filter import NAIVE_FORMATS, TickFilter, localize_ns
+from .fixed_point import PRICE_ENCODINGS, PriceCodec, encode_table
+from .parquet_profiles import open_writer, write_table
 
 MODULE_VERSION = "2.2"
 
@@ -38,14 +60,20 @@ def _ensure_cols(df: pd.DataFrame):
     if missing:
         raise ValueError(f"{E.MISSING_COLUMN}: {missing}")
 
-def _normalize_time(df: pd.DataFrame) -> pd.DataFrame:
-    ts = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    if ts.isna().any():
-        raise ValueError(E.TIMEZONE_ERROR)
+def _normalize_time(df: pd.DataFrame, parser: Optional[TimestampParser] = None,
+                    time_zone_in: Optional[str] = None) -> pd.DataFrame:
+    parser = parser or TimestampParser()
+    ts_ns = parser(df["timestamp"])
+    if parser.format in NAIVE_FORMATS:
+        ts_ns = localize_ns(ts_ns, time_zone_in)
     df = df.copy()
-    df["ts_ns"] = ts.view("int64")
+    df["ts_ns"] = ts_ns
     return df
 
+def _tick_columns(df: pd.DataFrame) -> List[str]:
+    """raw_norm columns; volume is kept when the input has it"""
+    return ["timestamp", "bid", "ask", "ts_ns"] + (["volume"] if "volume" in df.columns else [])
+
 def _sort_and_dedupe(df: pd.DataFrame) -> pd.DataFrame:
     df = df.sort_values("ts_ns", kind="mergesort")
     df = df.drop_duplicates(subset=["ts_ns","bid","ask"], keep="first")
@@ -55,306 +83,440 @@ def _neg_spread_check(df: pd.DataFrame):
     if (df["ask"] < df["bid"]).any():
         raise ValueError(E.NEGATIVE_SPREAD)
 
-def _compute_mid(df: pd.DataFrame, basis: str) -> pd.Series:
-    if basis == "mid":
-        return (df["bid"] + df["ask"]) / 2
-    elif basis == "bid":
-        return df["bid"]
-    elif basis == "ask":
-        return df["ask"]
-    else:
-        raise ValueError(f"Unknown basis: {basis}")
+def _filter_ticks(df: pd.DataFrame, tick_filter: Optional[TickFilter]) -> pd.DataFrame:
+    """Drop closed-session and outlier ticks from a time-ordered frame"""
+    if tick_filter is None:
+        return df
+    keep = tick_filter.mask(df["ts_ns"].to_numpy(dtype=np.int64), df["bid"].to_numpy(dtype=np.float64),
+                            df["ask"].to_numpy(dtype=np.float64))
+    return df if keep.all() else df[keep]
 
-def _gap_report(df: pd.DataFrame, max_gap_s: int) -> Tuple[List[Dict], float]:
-    """Enhanced gap analysis with better reporting"""
-    if len(df) < 2:
-        return [], 100.0
-    
-    diffs = np.diff(df["ts_ns"].values) / 1_000_000_000
-    gaps = []
-    total_time = (df["ts_ns"].iloc[-1] - df["ts_ns"].iloc[0]) / 1_000_000_000
-    gap_time = 0
-    
-    for i, gap_s in enumerate(diffs):
-        if gap_s > max_gap_s:
-            gap_start = pd.to_datetime(df["ts_ns"].iloc[i], unit='ns', utc=True)
-            gap_end = pd.to_datetime(df["ts_ns"].iloc[i+1], unit='ns', utc=True)
-            gaps.append({
-                "start": gap_start.isoformat(),
-                "end": gap_end.isoformat(),
-                "duration_seconds": float(gap_s)
-            })
-            gap_time += gap_s
-    
-    coverage = max(0, 100 * (1 - gap_time / total_time)) if total_time > 0 else 100
-    return gaps, coverage
+def _write_parquet_optimized(data: Union[pd.DataFrame, pa.Table], path: pathlib.Path, compress: bool = True,
+                             profile: str = "bars"):
+    """Enhanced parquet writing with the output type's writer profile (parquet_profiles)"""
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    overrides = {} if compress else {"compression": None}
+    write_table(table, path, profile, **overrides)
 
-def _write_parquet_optimized(df: pd.DataFrame, path: pathlib.Path, compress: bool = True):
-    """Enhanced parquet writing with compression and optimization"""
-    compression = 'zstd' if compress else None
-    row_group_size = min(128 * 1024 * 1024, len(df))  # 128MB row groups max
-    
-    df.to_parquet(
-        path, 
-        compression=compression,
-        row_group_size=row_group_size,
-        index=False
-    )
+def _bars_filename(frame_name: str) -> str:
+    if frame_name.endswith("t"):
+        return f"bars_{frame_name[:-1]}tick.parquet"
+    return f"bars_{frame_name}.parquet"
 
-def _create_event_tick_slices(df: pd.DataFrame, bars: pd.DataFrame, out_dir: pathlib.Path, 
-                            frame_name: str, export_slices: bool = True) -> Dict[str, Any]:
+def _build_bars(ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray, bar_frames: List[Dict[str, Any]],
+                basis: str, symbol: str, engine: str = "numpy",
+                volume: Optional[np.ndarray] = None, pip_size: float = 0.0001) -> Dict[str, pd.DataFrame]:
+    """Build every configured bar frame in a single scan over the tick arrays"""
+    bar_engine = BarEngine(symbol, bar_frames, engine, basis, pip_size=pip_size)
+    tables = {frame: [] for frame in bar_engine.frames}
+    for frame, table in bar_engine.add_batch(ts_ns, bid, ask, volume).items():
+        tables[frame].append(table)
+    for frame, table in bar_engine.finish().items():
+        tables[frame].append(table)
+    return {
+        frame: (pa.concat_tables(parts) if parts else BAR_SCHEMA.empty_table()).to_pandas()
+        for frame, parts in tables.items()
+    }
+
+class _EventSliceWriter:
     """
-    Enhanced tick slice creation with event-based organization
+    Incremental per-event tick slice export (one Parquet file per bar)
     
-    Creates individual tick slice files per bar/event for precise First-Hit-Logic
+    Same interface as TickSliceStoreWriter: ticks are appended in bar order,
+    whole bars only, so the in-memory and streaming paths share the writer.
     """
-    if not export_slices:
-        return {"enabled": False}
-    
-    slice_dir = out_dir / f"tick_slices_{frame_name}"
-    slice_dir.mkdir(exist_ok=True)
     
-    # Create bar index mapping
-    bar_idx_col = f"bar_idx_{frame_name}"
-    if bar_idx_col not in df.columns:
-        return {"enabled": False, "error": f"Missing {bar_idx_col} column"}
-    
-    slice_files = []
-    slice_stats = {
-        "total_events": 0,
-        "total_ticks": 0,
-        "avg_ticks_per_event": 0,
-        "min_ticks": float('inf'),
-        "max_ticks": 0
-    }
+    def __init__(self, out_dir: pathlib.Path, frame_name: str):
+        self.out_dir = out_dir
+        self.frame_name = frame_name
+        self.slice_dir = out_dir / f"tick_slices_{frame_name}"
+        self.slice_dir.mkdir(exist_ok=True)
+        self.slice_files = []
+        self.n_events = 0
+        self.stats = {
+            "total_events": 0,
+            "total_ticks": 0,
+            "avg_ticks_per_event": 0,
+            "min_ticks": float('inf'),
+            "max_ticks": 0
+        }
     
-    # Group ticks by bar and create individual slice files
-    for bar_idx, group in df.groupby(bar_idx_col):
-        if group.empty:
-            continue
+    def append(self, ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray, bar_lengths: np.ndarray):
+        ends = np.cumsum(bar_lengths)
+        for s, e in zip((ends - bar_lengths).tolist(), ends.tolist()):
+            event_id = self.n_events
+            self.n_events += 1
+            if e <= s:
+                continue
             
-        event_id = int(bar_idx)
-        slice_file = slice_dir / f"ticks_event_{event_id:06d}.parquet"
-        
-        # Prepare tick slice data with enhanced metadata
-        tick_slice = group[["ts_ns", "bid", "ask"]].copy()
-        tick_slice["event_id"] = event_id
-        tick_slice["tick_sequence"] = range(len(tick_slice))
-        
-        # Add timing information for First-Hit-Logic
-        if len(tick_slice) > 0:
-            tick_slice["time_from_bar_start_ns"] = tick_slice["ts_ns"] - tick_slice["ts_ns"].iloc[0]
-            tick_slice["mid_price"] = (tick_slice["bid"] + tick_slice["ask"]) / 2
-        
-        _write_parquet_optimized(tick_slice, slice_file, compress=True)
-        
-        slice_files.append({
-            "event_id": event_id,
-            "file": str(slice_file.relative_to(out_dir)),
-            "tick_count": len(tick_slice),
-            "time_span_ns": int(tick_slice["ts_ns"].iloc[-1] - tick_slice["ts_ns"].iloc[0]) if len(tick_slice) > 1 else 0
-        })
-        
-        # Update statistics
-        slice_stats["total_events"] += 1
-        slice_stats["total_ticks"] += len(tick_slice)
-        slice_stats["min_ticks"] = min(slice_stats["min_ticks"], len(tick_slice))
-        slice_stats["max_ticks"] = max(slice_stats["max_ticks"], len(tick_slice))
-    
-    if slice_stats["total_events"] > 0:
-        slice_stats["avg_ticks_per_event"] = slice_stats["total_ticks"] / slice_stats["total_events"]
+            slice_file = self.slice_dir / f"ticks_event_{event_id:06d}.parquet"
+            
+            # Prepare tick slice data with enhanced metadata
+            ts = ts_ns[s:e]
+            tick_slice = pd.DataFrame({
+                "ts_ns": ts, "bid": bid[s:e], "ask": ask[s:e],
+                "event_id": event_id,
+                "tick_sequence": np.arange(e - s),
+                # Timing information for First-Hit-Logic
+                "time_from_bar_start_ns": ts - ts[0],
+                "mid_price": (bid[s:e] + ask[s:e]) / 2,
+            })
+            
+            _write_parquet_optimized(tick_slice, slice_file, compress=True, profile="slices")
+            
+            self.slice_files.append({
+                "event_id": event_id,
+                "file": str(slice_file.relative_to(self.out_dir)),
+                "tick_count": len(tick_slice),
+                "time_span_ns": int(ts[-1] - ts[0]) if len(ts) > 1 else 0
+            })
+            
+            # Update statistics
+            self.stats["total_events"] += 1
+            self.stats["total_ticks"] += len(tick_slice)
+            self.stats["min_ticks"] = min(self.stats["min_ticks"], len(tick_slice))
+            self.stats["max_ticks"] = max(self.stats["max_ticks"], len(tick_slice))
+    
+    def close(self) -> Dict[str, Any]:
+        """Write the slice manifest; returns the slice statistics."""
+        slice_stats = self.stats
+        if slice_stats["total_events"] > 0:
+            slice_stats["avg_ticks_per_event"] = slice_stats["total_ticks"] / slice_stats["total_events"]
         slice_stats["min_ticks"] = slice_stats["min_ticks"] if slice_stats["min_ticks"] != float('inf') else 0
-    
-    # Write slice manifest
-    slice_manifest = {
-        "frame_name": frame_name,
-        "slice_directory": str(slice_dir.relative_to(out_dir)),
-        "files": slice_files,
-        "statistics": slice_stats,
-        "created_at": dt.datetime.utcnow().isoformat()
-    }
-    
-    manifest_path = slice_dir / "slice_manifest.json"
-    write_json(manifest_path, slice_manifest)
-    
-    return {
-        "enabled": True,
+        
+        # Write slice manifest
+        slice_manifest = {
+            "frame_name": self.frame_name,
+            "slice_directory": str(self.slice_dir.relative_to(self.out_dir)),
+            "files": self.slice_files,
+            "statistics": slice_stats,
+            "created_at": dt.datetime.utcnow().isoformat()
+        }
+        write_json(self.slice_dir / "slice_manifest.json", slice_manifest)
+        return slice_stats
+
+def _open_slice_writer(out_dir: pathlib.Path, frame_name: str, slice_format: str,
+                       codec: Optional[PriceCodec] = None):
+    """Per-event files, or a consolidated CSR store (TickSliceStore)"""
+    if slice_format == "csr":
+        return TickSliceStoreWriter(out_dir / f"tick_slices_{frame_name}", frame_name, codec=codec)
+    return _EventSliceWriter(out_dir, frame_name)
+
+def _slice_info(out_dir: pathlib.Path, frame_name: str, slice_format: str,
+                slice_stats: Dict[str, Any]) -> Dict[str, Any]:
+    slice_dir = out_dir / f"tick_slices_{frame_name}"
+    info = {"enabled": True}
+    if slice_format == "csr":
+        info["format"] = "csr"
+    info.update({
         "slice_directory": str(slice_dir.relative_to(out_dir)),
-        "manifest_path": str(manifest_path.relative_to(out_dir)),
+        "manifest_path": str((slice_dir / "slice_manifest.json").relative_to(out_dir)),
         "statistics": slice_stats
-    }
+    })
+    return info
 
-def _time_bars_1m_enhanced(df: pd.DataFrame, basis: str, symbol: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Enhanced 1-minute bars with improved tick slice organization"""
-    bar_idx_raw = df["ts_ns"] // (60 * 1_000_000_000)
-    df["bar_idx_1m"] = pd.factorize(bar_idx_raw)[0]
-    
-    mid = _compute_mid(df, basis)
-    grouped = df.groupby("bar_idx_1m")
-    
-    rows = []
-    for bar_idx, group in grouped:
-        if group.empty:
-            continue
-            
-        mi = _compute_mid(group, basis)
-        o, h, l, c = mi.iloc[0], mi.max(), mi.min(), mi.iloc[-1]
-        o_bid, o_ask = group["bid"].iloc[0], group["ask"].iloc[0]
-        c_bid, c_ask = group["bid"].iloc[-1], group["ask"].iloc[-1]
-        spread_mean = float((group["ask"] - group["bid"]).mean())
-        n_ticks = len(group)
-        t_open_ns = int(group["ts_ns"].iloc[0])
-        t_close_ns = int(group["ts_ns"].iloc[-1])
-        
-        rows.append([
-            symbol, "1m", t_open_ns, t_close_ns, o, h, l, c,
-            o_bid, o_ask, c_bid, c_ask, spread_mean, n_ticks, 0.0,
-            group.index[0], group.index[-1], 0
-        ])
+def _create_tick_slices(ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray, bars: pd.DataFrame,
+                        out_dir: pathlib.Path, frame_name: str, export_slices: bool = True,
+                        slice_format: str = "per_event", codec: Optional[PriceCodec] = None) -> Dict[str, Any]:
+    """
+    Enhanced tick slice creation with event-based organization
     
-    bars = pd.DataFrame(rows, columns=BAR_COLUMNS)
-    tick_slices = df[["bar_idx_1m", "ts_ns", "bid", "ask"]].copy()
+    Every bar covers the contiguous tick range [tick_first_id, tick_last_id], so
+    slices are plain array views (no groupby, no bar_idx column on the ticks).
+    per_event writes one file per bar for precise First-Hit-Logic; csr writes
+    one bar-ordered file plus offsets with row groups aligned to bar boundaries.
+    """
+    if not export_slices:
+        return {"enabled": False}
     
-    return bars, tick_slices
+    writer = _open_slice_writer(out_dir, frame_name, slice_format, codec)
+    if len(bars):
+        s = int(bars["tick_first_id"].iloc[0])
+        e = int(bars["tick_last_id"].iloc[-1]) + 1
+        writer.append(ts_ns[s:e], bid[s:e], ask[s:e], bars["n_ticks"].to_numpy())
+    return _slice_info(out_dir, frame_name, slice_format, writer.close())
 
-def _tick_bars_enhanced(df: pd.DataFrame, N: int, basis: str, symbol: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Enhanced tick bars with improved organization"""
-    total = len(df)
-    k = total // N + (1 if total % N else 0)
-    
-    bar_indices = np.repeat(np.arange(k), N)[:total]
-    df[f"bar_idx_{N}t"] = bar_indices
-    
-    rows = []
-    mid = _compute_mid(df, basis).values
-    
-    for i in range(k):
-        s = i * N
-        e = min((i + 1) * N, total)
-        seg = df.iloc[s:e]
-        if seg.empty:
-            continue
-            
-        mi = mid[s:e]
-        o, h, l, c = mi[0], mi.max(), mi.min(), mi[-1]
-        o_bid, o_ask = seg["bid"].iloc[0], seg["ask"].iloc[0]
-        c_bid, c_ask = seg["bid"].iloc[-1], seg["ask"].iloc[-1]
-        spread_mean = float((seg["ask"] - seg["bid"]).mean())
-        n_ticks = len(seg)
-        t_open_ns = int(seg["ts_ns"].iloc[0])
-        t_close_ns = int(seg["ts_ns"].iloc[-1])
-        
-        rows.append([
-            symbol, f"{N}t", t_open_ns, t_close_ns, o, h, l, c,
-            o_bid, o_ask, c_bid, c_ask, spread_mean, n_ticks, 0.0,
-            seg.index[0], seg.index[-1], 0
-        ])
-    
-    bars = pd.DataFrame(rows, columns=BAR_COLUMNS)
-    tick_slices = df[[f"bar_idx_{N}t", "ts_ns", "bid", "ask"]].copy()
-    
-    return bars, tick_slices
+# Streaming sizing: rows per CSV chunk / merge buffer = memory budget / bytes per tick
+_CSV_BYTES_PER_TICK = 512
+_MERGE_BYTES_PER_TICK = 128
+_BAR_FLUSH_ROWS = 65_536
 
-def run(config: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Enhanced DataIngest v2.2 with improved tick-slice export and manifest
+class _TickWindow:
     """
-    csv_path = pathlib.Path(config["csv_path"])
-    out_dir = pathlib.Path(config["out_dir"])
-    out_dir.mkdir(parents=True, exist_ok=True)
+    Ticks of bars still open in some frame (streaming tick-slice export)
     
-    symbol = config.get("symbol", "UNKNOWN")
-    basis = config.get("price_basis", "mid")
-    max_gap_s = config.get("max_gap_seconds", 300)
-    export_slices = config.get("export_slices", True)
-    
-    _log_line(out_dir, "start", 0, f"DataIngest v{MODULE_VERSION} starting")
+    Blocks are appended to a growable buffer with amortized doubling and
+    dropped from the front by moving an offset, so a long frame whose open
+    bar spans many blocks costs linear rather than quadratic copying.
+    Ticks are addressed by their global tick id.
+    """
     
+    def __init__(self, capacity: int = 1 << 16):
+        self.start = 0  # tick id of the first held tick
+        self._lo = self._hi = 0
+        self._arrays = (np.empty(capacity, np.int64), np.empty(capacity), np.empty(capacity))
+    
+    def append(self, ts: np.ndarray, bid: np.ndarray, ask: np.ndarray):
+        n = len(ts)
+        if self._hi + n > len(self._arrays[0]):
+            live = self._hi - self._lo
+            capacity = max(2 * (live + n), len(self._arrays[0]))
+            self._arrays = tuple(np.concatenate((a[self._lo:self._hi], np.empty(capacity - live, a.dtype)))
+                                 for a in self._arrays)
+            self._lo, self._hi = 0, live
+        for a, values in zip(self._arrays, (ts, bid, ask)):
+            a[self._hi:self._hi + n] = values
+        self._hi += n
+    
+    def slice(self, first_id: int, stop_id: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Views of ticks [first_id, stop_id); appends never overwrite them, so writers may keep them."""
+        s, e = self._lo + first_id - self.start, self._lo + stop_id - self.start
+        return tuple(a[s:e] for a in self._arrays)
+    
+    def drop_before(self, tick_id: int):
+        self._lo += tick_id - self.start
+        self.start = tick_id
+
+def _read_csv_chunks(csv_path: pathlib.Path, chunk_rows: int):
+    """pd.read_csv in bounded chunks (same parsing as the in-memory path)"""
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+        _ensure_cols(chunk)
+        yield chunk
+
+def _ingest_in_memory(csv_path: pathlib.Path, out_dir: pathlib.Path, config: Dict[str, Any],
+                      symbol: str, basis: str, max_gap_s: float, export_slices: bool,
+                      slice_format: str, ipc_cache: bool, parser: TimestampParser,
+                      codec: Optional[PriceCodec],
+                      tick_filter: Optional[TickFilter] = None) -> Tuple[int, Dict[str, Any], Dict[str, Any]]:
+    """Load the whole CSV, then sort, validate, filter, build bars, slices and quality stats"""
     # Load and validate data
     _log_line(out_dir, "load", 10, f"loading {csv_path}")
     df = pd.read_csv(csv_path)
     _ensure_cols(df)
     
     _log_line(out_dir, "normalize", 20, "normalize timestamps")
-    df = _normalize_time(df)
+    df = _normalize_time(df, parser, config.get("time_zone_in"))
     
     _log_line(out_dir, "sort", 30, "sort and dedupe")
     df = _sort_and_dedupe(df)
     
     _log_line(out_dir, "validate", 35, "quality checks")
     _neg_spread_check(df)
+    df = _filter_ticks(df, tick_filter)
     
     _log_line(out_dir, "gaps", 40, "gap analysis")
-    gaps, coverage = _gap_report(df, max_gap_s)
+    ts_ns = df["ts_ns"].to_numpy(dtype=np.int64)
+    bid = df["bid"].to_numpy(dtype=np.float64)
+    ask = df["ask"].to_numpy(dtype=np.float64)
+    volume = df["volume"].to_numpy(dtype=np.float64) if "volume" in df.columns else None
+    quality_acc = QualityAccumulator(max_gap_s, method=config.get("quantile_method", "exact"))
+    quality_acc.update(ts_ns, bid, ask)
     
     # Save normalized raw data
     raw_norm = out_dir / "raw_norm.parquet"
-    _write_parquet_optimized(df[["timestamp", "bid", "ask", "ts_ns"]], raw_norm)
+    raw = df[_tick_columns(df)]
+    if codec is not None:
+        raw = encode_table(pa.Table.from_pandas(raw, preserve_index=False), codec)
+    _write_parquet_optimized(raw, raw_norm, profile="ticks")
+    if ipc_cache:
+        write_ipc(raw, ipc_sibling(raw_norm))
     
     frames_out = {}
     
-    # Process bar frames with enhanced tick slice export
-    for frame in config.get("bar_frames", []):
-        if frame.get("type") == "time" and frame.get("unit") == "1m":
-            _log_line(out_dir, "bars_1m", 50, "building 1m bars with enhanced tick slices")
-            bars, tick_slices = _time_bars_1m_enhanced(df, basis, symbol)
-            
-            # Save bars
-            bars_path = out_dir / "bars_1m.parquet"
-            _write_parquet_optimized(bars, bars_path)
+    # Build all bar frames in one pass over the ticks, then export per frame
+    bar_frames = config.get("bar_frames", [])
+    _log_line(out_dir, "bars", 50, f"building {len(bar_frames)} bar frames in a single pass")
+    bars_by_frame = _build_bars(ts_ns, bid, ask, bar_frames, basis, symbol, config.get("engine", "numpy"), volume,
+                                config.get("pip_size", 0.0001))
+    
+    for i, (frame_name, bars) in enumerate(bars_by_frame.items()):
+        _log_line(out_dir, f"bars_{frame_name}", 50 + int(30 * i / len(bars_by_frame)),
+                  f"writing {frame_name} bars with enhanced tick slices")
+        bars_path = out_dir / _bars_filename(frame_name)
+        _write_parquet_optimized(bars, bars_path, profile="bars")
+        if ipc_cache:
+            write_ipc(bars, ipc_sibling(bars_path))
+        quality_acc.update_bars(frame_name, bars)
+        
+        # Create tick slices (one file per event, or a consolidated CSR store)
+        slice_info = _create_tick_slices(ts_ns, bid, ask, bars, out_dir, frame_name, export_slices, slice_format,
+                                         codec)
+        
+        frames_out[frame_name] = {
+            "path": str(bars_path.relative_to(out_dir)),
+            "tick_slices": slice_info
+        }
+        if ipc_cache:
+            frames_out[frame_name]["ipc_path"] = str(ipc_sibling(bars_path).relative_to(out_dir))
+    
+    # Enhanced quality report
+    _log_line(out_dir, "quality", 80, "generating enhanced quality report")
+    quality = quality_acc.report()
+    return int(len(df)), frames_out, quality
+
+def _ingest_streaming(csv_path: pathlib.Path, out_dir: pathlib.Path, config: Dict[str, Any],
+                      symbol: str, basis: str, max_gap_s: float, export_slices: bool,
+                      slice_format: str, ipc_cache: bool, parser: TimestampParser,
+                      codec: Optional[PriceCodec],
+                      tick_filter: Optional[TickFilter] = None) -> Tuple[int, Dict[str, Any], Dict[str, Any]]:
+    """
+    Out-of-core variant of the in-memory path with bounded memory
+    
+    The CSV is parsed in chunks sized from memory_limit_mb; each chunk is
+    normalized, stably sorted and spilled as a run, then the runs are merged
+    back in time order (a plain sequential read for monotonic input) and
+    deduplicated on the fly. The tick filter, bars, tick slices, raw_norm and
+    the quality statistics are all applied/produced incrementally on the
+    merged stream, so the outputs match the in-memory path.
+    """
+    budget = int(float(config.get("memory_limit_mb", 1024)) * 1024 * 1024)
+    merge_rows = max(budget // _MERGE_BYTES_PER_TICK, 1_000)
+    
+    _log_line(out_dir, "load", 10, f"streaming {csv_path} into sorted runs")
+    sorter = ExternalSorter(out_dir, merge_rows)
+    try:
+        for chunk in _read_csv_chunks(csv_path, max(budget // _CSV_BYTES_PER_TICK, 100)):
+            df = _normalize_time(chunk, parser, config.get("time_zone_in"))
+            _neg_spread_check(df)
+            sorter.add(pa.Table.from_pandas(df[_tick_columns(df)], preserve_index=False))
+        
+        _log_line(out_dir, "sort", 30, f"merging {len(sorter.runs)} sorted runs "
+                  f"({'monotonic input' if sorter.monotonic else 'external merge'})")
+        bar_engine = BarEngine(symbol, config.get("bar_frames", []), config.get("engine", "numpy"), basis,
+                               pip_size=config.get("pip_size", 0.0001))
+        writers = {}
+        if export_slices:
+            writers = {frame: _open_slice_writer(out_dir, frame, slice_format, codec) for frame in bar_engine.frames}
+        bar_writers = {frame: open_writer(out_dir / _bars_filename(frame), BAR_SCHEMA, "bars")
+                       for frame in bar_engine.frames}
+        pending = {frame: [] for frame in bar_engine.frames}
+        raw_norm = out_dir / "raw_norm.parquet"
+        raw_writer = raw_ipc = None
+        
+        # Ticks of bars that are still open in some frame (needed for their slices)
+        window = _TickWindow()
+        open_first = {frame: 0 for frame in bar_engine.frames}
+        
+        quality_acc = QualityAccumulator(max_gap_s, sorter.tmp_dir / "spread.bin", merge_rows,
+                                         config.get("quantile_method", "exact"))
+        
+        def emit(completed: Dict[str, pa.Table]):
+            for frame, table in completed.items():
+                pending[frame].append(table)
+                quality_acc.update_bars(frame, table)
+                if sum(t.num_rows for t in pending[frame]) >= _BAR_FLUSH_ROWS:
+                    bar_writers[frame].write_table(pa.concat_tables(pending[frame]))
+                    pending[frame].clear()
+                if export_slices:
+                    e = table.column("tick_last_id")[-1].as_py() + 1
+                    writers[frame].append(*window.slice(table.column("tick_first_id")[0].as_py(), e),
+                                          table.column("n_ticks").to_numpy())
+                    open_first[frame] = e
+            if export_slices:
+                window.drop_before(min(open_first.values()))
+        
+        for block in dedupe_sorted(sorter.merged(), ["ts_ns", "bid", "ask"]):
+            if tick_filter is not None:
+                block = block.filter(tick_filter.mask(block.column("ts_ns").to_numpy(),
+                                                      block.column("bid").to_numpy(), block.column("ask").to_numpy()))
+                if block.num_rows == 0:
+                    continue
+            raw_block = block if codec is None else encode_table(block, codec)
+            if raw_writer is None:
+                raw_writer = open_writer(raw_norm, raw_block.schema, "ticks")
+                if ipc_cache:
+                    raw_ipc = pa.ipc.new_file(str(ipc_sibling(raw_norm)), raw_block.schema)
+            raw_writer.write_table(raw_block)
+            if raw_ipc is not None:
+                raw_ipc.write_table(raw_block)
             
-            # Create event-based tick slices
-            slice_info = _create_event_tick_slices(
-                tick_slices, bars, out_dir, "1m", export_slices
-            )
+            ts = block.column("ts_ns").to_numpy()
+            bid = block.column("bid").to_numpy()
+            ask = block.column("ask").to_numpy()
+            volume = block.column("volume").to_numpy() if "volume" in block.schema.names else None
+            quality_acc.update(ts, bid, ask)
             
-            frames_out["1m"] = {
+            if export_slices:
+                window.append(ts, bid, ask)
+            emit(bar_engine.add_batch(ts, bid, ask, volume))
+        emit(bar_engine.finish())
+        
+        if raw_writer is None:
+            raise ValueError(f"{E.IO_ERROR}: no ticks in {csv_path}")
+        raw_writer.close()
+        if raw_ipc is not None:
+            raw_ipc.close()
+        
+        _log_line(out_dir, "bars", 70, f"finalizing {len(bar_engine.frames)} bar frames")
+        frames_out = {}
+        for frame_name in bar_engine.frames:
+            bars_path = out_dir / _bars_filename(frame_name)
+            if pending[frame_name]:
+                bar_writers[frame_name].write_table(pa.concat_tables(pending[frame_name]))
+            bar_writers[frame_name].close()
+            if ipc_cache:
+                write_ipc(pq.read_table(bars_path), ipc_sibling(bars_path))
+            slice_info = {"enabled": False}
+            if export_slices:
+                slice_info = _slice_info(out_dir, frame_name, slice_format, writers[frame_name].close())
+            frames_out[frame_name] = {
                 "path": str(bars_path.relative_to(out_dir)),
                 "tick_slices": slice_info
             }
-            
-        elif frame.get("type") == "tick":
-            N = int(frame.get("count", 0))
-            if N > 0:
-                _log_line(out_dir, f"bars_{N}t", 60, f"building {N}t bars with enhanced tick slices")
-                bars, tick_slices = _tick_bars_enhanced(df, N, basis, symbol)
-                
-                # Save bars
-                bars_path = out_dir / f"bars_{N}tick.parquet"
-                _write_parquet_optimized(bars, bars_path)
-                
-                # Create event-based tick slices
-                slice_info = _create_event_tick_slices(
-                    tick_slices, bars, out_dir, f"{N}t", export_slices
-                )
-                
-                frames_out[f"{N}t"] = {
-                    "path": str(bars_path.relative_to(out_dir)),
-                    "tick_slices": slice_info
-                }
+            if ipc_cache:
+                frames_out[frame_name]["ipc_path"] = str(ipc_sibling(bars_path).relative_to(out_dir))
+        
+        _log_line(out_dir, "quality", 80, "generating enhanced quality report")
+        quality = quality_acc.report()
+    finally:
+        sorter.cleanup()
+    return quality_acc.n, frames_out, quality
+
+def run(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Enhanced DataIngest v2.2 with improved tick-slice export and manifest
+    """
+    csv_path = pathlib.Path(config["csv_path"])
+    out_dir = pathlib.Path(config["out_dir"])
+    out_dir.mkdir(parents=True, exist_ok=True)
     
-    # Enhanced quality report
-    _log_line(out_dir, "quality", 80, "generating enhanced quality report")
-    quality = {
-        "n_raw_rows": int(len(df)),
-        "gap_items": gaps,
-        "gap_coverage_percent": coverage,
-        "neg_spread_found": False,
-        "spread_stats": {
-            "mean": float((df["ask"] - df["bid"]).mean()),
-            "std": float((df["ask"] - df["bid"]).std()),
-            "p50": float((df["ask"] - df["bid"]).quantile(0.5)),
-            "p95": float((df["ask"] - df["bid"]).quantile(0.95)),
-            "p99": float((df["ask"] - df["bid"]).quantile(0.99)),
-        },
-        "time_range": {
-            "start": pd.to_datetime(df["ts_ns"].iloc[0], unit='ns', utc=True).isoformat(),
-            "end": pd.to_datetime(df["ts_ns"].iloc[-1], unit='ns', utc=True).isoformat(),
-            "duration_hours": float((df["ts_ns"].iloc[-1] - df["ts_ns"].iloc[0]) / (3600 * 1_000_000_000))
-        }
-    }
+    symbol = config.get("symbol", "UNKNOWN")
+    basis = config.get("price_basis", "mid")
+    max_gap_s = config.get("max_gap_seconds", 300)
+    export_slices = config.get("export_slices", True)
+    slice_format = config.get("slice_format", "per_event")
+    ipc_cache = config.get("ipc_cache", False)
+    streaming = config.get("streaming", False)
+    if slice_format not in ("per_event", "csr"):
+        raise ValueError(f"Unknown slice_format: {slice_format}")
+    price_encoding = config.get("price_encoding", "float64")
+    if price_encoding not in PRICE_ENCODINGS:
+        raise ValueError(f"Unknown price_encoding: {price_encoding}")
+    if price_encoding == "fixed" and export_slices and slice_format != "csr":
+        raise ValueError("price_encoding 'fixed' needs slice_format 'csr' (per-event slices stay float64)")
+    codec = PriceCodec.for_pip_size(config.get("pip_size", 0.0001)) if price_encoding == "fixed" else None
+    
+    parser = TimestampParser(config.get("timestamp_format"))
+    tick_filter = TickFilter.from_config(config)
+    _log_line(out_dir, "start", 0, f"DataIngest v{MODULE_VERSION} starting")
+    
+    if streaming:
+        n_ticks, frames_out, quality = _ingest_streaming(
+            csv_path, out_dir, config, symbol, basis, max_gap_s, export_slices, slice_format, ipc_cache, parser,
+            codec, tick_filter)
+    else:
+        n_ticks, frames_out, quality = _ingest_in_memory(
+            csv_path, out_dir, config, symbol, basis, max_gap_s, export_slices, slice_format, ipc_cache, parser,
+            codec, tick_filter)
     write_json(out_dir / "quality_report.json", quality)
     
+    bar_store = config.get("bar_store")
+    if bar_store:
+        _log_line(out_dir, "bar_store", 85, f"writing bars to partitioned store {bar_store}")
+        for frame_name, info in frames_out.items():
+            write_bars(pq.read_table(out_dir / info["path"]), bar_store)
+            info["bar_store"] = {"root": str(bar_store), "symbol": symbol, "frame": frame_name}
+    
     # Enhanced manifest with v2.2 features
     _log_line(out_dir, "manifest", 90, "generating enhanced manifest")
     manifest = {
@@ -367,15 +529,23 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         "price_basis": basis,
         "pip_size": config.get("pip_size", 0.0001),
         "export_slices": export_slices,
+        "slice_format": slice_format,
+        **(codec.to_dict() if codec is not None else {"price_encoding": "float64"}),
+        "ipc_cache": ipc_cache,
+        "streaming": streaming,
+        "bar_store": str(bar_store) if bar_store else None,
+        "time_zone_in": config.get("time_zone_in", "UTC"),
+        "filters": tick_filter.report() if tick_filter is not None else None,
         "compression_enabled": True,
         "input": {
             "csv_path": str(csv_path),
             "sha256": sha256_of_file(csv_path) if csv_path.exists() else None,
-            "file_size_bytes": csv_path.stat().st_size if csv_path.exists() else 0
+            "file_size_bytes": csv_path.stat().st_size if csv_path.exists() else 0,
+            "timestamp_format": parser.format
         },
         "outputs": frames_out,
         "performance": {
-            "total_ticks_processed": int(len(df)),
+            "total_ticks_processed": n_ticks,
             "processing_time_estimate": "calculated_during_run"
         }
     }
@@ -0,0 +1,232 @@
+"""
+External sort helpers for out-of-core ingest (Module 1)
+
+Sorts a tick stream of any size by ts_ns under a fixed memory budget: chunks
+are stably sorted in memory and spilled as Arrow IPC runs, then a k-way merge
+streams them back in global order. Ties keep input order, so the result equals
+a mergesort over the whole input. If the input turns out to be monotonic the
+merge degenerates to reading the runs back in sequence.
+
+Also provides exact quantiles of a float64 column spilled to disk, found by
+repeated histogram refinement, so order statistics need not fit in memory.
+"""
+
+from __future__ import annotations
+import pathlib, shutil, tempfile
+from typing import Iterator, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+class ExternalSorter:
+    """
+    Spill stably sorted runs and merge them back in key order.
+
+    merge_rows bounds the number of rows buffered across all runs during the
+    merge; runs are spilled in small record batches and memory-mapped back, so
+    a run never has to be loaded as a whole.
+    """
+
+    def __init__(self, tmp_dir: pathlib.Path, merge_rows: int, key: str = "ts_ns"):
+        self.tmp_dir = pathlib.Path(tempfile.mkdtemp(prefix=".sort-", dir=tmp_dir))
+        self.merge_rows = int(merge_rows)
+        self.key = key
+        self.runs: List[pathlib.Path] = []
+        self.n_rows = 0
+        self.monotonic = True
+        self._last_key: Optional[int] = None
+
+    def add(self, table: pa.Table):
+        """Sort one chunk (stable) and spill it as a run."""
+        if table.num_rows == 0:
+            return
+        keys = table.column(self.key).to_numpy()
+        if np.any(keys[1:] < keys[:-1]):
+            self.monotonic = False
+            table = table.take(pa.array(np.argsort(keys, kind="stable")))
+            keys = table.column(self.key).to_numpy()
+        if self._last_key is not None and keys[0] < self._last_key:
+            self.monotonic = False
+        self._last_key = int(keys[-1])
+        path = self.tmp_dir / f"run-{len(self.runs):06d}.arrow"
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(self.merge_rows // 64, 1024))
+        self.runs.append(path)
+        self.n_rows += table.num_rows
+
+    def _open(self, path: pathlib.Path) -> pa.ipc.RecordBatchFileReader:
+        return pa.ipc.open_file(pa.memory_map(str(path), "r"))
+
+    def merged(self) -> Iterator[pa.Table]:
+        """Yield the spilled rows in key order, one bounded block at a time."""
+        if self.monotonic or len(self.runs) == 1:
+            for path in self.runs:
+                reader = self._open(path)
+                for i in range(reader.num_record_batches):
+                    yield pa.Table.from_batches([reader.get_batch(i)])
+            return
+        yield from self._kway_merge()
+
+    def _kway_merge(self) -> Iterator[pa.Table]:
+        readers = [self._open(path) for path in self.runs]
+        per_run = max(self.merge_rows // len(readers), 1)
+        next_batch = [0] * len(readers)
+        bufs: List[Optional[pa.Table]] = [None] * len(readers)
+
+        def load(r: int, rows: int):
+            # Append whole record batches until rows are buffered or the run ends
+            parts = [bufs[r]] if bufs[r] is not None and bufs[r].num_rows else []
+            have = sum(p.num_rows for p in parts)
+            while next_batch[r] < readers[r].num_record_batches and (have < rows or not parts):
+                batch = readers[r].get_batch(next_batch[r])
+                next_batch[r] += 1
+                parts.append(pa.Table.from_batches([batch]))
+                have += batch.num_rows
+            bufs[r] = pa.concat_tables(parts) if parts else None
+
+        for r in range(len(readers)):
+            load(r, per_run)
+        while True:
+            active = [r for r in range(len(readers)) if bufs[r] is not None and bufs[r].num_rows]
+            if not active:
+                return
+            keys = {r: bufs[r].column(self.key).to_numpy() for r in active}
+            # Rows below the smallest horizon of an unfinished run are final
+            horizons = [keys[r][-1] for r in active if next_batch[r] < readers[r].num_record_batches]
+            bound = min(horizons) if horizons else None
+            parts, part_keys = [], []
+            for r in active:
+                cut = len(keys[r]) if bound is None else int(np.searchsorted(keys[r], bound, side="left"))
+                if cut:
+                    parts.append(bufs[r].slice(0, cut))
+                    part_keys.append(keys[r][:cut])
+                    bufs[r] = bufs[r].slice(cut)
+            if parts:
+                block = pa.concat_tables(parts)
+                order = np.argsort(np.concatenate(part_keys), kind="stable")
+                yield block.take(pa.array(order))
+            for r in active:
+                if bufs[r].num_rows == 0:
+                    load(r, per_run)
+                elif not parts and keys[r][-1] == bound:
+                    # A run of equal keys fills the buffer: read further to make progress
+                    load(r, bufs[r].num_rows + per_run)
+
+    def cleanup(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+
+def dedupe_sorted(blocks: Iterator[pa.Table], subset: Sequence[str], key: str = "ts_ns") -> Iterator[pa.Table]:
+    """
+    Drop duplicate rows (keep first) from key-sorted blocks.
+
+    Duplicates share a key, so only rows with the same key need comparing; the
+    trailing equal-key group of each block is held back and joined to the next
+    block so groups split across blocks are deduplicated too.
+    """
+    carry: Optional[pa.Table] = None
+    for block in blocks:
+        if carry is not None:
+            block = pa.concat_tables([carry, block])
+        keys = block.column(key).to_numpy()
+        cut = int(np.searchsorted(keys, keys[-1], side="left"))
+        carry = block.slice(cut)
+        if cut:
+            yield _drop_duplicates(block.slice(0, cut), subset)
+    if carry is not None and carry.num_rows:
+        yield _drop_duplicates(carry, subset)
+
+
+def _drop_duplicates(table: pa.Table, subset: Sequence[str]) -> pa.Table:
+    dup = pd.DataFrame({c: table.column(c).to_numpy() for c in subset}).duplicated(keep="first").to_numpy()
+    return table.filter(pa.array(~dup)) if dup.any() else table
+
+
+def external_quantiles(path: pathlib.Path, qs: Sequence[float], max_rows: int,
+                       bins: int = 4096) -> List[float]:
+    """
+    Exact quantiles (pandas "linear" interpolation) of a raw float64 file.
+
+    Each needed order statistic is located by histogramming the candidate
+    value range and narrowing it to the bin holding the rank, until the bin
+    holds at most max_rows values (then sorted in memory) or a single value.
+    A bin too narrow to split further (a large block of tied values) is
+    resolved by counting its few distinct values instead.
+    Memory stays at one chunk of max_rows values plus the histograms.
+    """
+    data = np.memmap(path, dtype=np.float64, mode="r")
+    n = len(data)
+    if n == 0:
+        return [float("nan")] * len(qs)
+    step = max(int(max_rows), 1)
+
+    def chunks():
+        for s in range(0, n, step):
+            yield np.asarray(data[s:s + step])
+
+    bounds = [(float(c.min()), float(c.max())) for c in chunks()]
+    lo, hi = min(b[0] for b in bounds), max(b[1] for b in bounds)
+    ranks = sorted({int(np.floor(q * (n - 1))) for q in qs} | {min(int(np.floor(q * (n - 1))) + 1, n - 1) for q in qs})
+    # Per rank: [lo, hi, count below lo, count in [lo, hi]]
+    state = {k: [lo, hi, 0, n] for k in ranks}
+    values = {}
+    stuck = set()
+    while len(values) < len(ranks):
+        pending = [k for k in ranks if k not in values]
+        for k in pending:
+            a, b, below, count = state[k]
+            if a == b:
+                values[k] = a
+        pending = [k for k in pending if k not in values]
+        gather = [k for k in pending if state[k][3] <= step]
+        edges = {k: np.linspace(state[k][0], state[k][1], bins + 1) for k in pending
+                 if state[k][3] > step and k not in stuck}
+        # Edges of a range only a few ULPs wide collapse; such bins cannot shrink
+        stuck.update(k for k, e in edges.items() if not (np.diff(e) > 0).all())
+        tally = [k for k in pending if k in stuck and state[k][3] > step]
+        refine = [k for k in edges if k not in stuck]
+        counts = {k: np.zeros(bins, dtype=np.int64) for k in refine}
+        found = {k: [] for k in gather}
+        distinct = {k: {} for k in tally}
+        for c in chunks():
+            for k in gather:
+                a, b = state[k][0], state[k][1]
+                found[k].append(c[(c >= a) & (c <= b)])
+            for k in tally:
+                a, b = state[k][0], state[k][1]
+                for v, m in zip(*np.unique(c[(c >= a) & (c <= b)], return_counts=True)):
+                    distinct[k][float(v)] = distinct[k].get(float(v), 0) + int(m)
+            for k in refine:
+                counts[k] += np.histogram(c, bins=edges[k])[0]
+        for k in gather:
+            vals = np.sort(np.concatenate(found[k]))
+            values[k] = float(vals[k - state[k][2]])
+        for k in tally:
+            keys = sorted(distinct[k])
+            cum = np.cumsum([distinct[k][v] for v in keys])
+            values[k] = keys[int(np.searchsorted(cum, k - state[k][2], side="right"))]
+        for k in refine:
+            a, b, below, _ = state[k]
+            cum = np.cumsum(counts[k])
+            j = int(np.searchsorted(cum, k - below, side="right"))
+            new_below = below + (int(cum[j - 1]) if j else 0)
+            new_lo, new_hi = float(edges[k][j]), float(edges[k][j + 1])
+            if j < bins - 1:
+                # Bins are half open except the last; stay inside [lo, next edge)
+                new_hi = float(np.nextafter(new_hi, -np.inf))
+            if new_hi < new_lo:
+                new_hi = new_lo
+            if (new_lo, new_hi) == (a, b):
+                stuck.add(k)
+            state[k] = [new_lo, new_hi, new_below, int(counts[k][j])]
+    out = []
+    for q in qs:
+        pos = q * (n - 1)
+        k = int(np.floor(pos))
+        k1 = min(k + 1, n - 1)
+        t = pos - k
+        a, b = values[k], values[k1]
+        # Same lerp as numpy (and therefore pandas) uses
+        out.append(float(b - (b - a) * (1 - t) if t >= 0.5 else a + (b - a) * t))
+    return out
@@ -0,0 +1,75 @@
+"""
+Memory-mapped Arrow IPC cache for Module 1 outputs
+
+Ingest can write an uncompressed Arrow IPC (Feather v2) sibling next to each
+Parquet output (raw_norm.parquet -> raw_norm.arrow, bars_1m.parquet ->
+bars_1m.arrow). Downstream modules load tables through read_table(), which
+memory-maps the sibling when it is present and not older than the Parquet
+file. Nothing is decoded or decompressed on load, and concurrent processes
+share the same page-cache pages. Fixed-point tick tables (fixed_point) are
+decoded back to float prices unless decode=False.
+"""
+
+from __future__ import annotations
+import os, pathlib
+from typing import List, Optional, Union
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from .fixed_point import PriceCodec, decode_table
+
+IPC_SUFFIX = ".arrow"
+
+PathLike = Union[str, pathlib.Path]
+
+
+def ipc_sibling(path: PathLike) -> pathlib.Path:
+    """The Arrow IPC cache path belonging to a Parquet output."""
+    return pathlib.Path(path).with_suffix(IPC_SUFFIX)
+
+
+def write_ipc(data: Union[pd.DataFrame, pa.Table], path: PathLike) -> pathlib.Path:
+    """Write an uncompressed Arrow IPC file atomically (tmp + rename)."""
+    path = pathlib.Path(path)
+    table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+    tmp = path.with_name(path.name + ".tmp")
+    feather.write_feather(table, tmp, compression="uncompressed")
+    os.replace(tmp, path)
+    return path
+
+
+def _cached_path(path: pathlib.Path) -> Optional[pathlib.Path]:
+    if path.suffix == IPC_SUFFIX:
+        return path
+    sibling = ipc_sibling(path)
+    if sibling.exists() and (not path.exists() or sibling.stat().st_mtime >= path.stat().st_mtime):
+        return sibling
+    return None
+
+
+def read_arrow(path: PathLike, columns: Optional[List[str]] = None, decode: bool = True) -> pa.Table:
+    """
+    Load a table, memory-mapping the Arrow IPC sibling if one is usable.
+
+    Falls back to reading the Parquet file itself.
+    """
+    path = pathlib.Path(path)
+    cached = _cached_path(path)
+    if cached is not None:
+        with pa.memory_map(str(cached), "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+        table = table.select(columns) if columns else table
+    else:
+        table = pq.read_table(path, columns=columns)
+    return decode_table(table) if decode else table
+
+
+def read_table(path: PathLike, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Drop-in for pd.read_parquet that prefers the memory-mapped IPC cache."""
+    path = pathlib.Path(path)
+    if _cached_path(path) is None and (
+            path.is_dir() or PriceCodec.from_metadata(pq.read_schema(path).metadata) is None):
+        return pd.read_parquet(path, columns=columns)
+    return read_arrow(path, columns).to_pandas(split_blocks=True)
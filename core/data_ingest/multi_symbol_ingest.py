@@ -0,0 +1,166 @@
+"""
+Multi-symbol ingest for Module 1
+
+Runs data_ingest_v22 for many symbols with one shared schedule (bar_frames,
+price basis, engine, ...), one symbol per worker process, into
+out_dir/<symbol>/, and aligns the bars of one time frame (panel_frame,
+default 1m) of all symbols into a wide panel:
+
+    panel_<frame>.parquet   t_open_ns (bucket start, int64 ns) and one
+                            column per field and symbol, named
+                            "<field>.<symbol>" (e.g. "c.EURUSD")
+
+Rows are the union of the buckets in which any symbol traded; a symbol
+without ticks in a bucket has NaN prices and n_ticks (and v_sum) 0 there.
+Reading a few fields of a few symbols touches only those columns
+(read_panel), so cross-sectional features need neither per-symbol reads nor
+merges.
+
+Config: symbols ({symbol: csv path} or {symbol: {csv_path, ...per-symbol
+overrides such as pip_size}}), out_dir, workers (default: CPU count),
+panel_frame, panel_fields, and any data_ingest_v22 key applied to every
+symbol.
+"""
+
+from __future__ import annotations
+import json, os, pathlib, datetime as dt
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from . import errors as E
+from . import data_ingest_v22
+from .bar_engine import DEFAULT_BAR_FRAMES, parse_bar_frames
+from .batch_ingest import pool_map
+from .parquet_profiles import write_table
+from .util import write_json
+
+MODULE_VERSION = "1.0"
+DEFAULT_PANEL_FIELDS = ("o", "h", "l", "c", "spread_mean", "n_ticks")
+# Fields a symbol without ticks in a bucket gets 0 for (counts, ids, flags and
+# the traded volume); every other field is NaN there
+_ZERO_FILLED_FIELDS = ("n_ticks", "v_sum", "tick_first_id", "tick_last_id", "t_open_ns", "t_close_ns", "gap_flag")
+
+
+def _log_line(out_dir: pathlib.Path, step: str, pct: int, msg: str):
+    p = out_dir / "progress.jsonl"
+    with p.open("a", encoding="utf-8") as f:
+        f.write(json.dumps({
+            "timestamp": dt.datetime.utcnow().isoformat(),
+            "module": "data_ingest_multi",
+            "step": step, "percent": pct, "message": msg
+        }) + "\n")
+
+
+def _symbol_configs(config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Per-symbol data_ingest_v22 configs: shared keys + symbol overrides."""
+    symbols = config.get("symbols")
+    if not symbols:
+        raise ValueError(f"{E.IO_ERROR}: no input symbols (set 'symbols')")
+    out_dir = pathlib.Path(config["out_dir"])
+    shared = {k: v for k, v in config.items()
+              if k not in ("symbols", "out_dir", "workers", "panel_frame", "panel_fields")}
+    configs = {}
+    for symbol, entry in symbols.items():
+        entry = {"csv_path": entry} if isinstance(entry, (str, os.PathLike)) else dict(entry)
+        if "csv_path" not in entry:
+            raise ValueError(f"{E.IO_ERROR}: no csv_path for symbol {symbol}")
+        configs[symbol] = {**shared, **entry, "symbol": symbol, "csv_path": str(entry["csv_path"]),
+                           "out_dir": str(out_dir / symbol)}
+    return configs
+
+
+def _panel_frame(config: Dict[str, Any]) -> Tuple[str, int, List[Dict[str, Any]]]:
+    """Panel frame name, its period in ns and the bar_frames list that includes it."""
+    bar_frames = list(config.get("bar_frames") or DEFAULT_BAR_FRAMES)
+    unit = config.get("panel_frame", "1m")
+    name, _, period = parse_bar_frames([{"type": "time", "unit": unit}])[0]
+    if name not in [n for n, _, _ in parse_bar_frames(bar_frames)]:
+        bar_frames.append({"type": "time", "unit": unit})
+    return name, period, bar_frames
+
+
+def _ingest_symbol(cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker: single-symbol ingest; numba threads are per process."""
+    return data_ingest_v22.run(cfg)
+
+
+def build_panel(bar_files: Dict[str, pathlib.Path], period_ns: int,
+                fields: Sequence[str] = DEFAULT_PANEL_FIELDS) -> pa.Table:
+    """
+    Align the bars of one time frame of several symbols on a shared bucket
+    grid (see module docstring); symbols keep the order of bar_files.
+    """
+    fields = list(fields)
+    bars = {symbol: pq.read_table(path, columns=["t_open_ns"] + fields) for symbol, path in bar_files.items()}
+    buckets = {symbol: t.column("t_open_ns").to_numpy() // period_ns * period_ns for symbol, t in bars.items()}
+    grid = np.unique(np.concatenate(list(buckets.values()))) if buckets else np.empty(0, dtype=np.int64)
+    columns = {"t_open_ns": pa.array(grid, type=pa.int64())}
+    for field in fields:
+        for symbol, table in bars.items():
+            pos = np.searchsorted(grid, buckets[symbol])
+            values = table.column(field).to_numpy()
+            if field in _ZERO_FILLED_FIELDS:
+                col = np.zeros(len(grid), dtype=values.dtype)
+            else:
+                col = np.full(len(grid), np.nan)
+            col[pos] = values
+            columns[f"{field}.{symbol}"] = pa.array(col)
+    return pa.table(columns)
+
+
+def read_panel(path: Any, symbols: Optional[Sequence[str]] = None,
+               fields: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Panel as a DataFrame indexed by bucket start (UTC) with (field, symbol)
+    column levels, so panel["c"] is the time x symbol close matrix. Only the
+    requested symbols and fields are read from disk.
+    """
+    names = [n for n in pq.read_schema(path).names if n != "t_open_ns"]
+    keep = [n for n in names
+            if (fields is None or n.split(".", 1)[0] in fields)
+            and (symbols is None or n.split(".", 1)[1] in symbols)]
+    table = pq.read_table(path, columns=["t_open_ns"] + keep)
+    df = table.select(keep).to_pandas()
+    df.index = pd.to_datetime(table.column("t_open_ns").to_numpy(), utc=True)
+    df.index.name = "timestamp"
+    df.columns = pd.MultiIndex.from_tuples([tuple(n.split(".", 1)) for n in keep], names=["field", "symbol"])
+    return df
+
+
+def run(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Multi-symbol ingest and panel build (see module docstring)."""
+    out_dir = pathlib.Path(config["out_dir"])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    frame, period, bar_frames = _panel_frame(config)
+    configs = _symbol_configs({**config, "bar_frames": bar_frames})
+    workers = int(config.get("workers") or os.cpu_count() or 1)
+
+    _log_line(out_dir, "ingest", 5, f"ingesting {len(configs)} symbols on {workers} workers")
+    results = dict(zip(configs, pool_map(_ingest_symbol, list(configs.values()), workers)))
+
+    _log_line(out_dir, "panel", 80, f"aligning {frame} bars of {len(configs)} symbols")
+    fields = list(config.get("panel_fields", DEFAULT_PANEL_FIELDS))
+    bar_files = {symbol: out_dir / symbol / result["frames"][frame]["path"] for symbol, result in results.items()}
+    panel = build_panel(bar_files, period, fields)
+    panel_path = out_dir / f"panel_{frame}.parquet"
+    write_table(panel, panel_path, "bars")
+
+    manifest = {
+        "run_ts": dt.datetime.utcnow().isoformat(),
+        "module": "data_ingest_multi",
+        "module_version": MODULE_VERSION,
+        "symbols": list(configs),
+        "workers": workers,
+        "inputs": {symbol: {"manifest": str(pathlib.Path(result["manifest"]).relative_to(out_dir))}
+                   for symbol, result in results.items()},
+        "outputs": {
+            "panel": {"path": panel_path.name, "frame": frame, "fields": fields,
+                      "n_rows": panel.num_rows, "n_symbols": len(configs)},
+        },
+    }
+    write_json(out_dir / "manifest.json", manifest)
+    _log_line(out_dir, "done", 100, f"ingested {len(configs)} symbols, panel {panel.num_rows} x {len(configs)}")
+    return manifest
@@ -0,0 +1,107 @@
+"""
+Long-lived Parquet part writer for the streaming ingestors (Module 1)
+
+One RollingParquetWriter per output directory (bars_<frame>, tick_slices_*)
+keeps a single pq.ParquetWriter open and appends a row group whenever
+row_group_rows rows are buffered, instead of writing a new part file per
+flush. The file grows under a .tmp-<token>.parquet name and is renamed to
+part-NNNNN.parquet atomically by roll()/close(), so readers and resume never
+see a half-written part. With max_file_bytes the writer rolls to the next
+part once the current one reaches that size on disk.
+"""
+
+from __future__ import annotations
+import os, pathlib, re, uuid
+from typing import List, Optional
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .parquet_profiles import open_writer, row_group_rows as profile_row_group_rows
+
+_PART_RE = re.compile(r"^part-(\d+)\.parquet$")
+
+
+def _next_part_index(directory: pathlib.Path) -> int:
+    indices = [int(m.group(1)) for m in map(_PART_RE.match, os.listdir(directory)) if m]
+    return max(indices) + 1 if indices else 0
+
+
+class RollingParquetWriter:
+    """
+    Append-only writer for one output directory.
+
+    row_group_rows defaults to the profile's byte target (parquet_profiles);
+    part numbering continues after existing part files, so a resumed run adds
+    parts behind the committed ones.
+    """
+
+    def __init__(self, directory: pathlib.Path, schema: pa.Schema, profile: str,
+                 row_group_rows: Optional[int] = None, max_file_bytes: Optional[int] = None,
+                 compression: str = "zstd"):
+        self.directory = pathlib.Path(directory)
+        self.schema = schema
+        self.profile = profile
+        self.row_group_rows = int(row_group_rows) if row_group_rows else None
+        self.max_file_bytes = int(max_file_bytes) if max_file_bytes else None
+        self.compression = compression
+        self.files: List[str] = []
+        self._buffer: List[pa.Table] = []
+        self._buffered = 0
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._tmp: Optional[pathlib.Path] = None
+        self._next_index: Optional[int] = None
+
+    def write(self, table: pa.Table):
+        """Buffer rows; every full row_group_rows block is written as one row group."""
+        if table.num_rows == 0:
+            return
+        if self.row_group_rows is None:
+            self.row_group_rows = profile_row_group_rows(table, self.profile)
+        self._buffer.append(table)
+        self._buffered += table.num_rows
+        if self._buffered >= self.row_group_rows:
+            pending = pa.concat_tables(self._buffer)
+            full = pending.num_rows - pending.num_rows % self.row_group_rows
+            self._write_row_groups(pending.slice(0, full))
+            rest = pending.slice(full)
+            self._buffer = [rest] if rest.num_rows else []
+            self._buffered = rest.num_rows
+
+    def flush(self):
+        """Write the buffered rows as a (possibly short) row group."""
+        if self._buffer:
+            self._write_row_groups(pa.concat_tables(self._buffer))
+            self._buffer, self._buffered = [], 0
+
+    def _write_row_groups(self, table: pa.Table):
+        if self._writer is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._tmp = self.directory / f".tmp-{uuid.uuid4().hex}.parquet"
+            self._writer = open_writer(self._tmp, self.schema, self.profile, compression=self.compression)
+        self._writer.write_table(table, row_group_size=self.row_group_rows or max(table.num_rows, 1))
+        if self.max_file_bytes is not None and self._tmp.stat().st_size >= self.max_file_bytes:
+            self._finalize()
+
+    def _finalize(self) -> Optional[str]:
+        if self._writer is None:
+            return None
+        self._writer.close()
+        if self._next_index is None:
+            self._next_index = _next_part_index(self.directory)
+        final = self.directory / f"part-{self._next_index:05d}.parquet"
+        os.replace(self._tmp, final)
+        self._next_index += 1
+        self._writer, self._tmp = None, None
+        self.files.append(str(final))
+        return str(final)
+
+    def roll(self) -> Optional[str]:
+        """Flush and finalize the current part; returns its path (None if nothing was written)."""
+        self.flush()
+        return self._finalize()
+
+    def close(self) -> List[str]:
+        """Finalize the last part; returns all parts this writer produced."""
+        self.roll()
+        return self.files
+
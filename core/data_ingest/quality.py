@@ -0,0 +1,263 @@
+"""
+Quality report engine for Module 1
+
+Vectorized replacement for the per-diff gap loop and the repeated spread
+computations of the quality report. Statistics are accumulated chunk by chunk
+(Welford/Chan moments, gap lists, first/last timestamps), so the same code
+serves the in-memory path (one chunk) and the streaming ingestors; partial
+accumulators of consecutive partitions can be merged.
+
+Spread quantiles are exact by default: the spread column is either kept in
+memory (one np.quantile call at the end) or spilled to a raw float64 file and
+resolved with external_quantiles when memory is bounded. With
+method="sketch" a mergeable KLL sketch is kept instead (O(1) memory, no
+spill). Per bar frame, spread_mean and tick-rate percentiles are always
+sketched; sketch states are included in the report so reports of different
+files or workers can be combined.
+"""
+
+from __future__ import annotations
+import pathlib, shutil
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from .external_sort import external_quantiles
+from .sketch import QuantileSketch
+
+NS_PER_SECOND = 1_000_000_000
+SPREAD_QUANTILES = (0.5, 0.95, 0.99)
+QUANTILE_METHODS = ("exact", "sketch")
+
+
+def _percentiles(values: Sequence[float]) -> Dict[str, float]:
+    return {f"p{round(q * 100)}": v for q, v in zip(SPREAD_QUANTILES, values)}
+
+
+def gap_items(ts_ns: np.ndarray, max_gap_s: float,
+              prev_ts: Optional[int] = None) -> Tuple[List[Dict[str, Any]], float]:
+    """
+    Gaps longer than max_gap_s in a time-ordered ns array.
+
+    prev_ts is the last timestamp of the preceding chunk, so a gap across the
+    chunk boundary is reported too. Returns (gap list, total gap seconds).
+    """
+    t = ts_ns if prev_ts is None else np.concatenate(([prev_ts], ts_ns))
+    diffs = np.diff(t) / NS_PER_SECOND
+    idx = np.flatnonzero(diffs > max_gap_s)
+    if len(idx) == 0:
+        return [], 0.0
+    starts = pd.to_datetime(t[idx], unit="ns", utc=True)
+    ends = pd.to_datetime(t[idx + 1], unit="ns", utc=True)
+    durations = diffs[idx]
+    gaps = [
+        {"start": s.isoformat(), "end": e.isoformat(), "duration_seconds": float(d)}
+        for s, e, d in zip(starts, ends, durations)
+    ]
+    return gaps, float(durations.sum())
+
+
+class QualityAccumulator:
+    """
+    Incremental quality statistics over time-ordered tick chunks.
+
+    With spill_path set, spreads are appended to that file instead of being
+    kept in memory, and quantile_rows bounds the rows loaded at once when the
+    quantiles are resolved. method="sketch" replaces both with a KLL sketch.
+    """
+
+    def __init__(self, max_gap_s: float, spill_path: Optional[pathlib.Path] = None,
+                 quantile_rows: int = 1_000_000, method: str = "exact"):
+        if method not in QUANTILE_METHODS:
+            raise ValueError(f"Unknown quantile method: {method} (expected one of {QUANTILE_METHODS})")
+        if method == "sketch":
+            spill_path = None
+        self.max_gap_s = max_gap_s
+        self.method = method
+        self.spill_path = pathlib.Path(spill_path) if spill_path is not None else None
+        self.quantile_rows = quantile_rows
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.neg_spread_count = 0
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None
+        self.gaps: List[Dict[str, Any]] = []
+        self.gap_seconds = 0.0
+        self._spreads: List[np.ndarray] = []
+        self.spread_sketch = QuantileSketch() if method == "sketch" else None
+        self.frame_sketches: Dict[str, Dict[str, QuantileSketch]] = {}
+        if self.spill_path is not None:
+            self.spill_path.write_bytes(b"")
+
+    def _merge_moments(self, n: int, mean: float, m2: float):
+        total = self.n + n
+        if n == 0:
+            return
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    def _add_spreads(self, spread: np.ndarray):
+        if self.spread_sketch is not None:
+            self.spread_sketch.update(spread)
+        elif self.spill_path is not None:
+            with self.spill_path.open("ab") as f:
+                spread.tofile(f)
+        else:
+            self._spreads.append(spread)
+
+    def update(self, ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray):
+        """Add the next chunk of ticks (chunks must arrive in time order)."""
+        if len(ts_ns) == 0:
+            return
+        spread = np.asarray(ask, dtype=np.float64) - np.asarray(bid, dtype=np.float64)
+        chunk_mean = float(spread.mean())
+        self._merge_moments(len(spread), chunk_mean, float(np.square(spread - chunk_mean).sum()))
+        self.neg_spread_count += int(np.count_nonzero(spread < 0))
+        self._add_spreads(spread)
+        gaps, seconds = gap_items(ts_ns, self.max_gap_s, self.last_ts)
+        self.gaps.extend(gaps)
+        self.gap_seconds += seconds
+        if self.first_ts is None:
+            self.first_ts = int(ts_ns[0])
+        self.last_ts = int(ts_ns[-1])
+
+    def update_bars(self, frame: str, bars) -> None:
+        """Add finished bars (pa.Table or DataFrame in BAR_SCHEMA layout) of a frame."""
+        n_ticks = np.asarray(bars["n_ticks"], dtype=np.float64)
+        if len(n_ticks) == 0:
+            return
+        sketches = self.frame_sketches.setdefault(frame, {"spread_mean": QuantileSketch(),
+                                                          "tick_rate": QuantileSketch()})
+        sketches["spread_mean"].update(np.asarray(bars["spread_mean"], dtype=np.float64))
+        duration_s = (np.asarray(bars["t_close_ns"]) - np.asarray(bars["t_open_ns"])) / NS_PER_SECOND
+        # Ticks per second; single-instant bars have no defined rate
+        positive = duration_s > 0
+        sketches["tick_rate"].update(n_ticks[positive] / duration_s[positive])
+
+    def merge(self, other: "QualityAccumulator") -> "QualityAccumulator":
+        """Append the statistics of the partition that follows this one in time."""
+        if other.n == 0:
+            return self
+        if self.last_ts is not None:
+            gaps, seconds = gap_items(np.array([other.first_ts], dtype=np.int64), self.max_gap_s, self.last_ts)
+            self.gaps.extend(gaps)
+            self.gap_seconds += seconds
+        self.gaps.extend(other.gaps)
+        self.gap_seconds += other.gap_seconds
+        self._merge_moments(other.n, other.mean, other.m2)
+        self.neg_spread_count += other.neg_spread_count
+        for frame, sketches in other.frame_sketches.items():
+            mine = self.frame_sketches.setdefault(frame, {name: QuantileSketch() for name in sketches})
+            for name, sketch in sketches.items():
+                mine[name].merge(sketch)
+        if self.spread_sketch is not None or other.spread_sketch is not None:
+            if self.spread_sketch is None or other.spread_sketch is None:
+                raise ValueError("Cannot merge exact and sketch quality accumulators")
+            self.spread_sketch.merge(other.spread_sketch)
+        elif other.spill_path is not None:
+            if self.spill_path is not None:
+                with self.spill_path.open("ab") as dst, other.spill_path.open("rb") as src:
+                    shutil.copyfileobj(src, dst)
+            else:
+                self._spreads.append(np.fromfile(other.spill_path, dtype=np.float64))
+        else:
+            for spread in other._spreads:
+                self._add_spreads(spread)
+        self.first_ts = other.first_ts if self.first_ts is None else self.first_ts
+        self.last_ts = other.last_ts
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        JSON-serializable state for resuming accumulation. Exact spreads are
+        only referenced through the spill file (its current length is
+        recorded), so in-memory exact accumulators cannot be serialized.
+        """
+        if self.method != "sketch" and self.spill_path is None:
+            raise ValueError("Only sketch or spilling quality accumulators can be serialized")
+        return {
+            "max_gap_s": self.max_gap_s, "method": self.method, "n": self.n, "mean": self.mean, "m2": self.m2,
+            "neg_spread_count": self.neg_spread_count,
+            "first_ts": self.first_ts, "last_ts": self.last_ts,
+            "gaps": self.gaps, "gap_seconds": self.gap_seconds,
+            "spread_sketch": self.spread_sketch.to_dict() if self.spread_sketch is not None else None,
+            "spill_path": str(self.spill_path) if self.spill_path is not None else None,
+            "spill_bytes": self.spill_path.stat().st_size if self.spill_path is not None else 0,
+            "quantile_rows": self.quantile_rows,
+            "frames": {frame: {name: sk.to_dict() for name, sk in sketches.items()}
+                       for frame, sketches in self.frame_sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "QualityAccumulator":
+        """Restore a to_dict() state; a spill file is cut back to its recorded length."""
+        acc = cls(state["max_gap_s"], quantile_rows=state.get("quantile_rows", 1_000_000),
+                  method=state.get("method", "sketch"))
+        acc.n, acc.mean, acc.m2 = int(state["n"]), float(state["mean"]), float(state["m2"])
+        acc.neg_spread_count = int(state["neg_spread_count"])
+        acc.first_ts, acc.last_ts = state["first_ts"], state["last_ts"]
+        acc.gaps, acc.gap_seconds = list(state["gaps"]), float(state["gap_seconds"])
+        if state.get("spread_sketch") is not None:
+            acc.spread_sketch = QuantileSketch.from_dict(state["spread_sketch"])
+        if state.get("spill_path") is not None:
+            acc.spill_path = pathlib.Path(state["spill_path"])
+            with acc.spill_path.open("r+b") as f:
+                f.truncate(state["spill_bytes"])
+        acc.frame_sketches = {frame: {name: QuantileSketch.from_dict(sk) for name, sk in sketches.items()}
+                              for frame, sketches in state["frames"].items()}
+        return acc
+
+    def spread_quantiles(self, qs=SPREAD_QUANTILES) -> List[float]:
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+        if self.spread_sketch is not None:
+            return self.spread_sketch.quantiles(qs)
+        if self.spill_path is not None:
+            return external_quantiles(self.spill_path, qs, self.quantile_rows)
+        spread = self._spreads[0] if len(self._spreads) == 1 else np.concatenate(self._spreads)
+        return [float(v) for v in np.quantile(spread, qs)]
+
+    def report(self) -> Dict[str, Any]:
+        """Quality report in the data_ingest v2.2 layout."""
+        total_s = (self.last_ts - self.first_ts) / NS_PER_SECOND if self.n else 0
+        coverage = max(0, 100 * (1 - self.gap_seconds / total_s)) if total_s > 0 else 100.0
+        p50, p95, p99 = self.spread_quantiles(SPREAD_QUANTILES)
+        report = {
+            "n_raw_rows": int(self.n),
+            "gap_items": self.gaps,
+            "gap_coverage_percent": coverage,
+            "neg_spread_found": self.neg_spread_count > 0,
+            "spread_stats": {
+                "mean": float(self.mean) if self.n else float("nan"),
+                "std": float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float("nan"),
+                "p50": p50,
+                "p95": p95,
+                "p99": p99,
+            },
+            "time_range": {
+                "start": pd.to_datetime(self.first_ts, unit="ns", utc=True).isoformat() if self.n else None,
+                "end": pd.to_datetime(self.last_ts, unit="ns", utc=True).isoformat() if self.n else None,
+                "duration_hours": float(total_s / 3600),
+            },
+            "quantile_method": self.method,
+        }
+        if self.frame_sketches:
+            report["frame_stats"] = {
+                frame: {"n_bars": sketches["spread_mean"].n,
+                        **{name: _percentiles(sk.quantiles(SPREAD_QUANTILES)) for name, sk in sketches.items()}}
+                for frame, sketches in self.frame_sketches.items()
+            }
+        sketch_states = {}
+        if self.spread_sketch is not None:
+            sketch_states["spread"] = self.spread_sketch.to_dict()
+        if self.frame_sketches:
+            sketch_states["frames"] = {
+                frame: {name: sk.to_dict() for name, sk in sketches.items()}
+                for frame, sketches in self.frame_sketches.items()
+            }
+        if sketch_states:
+            report["sketches"] = sketch_states
+        return report
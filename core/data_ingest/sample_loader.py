@@ -10,6 +10,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional, Tuple
 import io
 
+from .timestamps import DATETIME, EPOCH_UNITS, ISO8601, PANDAS, detect_format, parse_timestamps
+
 
 class SampleLoader:
     """Load and validate data samples for preview and validation"""
@@ -143,51 +145,35 @@ class SampleLoader:
         }
         
         try:
-            # Try to parse first few timestamps
-            sample_timestamps = timestamp_series.head(5).dropna()
+            sample_timestamps = timestamp_series.dropna()
             
             if sample_timestamps.empty:
                 validation["timestamp_issues"].append("Keine gültigen Zeitstempel gefunden")
                 return validation
             
-            # Check for common formats
-            first_ts = str(sample_timestamps.iloc[0])
-            
-            # ISO 8601 format check
-            if 'T' in first_ts:
-                validation["timestamp_format"] = "ISO8601"
-                
-                if first_ts.endswith('Z'):
-                    validation["timezone_info"] = "UTC (Z)"
-                elif '+' in first_ts or first_ts.count('-') > 2:
-                    validation["timezone_info"] = "Mit Timezone"
-                else:
-                    validation["timezone_info"] = "Ohne Timezone"
-                
-                # Try to parse
-                try:
-                    pd.to_datetime(sample_timestamps)
-                    validation["timestamp_valid"] = True
-                except Exception as e:
-                    validation["timestamp_issues"].append(f"Parse-Fehler: {str(e)}")
+            # Same detection and parser as the ingest modules
+            fmt = detect_format(sample_timestamps)
+            validation["timestamp_format"] = fmt
+            if fmt == ISO8601:
+                zoned_z = str(sample_timestamps.iloc[0]).strip().endswith('Z')
+                validation["timezone_info"] = "UTC (Z)" if zoned_z else "Mit Timezone"
+            elif fmt in EPOCH_UNITS:
+                validation["timezone_info"] = "UTC (Epoch)"
+            elif fmt == DATETIME:
+                tz = getattr(sample_timestamps.dtype, "tz", None)
+                validation["timezone_info"] = str(tz) if tz is not None else "Ohne Timezone"
+            elif fmt != PANDAS:
+                validation["timezone_info"] = "Ohne Timezone"
             
-            else:
-                # Try other common formats
-                try:
-                    pd.to_datetime(sample_timestamps)
-                    validation["timestamp_valid"] = True
-                    validation["timestamp_format"] = "Standard"
-                except Exception as e:
-                    validation["timestamp_issues"].append(f"Unbekanntes Format: {str(e)}")
+            try:
+                ts_ns = parse_timestamps(sample_timestamps, fmt)
+                validation["timestamp_valid"] = True
+            except Exception as e:
+                validation["timestamp_issues"].append(f"Parse-Fehler: {str(e)}")
             
             # Check for chronological order
-            if validation["timestamp_valid"]:
-                try:
-                    ts_parsed = pd.to_datetime(sample_timestamps)
-                    if not ts_parsed.is_monotonic_increasing:
-                        validation["timestamp_issues"].append("Zeitstempel nicht chronologisch sortiert")
-                except Exception:
-                    pass
+            if validation["timestamp_valid"] and (np.diff(ts_ns) < 0).any():
+                validation["timestamp_issues"].append("Zeitstempel nicht chronologisch sortiert")
             
         except Exception as e:
             validation["timestamp_issues"].append(f"Validierung fehlgeschlagen: {str(e)}")
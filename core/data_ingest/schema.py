@@ -1,4 +1,6 @@
 # Schema definitions for Module 1
+import pyarrow as pa
+
 TICK_SCHEMA = {
     "timestamp": "str",   # ISO8601 UTC
     "bid": "float64",
@@ -14,5 +16,25 @@ BAR_COLUMNS = [
     "tick_first_id","tick_last_id","gap_flag"
 ]
 
+# Arrow schemas shared by the streaming ingestors and the bar engine
+BAR_SCHEMA = pa.schema([
+    ("symbol", pa.string()), ("frame", pa.string()),
+    ("t_open_ns", pa.int64()), ("t_close_ns", pa.int64()),
+    ("o", pa.float64()), ("h", pa.float64()), ("l", pa.float64()), ("c", pa.float64()),
+    ("o_bid", pa.float64()), ("o_ask", pa.float64()), ("c_bid", pa.float64()), ("c_ask", pa.float64()),
+    ("spread_mean", pa.float64()), ("n_ticks", pa.int32()),
+    ("v_sum", pa.float64()),
+    ("tick_first_id", pa.int64()), ("tick_last_id", pa.int64()),
+    ("gap_flag", pa.int32()),
+])
+
+TICKS_SLICE_SCHEMA = pa.schema([
+    ("bar_idx", pa.int64()),
+    ("tick_id", pa.int64()),
+    ("timestamp", pa.int64()),
+    ("bid", pa.float64()),
+    ("ask", pa.float64())
+])
+
 SCHEMA_VERSION = "1.0"
 BAR_RULES_ID = "time_1m_linksschliessend_tick_N"
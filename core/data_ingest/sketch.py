@@ -0,0 +1,126 @@
+"""
+Mergeable quantile sketch (KLL) for Module 1 statistics
+
+A KLL sketch keeps a few levels of retained samples; an item on level h stands
+for 2**h input values. When the sketch grows past its capacity the lowest
+over-full level is sorted and every other item (random offset) is promoted,
+halving it. Memory is O(k log(n / k)) regardless of the input size, the rank
+error is roughly 1.7 / k, and two sketches merge by concatenating levels, so
+partial sketches from chunks, files or workers combine into one.
+
+Whole NumPy chunks are added at once; compaction is vectorized.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+
+DEFAULT_K = 200
+_DECAY = 2.0 / 3.0
+
+
+class QuantileSketch:
+    """KLL quantile sketch over float64 values (NaNs are ignored)."""
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = 0):
+        if k < 8:
+            raise ValueError(f"Sketch parameter k must be >= 8, got {k}")
+        self.k = int(k)
+        self.n = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.levels: List[np.ndarray] = [np.zeros(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * _DECAY ** depth)), 2)
+
+    def _size(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+    def _total_capacity(self) -> int:
+        return sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def _compress(self):
+        while self._size() > self._total_capacity():
+            for h, items in enumerate(self.levels):
+                if len(items) >= self._capacity(h):
+                    break
+            if h + 1 == len(self.levels):
+                self.levels.append(np.zeros(0))
+            items = np.sort(self.levels[h])
+            # Keep one item back when the level is odd so weights stay exact
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            pairs = items[:len(items) - len(keep)]
+            promoted = pairs[int(self._rng.integers(2))::2]
+            self.levels[h] = keep
+            self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+
+    def update(self, values) -> "QuantileSketch":
+        """Add a chunk of values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fold another sketch (same k) into this one."""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.zeros(0))
+        for h, items in enumerate(other.levels):
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantiles(self, qs: Sequence[float]) -> List[float]:
+        """Approximate quantiles; the extremes (q=0, q=1) are exact."""
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(lv), 2 ** h, dtype=np.int64) for h, lv in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        out = []
+        for q in qs:
+            if q <= 0:
+                out.append(self.min)
+            elif q >= 1:
+                out.append(self.max)
+            else:
+                idx = int(np.searchsorted(cum, q * cum[-1], side="left"))
+                out.append(float(items[min(idx, len(items) - 1)]))
+        return out
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable state (for manifests and cross-process merges)."""
+        return {
+            "type": "kll", "k": self.k, "n": self.n,
+            "min": self.min if self.n else None, "max": self.max if self.n else None,
+            "levels": [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "QuantileSketch":
+        if state.get("type") != "kll":
+            raise ValueError(f"Unknown sketch type: {state.get('type')!r}")
+        sketch = cls(state["k"])
+        sketch.n = int(state["n"])
+        if sketch.n:
+            sketch.min, sketch.max = float(state["min"]), float(state["max"])
+        sketch.levels = [np.asarray(items, dtype=np.float64) for items in state["levels"]]
+        return sketch
@@ -0,0 +1,228 @@
+"""
+Tick filters for Module 1: input time zone, session calendar, outliers
+
+All three run inside the ingest scan on the arrays of each batch, so they
+cost no extra pass over the data:
+
+    time_zone_in     naive timestamps (iso8601_naive, compact) are local
+                     times of this zone; they are shifted to UTC with the
+                     zone's offsets, precomputed per DST period as local ns
+                     boundaries and looked up with searchsorted. Ambiguous
+                     local times (the repeated hour) read as daylight time.
+    session calendar FX trading day D runs from roll time (default 17:00
+                     America/New_York) on D-1 to roll time on D. With
+                     trim_weekend the Saturday and Sunday trading days are
+                     closed (Friday 17:00 to Sunday 17:00 New York), and so is
+                     every date in holidays. Closed periods are precomputed
+                     per day as int64 ns [start, end) boundaries and ticks
+                     inside them are dropped with one searchsorted.
+    outlier_zscore   streaming z-score of the mid-price change against the
+                     last accepted tick, with an EWMA mean/variance of the
+                     accepted changes (outlier_span, default 1000 ticks).
+                     After the warm-up a tick with |z| > outlier_zscore is
+                     dropped; after outlier_max_run consecutive drops the
+                     next tick is accepted, so a genuine level shift (e.g.
+                     a weekend gap) resets the reference instead of
+                     dropping the rest of the stream.
+
+Dropped ticks never reach the bar engine, raw_norm or the tick slices; the
+counts are reported under "filters" in the manifests. The z-score state is
+part of get_state(), so checkpointed runs resume with the same decisions.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, Optional, Tuple
+import numpy as np
+import pandas as pd
+from numba import njit
+
+from .timestamps import COMPACT, ISO8601_NAIVE
+
+NAIVE_FORMATS = (ISO8601_NAIVE, COMPACT)
+NS_PER_DAY = 86_400 * 1_000_000_000
+DEFAULT_SESSION_TZ = "America/New_York"
+DEFAULT_ROLL = "17:00"
+
+# Z-score state slots: reference mid | EWMA mean | EWMA variance | accepted changes | consecutive drops
+Z_REF, Z_MEAN, Z_VAR, Z_N, Z_RUN = 0, 1, 2, 3, 4
+ZSTATE_SIZE = 5
+
+
+def _is_utc(time_zone: Optional[str]) -> bool:
+    return time_zone is None or str(time_zone).upper() in ("UTC", "Z", "GMT", "ETC/UTC")
+
+
+def _offset_table(time_zone: str, start_ns: int, end_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Local-time boundaries of the DST periods between start and end and the
+    UTC offset (ns) before, between and after them: len(offsets) = len(bounds) + 1.
+    """
+    hours = pd.date_range(pd.Timestamp(start_ns - NS_PER_DAY, unit="ns").floor("h"),
+                          pd.Timestamp(end_ns + NS_PER_DAY, unit="ns"), freq="h", tz="UTC")
+    utc = hours.asi8
+    offset = hours.tz_convert(time_zone).tz_localize(None).asi8 - utc
+    change = np.flatnonzero(np.diff(offset)) + 1
+    # A local time before utc + old offset is still in the old period
+    return utc[change] + offset[change - 1], np.concatenate((offset[:1], offset[change]))
+
+
+def localize_ns(ts_ns: np.ndarray, time_zone: Optional[str]) -> np.ndarray:
+    """Naive local int64 ns of time_zone -> UTC int64 ns (see module docstring)."""
+    ts_ns = np.asarray(ts_ns, dtype=np.int64)
+    if _is_utc(time_zone) or len(ts_ns) == 0:
+        return ts_ns
+    bounds, offsets = _offset_table(time_zone, int(ts_ns.min()), int(ts_ns.max()))
+    return ts_ns - offsets[np.searchsorted(bounds, ts_ns, side="right")]
+
+
+class SessionCalendar:
+    """
+    Closed periods of the FX session calendar (see module docstring).
+
+    Boundaries are computed per trading day for the dates a batch touches and
+    cached, so a stream extends the table a few days at a time.
+    """
+
+    def __init__(self, trim_weekend: bool = True, holidays: Iterable[Any] = (),
+                 time_zone: str = DEFAULT_SESSION_TZ, roll: str = DEFAULT_ROLL):
+        self.trim_weekend = bool(trim_weekend)
+        self.holidays = pd.DatetimeIndex(pd.to_datetime(list(holidays))).normalize()
+        self.time_zone = time_zone
+        self.roll = pd.Timedelta(roll + ":00" if roll.count(":") == 1 else roll)
+        self._range: Optional[Tuple[int, int]] = None
+        self.starts = self.ends = np.zeros(0, dtype=np.int64)
+
+    def closed_intervals(self, start_ns: int, end_ns: int) -> Tuple[np.ndarray, np.ndarray]:
+        """UTC ns [start, end) of every closed trading day overlapping [start_ns, end_ns]."""
+        first = pd.Timestamp(start_ns - 2 * NS_PER_DAY, unit="ns").normalize()
+        days = pd.date_range(first, pd.Timestamp(end_ns + 2 * NS_PER_DAY, unit="ns").normalize(), freq="D")
+        closed = days.isin(self.holidays)
+        if self.trim_weekend:
+            closed |= days.dayofweek >= 5
+        days = days[closed]
+
+        def to_utc(local: pd.DatetimeIndex) -> np.ndarray:
+            return local.tz_localize(self.time_zone, ambiguous=np.zeros(len(local), dtype=bool),
+                                     nonexistent="shift_forward").asi8
+
+        return to_utc(days - pd.Timedelta(days=1) + self.roll), to_utc(days + self.roll)
+
+    def _cover(self, lo: int, hi: int):
+        if self._range is None or lo < self._range[0] or hi > self._range[1]:
+            if self._range is not None:
+                lo, hi = min(lo, self._range[0]), max(hi, self._range[1])
+            # Extend by a month at a time so a stream rarely recomputes
+            lo, hi = lo - 30 * NS_PER_DAY, hi + 30 * NS_PER_DAY
+            self.starts, self.ends = self.closed_intervals(lo, hi)
+            self._range = (lo, hi)
+
+    def open_mask(self, ts_ns: np.ndarray) -> np.ndarray:
+        """True for ticks inside a trading session."""
+        keep = np.ones(len(ts_ns), dtype=bool)
+        if len(ts_ns) == 0 or not (self.trim_weekend or len(self.holidays)):
+            return keep
+        self._cover(int(ts_ns.min()), int(ts_ns.max()))
+        i = np.searchsorted(self.ends, ts_ns, side="right")
+        inside = i < len(self.ends)
+        keep[inside] = ts_ns[inside] < self.starts[i[inside]]
+        return keep
+
+
+@njit
+def zscore_kernel(mid, threshold, alpha, warmup, max_run, state, keep):
+    """Sequential z-score filter over one batch; state carries across batches."""
+    for i in range(len(mid)):
+        px = mid[i]
+        if np.isnan(state[Z_REF]):
+            state[Z_REF] = px
+            keep[i] = True
+            continue
+        d = px - state[Z_REF] - state[Z_MEAN]
+        if (state[Z_N] >= warmup and state[Z_VAR] > 0.0 and state[Z_RUN] < max_run
+                and abs(d) > threshold * np.sqrt(state[Z_VAR])):
+            keep[i] = False
+            state[Z_RUN] += 1.0
+            continue
+        keep[i] = True
+        state[Z_RUN] = 0.0
+        state[Z_MEAN] += alpha * d
+        state[Z_VAR] = (1.0 - alpha) * (state[Z_VAR] + alpha * d * d)
+        state[Z_N] += 1.0
+        state[Z_REF] = px
+
+
+class ZScoreFilter:
+    """Streaming z-score outlier filter on mid-price changes (see module docstring)."""
+
+    def __init__(self, threshold: float, span: int = 1000, max_run: int = 5):
+        if threshold <= 0 or span <= 0 or max_run < 0:
+            raise ValueError(f"Invalid outlier filter: zscore={threshold}, span={span}, max_run={max_run}")
+        self.threshold = float(threshold)
+        self.span = int(span)
+        self.max_run = int(max_run)
+        self.state = np.zeros(ZSTATE_SIZE)
+        self.state[Z_REF] = np.nan
+
+    def mask(self, bid: np.ndarray, ask: np.ndarray) -> np.ndarray:
+        mid = (np.asarray(bid, dtype=np.float64) + np.asarray(ask, dtype=np.float64)) / 2
+        keep = np.empty(len(mid), dtype=np.bool_)
+        zscore_kernel(mid, self.threshold, 2.0 / (self.span + 1), self.span, self.max_run, self.state, keep)
+        return keep
+
+
+class TickFilter:
+    """Session calendar and outlier filter applied to each tick batch in stream order."""
+
+    def __init__(self, calendar: Optional[SessionCalendar] = None, zscore: Optional[ZScoreFilter] = None):
+        self.calendar = calendar
+        self.zscore = zscore
+        self.n_calendar = 0
+        self.n_outliers = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["TickFilter"]:
+        """
+        Filter from the ingest config keys trim_weekend, holidays,
+        session_time_zone, session_roll, outlier_zscore, outlier_span and
+        outlier_max_run; None when no filter is enabled.
+        """
+        calendar = zscore = None
+        if config.get("trim_weekend") or config.get("holidays"):
+            calendar = SessionCalendar(bool(config.get("trim_weekend")), config.get("holidays") or (),
+                                       config.get("session_time_zone", DEFAULT_SESSION_TZ),
+                                       config.get("session_roll", DEFAULT_ROLL))
+        if config.get("outlier_zscore"):
+            zscore = ZScoreFilter(float(config["outlier_zscore"]), int(config.get("outlier_span", 1000)),
+                                  int(config.get("outlier_max_run", 5)))
+        if calendar is None and zscore is None:
+            return None
+        return cls(calendar, zscore)
+
+    def mask(self, ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray) -> np.ndarray:
+        """Keep-mask of one time-ordered batch."""
+        keep = np.ones(len(ts_ns), dtype=bool)
+        if self.calendar is not None:
+            keep = self.calendar.open_mask(ts_ns)
+            self.n_calendar += int(len(keep) - keep.sum())
+        if self.zscore is not None:
+            idx = np.flatnonzero(keep)
+            ok = self.zscore.mask(bid[idx], ask[idx])
+            keep[idx[~ok]] = False
+            self.n_outliers += int(len(ok) - ok.sum())
+        return keep
+
+    def report(self) -> Dict[str, Any]:
+        return {"calendar_dropped": self.n_calendar, "outliers_dropped": self.n_outliers}
+
+    def get_state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = self.report()
+        if self.zscore is not None:
+            state["zscore"] = [float(x) for x in self.zscore.state]
+        return state
+
+    def set_state(self, state: Dict[str, Any]) -> "TickFilter":
+        self.n_calendar = int(state.get("calendar_dropped", 0))
+        self.n_outliers = int(state.get("outliers_dropped", 0))
+        if self.zscore is not None and "zscore" in state:
+            self.zscore.state[:] = state["zscore"]
+        return self
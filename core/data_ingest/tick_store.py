@@ -0,0 +1,257 @@
+"""
+Consolidated Tick-Slice Store (CSR layout) for Module 1
+
+Instead of one Parquet file per bar, all ticks of a frame live in a single
+Parquet file ordered by bar, plus an int64 offsets array (CSR style): the ticks
+of bar i are rows offsets[i]:offsets[i+1]. Row groups are cut on bar
+boundaries, so any bar range maps to a contiguous set of row groups and can be
+fetched with one read; a bar's ticks are then zero-copy array slices.
+
+Layout of a store directory:
+    ticks.parquet         columns ts_ns (int64), bid, ask (float64)
+    offsets.npy           int64[n_bars + 1]
+    extremes.npy          float64[2, n_bars]: max ask and min bid per bar
+                          (-inf/inf for bars without ticks), so barrier
+                          searches can skip bars without reading their ticks
+    slice_manifest.json   format "csr", row-group bar ranges, statistics
+
+With a PriceCodec the store is fixed-point: bid/ask are int32 points from
+the codec base (recorded in the manifest), ts_ns is delta-encoded on disk, and
+load() keeps the int32 arrays in memory. Reads decode to float64 unless
+points=True.
+"""
+
+from __future__ import annotations
+import json, pathlib, datetime as dt
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .util import write_json
+from .fixed_point import PriceCodec
+from .parquet_profiles import open_writer
+
+STORE_FORMAT = "csr"
+TICKS_FILE = "ticks.parquet"
+OFFSETS_FILE = "offsets.npy"
+EXTREMES_FILE = "extremes.npy"
+MANIFEST_FILE = "slice_manifest.json"
+
+STORE_SCHEMA = pa.schema([
+    ("ts_ns", pa.int64()),
+    ("bid", pa.float64()),
+    ("ask", pa.float64()),
+])
+
+FIXED_STORE_SCHEMA = pa.schema([
+    ("ts_ns", pa.int64()),
+    ("bid", pa.int32()),
+    ("ask", pa.int32()),
+])
+
+
+def bar_extremes(bid: np.ndarray, ask: np.ndarray, bar_lengths: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Max ask and min bid per bar, NaN ticks ignored; -inf/inf for bars without (valid) ticks."""
+    bar_lengths = np.asarray(bar_lengths, dtype=np.int64)
+    ask_max = np.full(len(bar_lengths), -np.inf)
+    bid_min = np.full(len(bar_lengths), np.inf)
+    filled = bar_lengths > 0
+    if filled.any():
+        starts = (np.cumsum(bar_lengths) - bar_lengths)[filled]
+        ask_max[filled] = np.fmax.reduceat(np.asarray(ask, dtype=np.float64), starts)
+        bid_min[filled] = np.fmin.reduceat(np.asarray(bid, dtype=np.float64), starts)
+    ask_max[np.isnan(ask_max)] = -np.inf
+    bid_min[np.isnan(bid_min)] = np.inf
+    return ask_max, bid_min
+
+
+class TickSliceStoreWriter:
+    """
+    Incremental writer; ticks must be appended in bar order, whole bars only.
+
+    Bars are buffered until row_group_ticks ticks are pending and then written
+    as exactly one row group, so row groups never split a bar. A codec makes
+    the store fixed-point (see module docstring).
+    """
+
+    def __init__(self, slice_dir: pathlib.Path, frame_name: str,
+                 row_group_ticks: int = 1_000_000, compression: str = "zstd",
+                 codec: Optional[PriceCodec] = None):
+        self.slice_dir = pathlib.Path(slice_dir)
+        self.slice_dir.mkdir(parents=True, exist_ok=True)
+        self.frame_name = frame_name
+        self.row_group_ticks = int(row_group_ticks)
+        self.codec = codec
+        self._schema = STORE_SCHEMA if codec is None else FIXED_STORE_SCHEMA
+        self._writer = open_writer(self.slice_dir / TICKS_FILE, self._schema, "slices", compression=compression)
+        self._lengths: List[np.ndarray] = []
+        self._extremes: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+        self._pending_ticks = 0
+        self._pending_bars = 0
+        self._n_bars = 0
+        self._row_groups: List[List[int]] = []
+
+    def append(self, ts_ns: np.ndarray, bid: np.ndarray, ask: np.ndarray, bar_lengths: np.ndarray):
+        """Append the ticks of consecutive complete bars (bar_lengths sums to len(ts_ns))."""
+        bar_lengths = np.asarray(bar_lengths, dtype=np.int64)
+        if int(bar_lengths.sum()) != len(ts_ns):
+            raise ValueError("bar_lengths must cover exactly the appended ticks")
+        if len(bar_lengths) == 0:
+            return
+        self._lengths.append(bar_lengths)
+        ends = np.cumsum(bar_lengths)
+        b0 = 0; t0 = 0
+        while b0 < len(bar_lengths):
+            # Take just enough whole bars to fill the current row group
+            need = self.row_group_ticks - self._pending_ticks
+            b1 = min(int(np.searchsorted(ends, t0 + need, side="left")) + 1, len(bar_lengths))
+            t1 = int(ends[b1 - 1])
+            self._pending.append((ts_ns[t0:t1], bid[t0:t1], ask[t0:t1], bar_lengths[b0:b1]))
+            self._pending_ticks += t1 - t0
+            self._pending_bars += b1 - b0
+            if self._pending_ticks >= self.row_group_ticks:
+                self._write_row_group()
+            b0, t0 = b1, t1
+
+    def _write_row_group(self):
+        if not self._pending:
+            return
+        ts, bid, ask, lengths = (np.concatenate([p[i] for p in self._pending]) for i in range(4))
+        if self.codec is not None:
+            bid, ask = self.codec.encode(bid), self.codec.encode(ask)
+            # Extremes of the prices a reader decodes, not of the input
+            self._extremes.append(bar_extremes(self.codec.decode(bid), self.codec.decode(ask), lengths))
+        else:
+            self._extremes.append(bar_extremes(bid, ask, lengths))
+        table = pa.Table.from_arrays([pa.array(a, f.type) for a, f in zip((ts, bid, ask), self._schema)],
+                                     schema=self._schema)
+        self._writer.write_table(table, row_group_size=max(len(table), 1))
+        self._row_groups.append([self._n_bars, self._n_bars + self._pending_bars])
+        self._n_bars += self._pending_bars
+        self._pending.clear()
+        self._pending_ticks = 0
+        self._pending_bars = 0
+
+    def close(self) -> Dict[str, Any]:
+        """Flush, write offsets + manifest; returns the store statistics."""
+        self._write_row_group()
+        self._writer.close()
+        lengths = np.concatenate(self._lengths) if self._lengths else np.zeros(0, dtype=np.int64)
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        np.save(self.slice_dir / OFFSETS_FILE, offsets)
+        np.save(self.slice_dir / EXTREMES_FILE, np.vstack((
+            np.concatenate([e[0] for e in self._extremes] or [np.zeros(0)]),
+            np.concatenate([e[1] for e in self._extremes] or [np.zeros(0)]),
+        )))
+
+        stats = {
+            "total_events": int(len(lengths)),
+            "total_ticks": int(offsets[-1]),
+            "avg_ticks_per_event": float(lengths.mean()) if len(lengths) else 0,
+            "min_ticks": int(lengths.min()) if len(lengths) else 0,
+            "max_ticks": int(lengths.max()) if len(lengths) else 0,
+        }
+        write_json(self.slice_dir / MANIFEST_FILE, {
+            "format": STORE_FORMAT,
+            "frame_name": self.frame_name,
+            "ticks_file": TICKS_FILE,
+            "offsets_file": OFFSETS_FILE,
+            "extremes_file": EXTREMES_FILE,
+            "row_groups": self._row_groups,
+            "statistics": stats,
+            **(self.codec.to_dict() if self.codec is not None else {"price_encoding": "float64"}),
+            "created_at": dt.datetime.utcnow().isoformat(),
+        })
+        return stats
+
+
+class TickSliceStore:
+    """Reader for a CSR tick-slice store."""
+
+    def __init__(self, slice_dir: pathlib.Path):
+        self.slice_dir = pathlib.Path(slice_dir)
+        with (self.slice_dir / MANIFEST_FILE).open(encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != STORE_FORMAT:
+            raise ValueError(f"Not a CSR tick-slice store: {self.slice_dir}")
+        self.offsets = np.load(self.slice_dir / self.manifest["offsets_file"], mmap_mode="r")
+        self._rg_bars = np.asarray(self.manifest["row_groups"], dtype=np.int64).reshape(-1, 2)
+        self._file = pq.ParquetFile(self.slice_dir / self.manifest["ticks_file"])
+        self.codec = PriceCodec.from_dict(self.manifest)
+        self._all: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @staticmethod
+    def is_store(slice_dir: pathlib.Path) -> bool:
+        manifest = pathlib.Path(slice_dir) / MANIFEST_FILE
+        if not manifest.exists():
+            return False
+        with manifest.open(encoding="utf-8") as f:
+            return json.load(f).get("format") == STORE_FORMAT
+
+    @property
+    def n_bars(self) -> int:
+        return len(self.offsets) - 1
+
+    def _prices(self, bid: np.ndarray, ask: np.ndarray, points: bool) -> Tuple[np.ndarray, np.ndarray]:
+        if self.codec is None:
+            if points:
+                raise ValueError(f"{self.slice_dir} stores float64 prices, not points")
+            return bid, ask
+        return (bid, ask) if points else (self.codec.decode(bid), self.codec.decode(ask))
+
+    def read_bars(self, start: int, stop: int,
+                  points: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Ticks of bars [start, stop) with a single read of the covering row groups.
+
+        Returns (offsets, ts_ns, bid, ask) where offsets is rebased so the ticks
+        of bar start + j are rows offsets[j]:offsets[j + 1]. points=True returns
+        the int32 points of a fixed-point store instead of prices.
+        """
+        start = max(int(start), 0); stop = min(int(stop), self.n_bars)
+        if stop <= start:
+            empty = np.zeros(0, np.int32) if points else np.zeros(0)
+            return np.zeros(1, dtype=np.int64), np.zeros(0, np.int64), empty, empty
+        if self._all is not None:
+            lo, hi = int(self.offsets[start]), int(self.offsets[stop])
+            ts, bid, ask = (a[lo:hi] for a in self._all)
+        else:
+            rgs = np.flatnonzero((self._rg_bars[:, 1] > start) & (self._rg_bars[:, 0] < stop))
+            table = self._file.read_row_groups(rgs.tolist(), columns=["ts_ns", "bid", "ask"])
+            base = int(self.offsets[self._rg_bars[rgs[0], 0]])
+            lo, hi = int(self.offsets[start]) - base, int(self.offsets[stop]) - base
+            table = table.slice(lo, hi - lo)
+            ts, bid, ask = (table.column(c).to_numpy() for c in ("ts_ns", "bid", "ask"))
+        offsets = np.asarray(self.offsets[start:stop + 1], dtype=np.int64) - int(self.offsets[start])
+        return (offsets, ts, *self._prices(bid, ask, points))
+
+    def load(self) -> "TickSliceStore":
+        """Read the whole store once; later reads are zero-copy slices."""
+        if self._all is None:
+            table = self._file.read(columns=["ts_ns", "bid", "ask"])
+            self._all = tuple(table.column(c).to_numpy() for c in ("ts_ns", "bid", "ask"))
+        return self
+
+    def bar_extremes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (max ask, min bid) per bar; stores written before extremes.npy
+        existed get them computed from one full read.
+        """
+        name = self.manifest.get("extremes_file")
+        if name and (self.slice_dir / name).exists():
+            extremes = np.load(self.slice_dir / name)
+            return extremes[0], extremes[1]
+        _, _, bid, ask = self.read_bars(0, self.n_bars)
+        return bar_extremes(bid, ask, np.diff(self.offsets))
+
+    def ticks(self, bar_idx: int, points: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(ts_ns, bid, ask) of one bar."""
+        if self._all is None:
+            _, ts, bid, ask = self.read_bars(bar_idx, bar_idx + 1, points)
+            return ts, bid, ask
+        lo, hi = int(self.offsets[bar_idx]), int(self.offsets[bar_idx + 1])
+        ts, bid, ask = (a[lo:hi] for a in self._all)
+        return (ts, *self._prices(bid, ask, points))
@@ -0,0 +1,211 @@
+"""
+Timestamp parsing for Module 1
+
+The format of a timestamp column is detected once from a small sample and the
+whole column is then parsed with a fixed-format, vectorized Arrow path
+instead of per-element inference:
+
+    iso8601              2025-01-02T09:00:00.123Z, 2025-01-02 09:00:00+00:00
+    iso8601_naive        2025-01-02 09:00:00.123 (read as UTC)
+    %Y%m%d %H:%M:%S.%f   20250102 09:00:00.123 (fraction optional)
+    epoch_s / epoch_ms / epoch_us / epoch_ns
+                         integers (or digit strings), unit from the magnitude
+    datetime             columns that are already timestamps
+
+Anything else falls back to pandas ("pandas"). TimestampParser keeps the
+detected format, so chunked readers detect on the first chunk only and
+manifests can record what was used. All parsers return int64 ns since the
+epoch (UTC); unparsable values raise ValueError(TIMEZONE_ERROR).
+"""
+
+from __future__ import annotations
+import re
+from typing import Any, Optional
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from . import errors as E
+
+ISO8601 = "iso8601"
+ISO8601_NAIVE = "iso8601_naive"
+COMPACT = "%Y%m%d %H:%M:%S.%f"
+DATETIME = "datetime"
+PANDAS = "pandas"
+EPOCH_UNITS = {"epoch_s": 1_000_000_000, "epoch_ms": 1_000_000, "epoch_us": 1_000, "epoch_ns": 1}
+FORMATS = (ISO8601, ISO8601_NAIVE, COMPACT, DATETIME, PANDAS, *EPOCH_UNITS)
+SAMPLE_SIZE = 100
+
+_ISO_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(\.\d{1,9})?(Z|[+-]\d{2}:?\d{2})?")
+_COMPACT_RE = re.compile(r"\d{8} \d{2}:\d{2}:\d{2}(\.\d{1,9})?")
+_DIGITS_RE = re.compile(r"-?\d{1,19}")
+
+
+def _to_arrow(values: Any) -> pa.Array:
+    if isinstance(values, pa.ChunkedArray):
+        return values.combine_chunks()
+    if isinstance(values, pa.Array):
+        return values
+    if isinstance(values, pd.Series) and values.dtype == object:
+        return pa.array(values, type=pa.string(), from_pandas=True)
+    return pa.array(values, from_pandas=True)
+
+
+def _epoch_format(magnitude: float) -> str:
+    if magnitude < 1e11:
+        return "epoch_s"
+    if magnitude < 1e14:
+        return "epoch_ms"
+    if magnitude < 1e17:
+        return "epoch_us"
+    return "epoch_ns"
+
+
+def detect_format(values: Any) -> str:
+    """Format name (see FORMATS) detected from the first non-null values."""
+    if isinstance(values, pd.Series):
+        values = values.dropna().iloc[:SAMPLE_SIZE]
+    arr = _to_arrow(values)
+    if pa.types.is_timestamp(arr.type) or pa.types.is_date(arr.type):
+        return DATETIME
+    sample = arr.drop_null().slice(0, SAMPLE_SIZE)
+    if len(sample) == 0:
+        return PANDAS
+    if pa.types.is_integer(sample.type) or pa.types.is_floating(sample.type):
+        return _epoch_format(float(np.median(np.abs(sample.to_numpy(zero_copy_only=False)))))
+    if not pa.types.is_string(sample.type) and not pa.types.is_large_string(sample.type):
+        return PANDAS
+    text = [s.strip() for s in sample.to_pylist()]
+    if all(_ISO_RE.fullmatch(s) for s in text):
+        zoned = [bool(_ISO_RE.fullmatch(s).group(2)) for s in text]
+        if all(zoned):
+            return ISO8601
+        return ISO8601_NAIVE if not any(zoned) else PANDAS
+    if all(_COMPACT_RE.fullmatch(s) for s in text):
+        return COMPACT
+    if all(_DIGITS_RE.fullmatch(s) for s in text):
+        return _epoch_format(float(np.median(np.abs(np.array(text, dtype=np.float64)))))
+    return PANDAS
+
+
+def _fixed_width_compact(arr: pa.Array) -> Optional[np.ndarray]:
+    """
+    Digit arithmetic on the raw string bytes when every value has the same
+    width (the usual case for machine-written files); None otherwise.
+    """
+    if len(arr) == 0:
+        return None
+    offset_type = np.int64 if pa.types.is_large_string(arr.type) else np.int32
+    offsets = np.frombuffer(arr.buffers()[1], dtype=offset_type)[arr.offset:arr.offset + len(arr) + 1]
+    width = int(offsets[1] - offsets[0])
+    if width not in (17, *range(19, 28)) or (np.diff(offsets) != width).any():
+        return None
+    # One row per character position, so every field is a few contiguous passes
+    chars = np.frombuffer(arr.buffers()[2], dtype=np.uint8)[offsets[0]:offsets[-1]].reshape(-1, width).T.copy()
+    separators = {8: ord(" "), 11: ord(":"), 14: ord(":"), 17: ord(".")}
+    if any((chars[i] != c).any() for i, c in separators.items() if i < width):
+        return None
+    chars -= 48
+    digit_rows = [i for i in range(width) if i not in separators]
+    if (chars[digit_rows] > 9).any():
+        return None
+
+    def number(start: int, stop: int) -> np.ndarray:
+        out = chars[start].astype(np.int64)
+        for j in range(start + 1, stop):
+            out = out * 10 + chars[j]
+        return out
+
+    year, month, day = number(0, 4), number(4, 6), number(6, 8)
+    hour, minute, second = number(9, 11), number(12, 14), number(15, 17)
+    frac = number(18, width) * 10 ** (27 - width) if width > 17 else 0
+    months = (year - 1970).astype("datetime64[Y]") + (month - 1).astype("timedelta64[M]")
+    month_days = ((months + 1).astype("datetime64[D]") - months.astype("datetime64[D]")).astype(np.int64)
+    if ((month < 1) | (month > 12) | (day < 1) | (day > month_days) | (hour > 23) | (minute > 59) | (second > 59)).any():
+        return None
+    days = months.astype("datetime64[D]").astype(np.int64) + day - 1
+    return (days * 86_400 + hour * 3_600 + minute * 60 + second) * 1_000_000_000 + frac
+
+
+def _parse_compact(arr: pa.Array) -> np.ndarray:
+    """%Y%m%d %H:%M:%S with an optional fraction of 1-9 digits."""
+    fixed = _fixed_width_compact(arr)
+    if fixed is not None:
+        return fixed
+    arr = pc.utf8_trim_whitespace(arr)
+    head = pc.utf8_slice_codeunits(arr, 0, 17)
+    seconds = pc.strptime(head, format="%Y%m%d %H:%M:%S", unit="ns")
+    # strptime rolls impossible dates (Feb 30) over instead of failing
+    if not pc.all(pc.equal(pc.strftime(seconds, format="%Y%m%d %H:%M:%S"), head)).as_py():
+        raise pa.ArrowInvalid("timestamp outside the calendar")
+    frac = pc.utf8_slice_codeunits(arr, 18, 27)
+    digits = pc.utf8_length(frac).to_numpy(zero_copy_only=False)
+    frac = pc.if_else(pc.equal(pc.utf8_length(frac), 0), pa.scalar("0"), frac)
+    frac_ns = pc.cast(frac, pa.int64()).to_numpy(zero_copy_only=False) * 10 ** (9 - digits)
+    return seconds.cast(pa.int64()).to_numpy(zero_copy_only=False) + frac_ns
+
+
+def _parse_pandas(values: Any) -> np.ndarray:
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        values = values.to_pandas()
+    ts = pd.to_datetime(pd.Series(values), utc=True, errors="coerce", format="mixed")
+    if ts.isna().any():
+        raise ValueError(f"{E.TIMEZONE_ERROR}: {int(ts.isna().sum())} unparsable timestamps")
+    return ts.dt.as_unit("ns").astype("int64").to_numpy()
+
+
+def parse_timestamps(values: Any, fmt: Optional[str] = None) -> np.ndarray:
+    """Parse a timestamp column to int64 ns UTC with the given (or detected) format."""
+    if fmt == PANDAS:
+        return _parse_pandas(values)
+    arr = _to_arrow(values)
+    fmt = fmt or detect_format(arr)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown timestamp format: {fmt} (expected one of {FORMATS})")
+    if fmt == PANDAS:
+        return _parse_pandas(values)
+    if arr.null_count:
+        raise ValueError(f"{E.TIMEZONE_ERROR}: {arr.null_count} missing timestamps")
+    try:
+        if fmt == DATETIME:
+            if pa.types.is_date(arr.type):
+                arr = arr.cast(pa.timestamp("ns"))
+            if arr.type.unit != "ns":
+                arr = pc.cast(arr, pa.timestamp("ns", tz=arr.type.tz))
+            return arr.cast(pa.int64()).to_numpy(zero_copy_only=False)
+        if fmt in (ISO8601, ISO8601_NAIVE):
+            target = pa.timestamp("ns", tz="UTC" if fmt == ISO8601 else None)
+            return pc.cast(pc.utf8_trim_whitespace(arr), target).cast(pa.int64()).to_numpy(zero_copy_only=False)
+        if fmt == COMPACT:
+            return _parse_compact(arr)
+        scale = EPOCH_UNITS[fmt]
+        if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+            arr = pc.cast(pc.utf8_trim_whitespace(arr), pa.int64())
+        if pa.types.is_floating(arr.type):
+            return np.round(arr.to_numpy(zero_copy_only=False) * scale).astype(np.int64)
+        return arr.cast(pa.int64()).to_numpy(zero_copy_only=False) * scale
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # A value outside the detected format; let pandas sort the column out
+        return _parse_pandas(values)
+
+
+class TimestampParser:
+    """
+    Parses successive chunks of one timestamp column.
+
+    The format is detected from the first chunk (unless given) and reused
+    for every later chunk; .format reports it for manifests.
+    """
+
+    def __init__(self, fmt: Optional[str] = None):
+        if fmt is not None and fmt not in FORMATS:
+            raise ValueError(f"Unknown timestamp format: {fmt} (expected one of {FORMATS})")
+        self.format = fmt
+
+    def __call__(self, values: Any) -> np.ndarray:
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if self.format is None:
+            self.format = detect_format(values)
+        return parse_timestamps(values, self.format)
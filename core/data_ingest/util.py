@@ -1,5 +1,5 @@
 from __future__ import annotations
-import hashlib, json, pathlib
+import hashlib, json, os, pathlib
 
 def sha256_of_file(path: pathlib.Path) -> str:
     h = hashlib.sha256()
@@ -10,3 +10,9 @@ def sha256_of_file(path: pathlib.Path) -> str:
 
 def write_json(path: pathlib.Path, obj) -> None:
     path.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+
+def write_json_atomic(path: pathlib.Path, obj) -> None:
+    """write_json via a temp file and rename, so readers never see a partial file."""
+    tmp = path.with_name(f".tmp-{path.name}")
+    write_json(tmp, obj)
+    os.replace(tmp, path)
@@ -15,6 +15,8 @@ from datetime import datetime
 # Import from our project
 from core.orchestrator.run_manager import run_manager
 from core.orchestrator.progress_monitor import ProgressMonitor
+from core.data_ingest.bar_store import read_input
+from core.data_ingest.sketch import QuantileSketch
 
 
 def standardize_ohlc_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -81,6 +83,20 @@ def add_microstructural_features(df: pd.DataFrame, config: Dict) -> pd.DataFrame
         df['tick_imbalance'] = df['n_ticks'].diff()
     return df
 
+def liquidity_stress_threshold(spread_mean: pd.Series, config: Dict) -> float:
+    """
+    p95 of spread_mean for the liquidity-stress flag.
+    
+    Uses, in order: an explicit liquidity_stress_threshold, a serialized
+    quantile sketch (spread_sketch, e.g. frame_stats sketches of the ingest
+    quality report, which cover the full history), or the loaded column.
+    """
+    if config.get("liquidity_stress_threshold") is not None:
+        return float(config["liquidity_stress_threshold"])
+    if config.get("spread_sketch"):
+        return QuantileSketch.from_dict(config["spread_sketch"]).quantile(0.95)
+    return spread_mean.quantile(0.95)
+
 def add_institutional_features(df: pd.DataFrame, config: Dict) -> pd.DataFrame:
     # Order-Flow Proxies (Tick Imbalance over n ticks)
     if 'tick_imbalance' in df.columns:
@@ -89,7 +105,7 @@ def add_institutional_features(df: pd.DataFrame, config: Dict) -> pd.DataFrame:
     
     # Liquidity Stress (Spread Stretch > p95)
     if 'spread_mean' in df.columns:
-        p95_spread = df['spread_mean'].quantile(0.95)
+        p95_spread = liquidity_stress_threshold(df['spread_mean'], config)
         df['liquidity_stress'] = (df['spread_mean'] > p95_spread).astype(int)
         
     return df
@@ -111,7 +127,7 @@ def run(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             if not input_file.exists():
                 raise FileNotFoundError(f"Input file not found: {input_file}")
             
-            df = pd.read_parquet(input_file)
+            df = read_input(input_file, config)
             df = standardize_ohlc_columns(df.copy())
             monitor.update("load", "Daten geladen", 10)
             
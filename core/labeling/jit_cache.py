@@ -0,0 +1,73 @@
+"""
+Compiled-kernel cache and warmup for the labeling kernels
+
+All labeling kernels are jitted with cache=True, so the machine code is
+written to numba's on-disk cache (the __pycache__ next to the module, or
+NUMBA_CACHE_DIR when set, e.g. a shared volume of a batch farm) and a fresh
+process loads it instead of compiling again. The cache is keyed by the
+source file, so editing a labeling module recompiles only its kernels.
+
+Each module lists the signatures the run() entry points call its kernels
+with in KERNEL_SIGNATURES ({name: (kernel, signatures)}): C-contiguous
+float64/int64 arrays and int64/float64 scalars. run() casts its inputs to
+exactly these types, because any other combination (a strided array, an
+int where a float is expected) compiles a further specialization.
+Signatures are compiled ahead of the first call, not at import time, so
+other argument types still work.
+
+warmup() compiles (or loads) every signature of both labeling modules; run
+it once per image or cache volume, e.g.
+python -c "from core.labeling.jit_cache import warmup; print(warmup())".
+The run() entry points report the same compile/load timings for the
+kernels they use under "startup".
+"""
+
+import time
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numba
+
+Kernels = Dict[str, Tuple[Any, Sequence[str]]]
+
+
+def _cache_counts(kernel: Any) -> Tuple[int, int]:
+    stats = kernel.stats
+    return sum(stats.cache_hits.values()), sum(stats.cache_misses.values())
+
+
+def compile_kernels(kernels: Kernels, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Compile or load the listed signatures of kernels (all when names is None).
+
+    Per kernel the report has the seconds spent, the signatures loaded from
+    the disk cache (cache_hits) and the ones compiled and written to it
+    (cache_misses); signatures already compiled in this process count as
+    neither.
+    """
+    start = time.perf_counter()
+    report: Dict[str, Any] = {}
+    for name in (kernels if names is None else names):
+        kernel, signatures = kernels[name]
+        hits, misses = _cache_counts(kernel)
+        t0 = time.perf_counter()
+        for signature in signatures:
+            kernel.compile(signature)
+        new_hits, new_misses = _cache_counts(kernel)
+        report[name] = {
+            "seconds": round(time.perf_counter() - t0, 6),
+            "signatures": len(signatures),
+            "cache_hits": new_hits - hits,
+            "cache_misses": new_misses - misses,
+        }
+    return {
+        "compile_seconds": round(time.perf_counter() - start, 6),
+        "cache_dir": numba.config.CACHE_DIR or None,
+        "kernels": report,
+    }
+
+
+def warmup() -> Dict[str, Any]:
+    """Compile or load every labeling kernel signature (see module docstring)."""
+    from core.labeling import labeling, labeling_v22
+    return compile_kernels({**labeling.KERNEL_SIGNATURES, **labeling_v22.KERNEL_SIGNATURES})
+
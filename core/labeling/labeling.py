@@ -2,7 +2,14 @@
 Core Implementation for Module 2: Triple-Barrier Labeling v2.1
 
 This module now uses tick slices for precise first-hit detection in the
-Triple-Barrier Labeling method.
+Triple-Barrier Labeling method. The ticks reach the Numba kernel in a flat
+CSR layout: one contiguous bid and ask array ordered by bar plus an int64
+offsets array (the ticks of bar i are rows offsets[i]:offsets[i+1]), built
+with one bincount instead of a per-bar groupby. A CSR tick-slice store
+directory (data_ingest slice_format "csr") is used as is. Events are labeled
+in parallel (prange) unless n_threads is 1, see core.labeling.threads. The
+kernels are cached on disk with explicit signatures, see core.labeling.jit_cache;
+the run report lists their compile/load times under "startup".
 """
 
 import pandas as pd
@@ -10,77 +17,142 @@ import numpy as np
 from pathlib import Path
 import json
 import yaml
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional
-from numba import njit
+from typing import Dict, Any, Optional, Tuple
+from numba import njit, prange
 
 # Import from our project
 from core.orchestrator.run_manager import run_manager
 from core.orchestrator.progress_monitor import ProgressMonitor
+from core.data_ingest.bar_store import read_input
+from core.data_ingest.ipc_cache import read_table
+from core.data_ingest.tick_store import TickSliceStore
+from core.labeling.jit_cache import compile_kernels
+from core.labeling.threads import resolve_threads, run_kernel
 
 
-@njit
-def apply_labeling_v2_1_numba(prices_high: np.ndarray, prices_low: np.ndarray, 
-                              tick_slices: List[np.ndarray], t_events: np.ndarray, 
-                              pt_sl: np.ndarray, timeout_bars: int, side: int) -> np.ndarray:
-    """Numba-optimized function for applying triple-barrier labeling v2.1 with tick-slice first-hit."""
-    
+@njit(cache=True)
+def _label_event_v2_1(i: int, prices_high: np.ndarray, prices_low: np.ndarray,
+                      slice_bid: np.ndarray, slice_ask: np.ndarray, offsets: np.ndarray,
+                      t_events: np.ndarray, pt_sl: np.ndarray, timeout_bars: int, side: int, out: np.ndarray):
+    """Label event i into out[i] (see apply_labeling_v2_1_numba)."""
+    entry_time = t_events[i]
+    entry_price = (prices_high[entry_time] + prices_low[entry_time]) / 2.0
+
+    if side == 1:
+        take_profit_price = entry_price + pt_sl[0]
+        stop_loss_price = entry_price - pt_sl[1]
+    else:
+        take_profit_price = entry_price - pt_sl[0]
+        stop_loss_price = entry_price + pt_sl[1]
+
+    timeout_time = min(entry_time + timeout_bars, len(prices_high) - 1)
+
+    for t in range(entry_time + 1, timeout_time + 1):
+        # Use tick slice for this bar to find first hit
+        for tick_idx in range(offsets[t], offsets[t + 1]):
+            tick_bid = slice_bid[tick_idx]
+            tick_ask = slice_ask[tick_idx]
+
+            if side == 1:
+                if tick_ask >= take_profit_price:
+                    out[i, 0] = (take_profit_price - entry_price) / entry_price
+                    out[i, 1] = 1
+                    out[i, 2] = t
+                    break
+                elif tick_bid <= stop_loss_price:
+                    out[i, 0] = (stop_loss_price - entry_price) / entry_price
+                    out[i, 1] = -1
+                    out[i, 2] = t
+                    break
+            else:
+                if tick_bid <= take_profit_price:
+                    out[i, 0] = (take_profit_price - entry_price) / entry_price
+                    out[i, 1] = 1
+                    out[i, 2] = t
+                    break
+                elif tick_ask >= stop_loss_price:
+                    out[i, 0] = (stop_loss_price - entry_price) / entry_price
+                    out[i, 1] = -1
+                    out[i, 2] = t
+                    break
+        if out[i, 1] != 0: break
+
+    if out[i, 1] == 0:
+        final_price = (prices_high[timeout_time] + prices_low[timeout_time]) / 2.0
+        out[i, 0] = (final_price - entry_price) / entry_price
+        out[i, 1] = 0
+        out[i, 2] = timeout_time
+
+
+@njit(cache=True)
+def apply_labeling_v2_1_numba(prices_high: np.ndarray, prices_low: np.ndarray,
+                              slice_bid: np.ndarray, slice_ask: np.ndarray, offsets: np.ndarray,
+                              t_events: np.ndarray, pt_sl: np.ndarray, timeout_bars: int, side: int) -> np.ndarray:
+    """
+    Numba-optimized function for applying triple-barrier labeling v2.1 with tick-slice first-hit.
+
+    The ticks of bar t are slice_bid/slice_ask[offsets[t]:offsets[t + 1]] (see tick_slices_csr).
+    """
     n_events = len(t_events)
     out = np.zeros((n_events, 3))  # [ret, label, t_final]
-    
     for i in range(n_events):
-        entry_time = t_events[i]
-        entry_price = (prices_high[entry_time] + prices_low[entry_time]) / 2.0
-        
-        if side == 1:
-            take_profit_price = entry_price + pt_sl[0]
-            stop_loss_price = entry_price - pt_sl[1]
-        else:
-            take_profit_price = entry_price - pt_sl[0]
-            stop_loss_price = entry_price + pt_sl[1]
-        
-        timeout_time = min(entry_time + timeout_bars, len(prices_high) - 1)
-        
-        for t in range(entry_time + 1, timeout_time + 1):
-            # Use tick slice for this bar to find first hit
-            slice_data = tick_slices[t]
-            
-            for tick_idx in range(len(slice_data)):
-                tick_bid = slice_data[tick_idx, 0]
-                tick_ask = slice_data[tick_idx, 1]
-                
-                if side == 1:
-                    if tick_ask >= take_profit_price:
-                        out[i, 0] = (take_profit_price - entry_price) / entry_price
-                        out[i, 1] = 1
-                        out[i, 2] = t
-                        break
-                    elif tick_bid <= stop_loss_price:
-                        out[i, 0] = (stop_loss_price - entry_price) / entry_price
-                        out[i, 1] = -1
-                        out[i, 2] = t
-                        break
-                else:
-                    if tick_bid <= take_profit_price:
-                        out[i, 0] = (take_profit_price - entry_price) / entry_price
-                        out[i, 1] = 1
-                        out[i, 2] = t
-                        break
-                    elif tick_ask >= stop_loss_price:
-                        out[i, 0] = (stop_loss_price - entry_price) / entry_price
-                        out[i, 1] = -1
-                        out[i, 2] = t
-                        break
-            if out[i, 1] != 0: break
-        
-        if out[i, 1] == 0:
-            final_price = (prices_high[timeout_time] + prices_low[timeout_time]) / 2.0
-            out[i, 0] = (final_price - entry_price) / entry_price
-            out[i, 1] = 0
-            out[i, 2] = timeout_time
-            
+        _label_event_v2_1(i, prices_high, prices_low, slice_bid, slice_ask, offsets,
+                          t_events, pt_sl, timeout_bars, side, out)
+    return out
+
+@njit(parallel=True, cache=True)
+def apply_labeling_v2_1_parallel(prices_high: np.ndarray, prices_low: np.ndarray,
+                                 slice_bid: np.ndarray, slice_ask: np.ndarray, offsets: np.ndarray,
+                                 t_events: np.ndarray, pt_sl: np.ndarray, timeout_bars: int, side: int) -> np.ndarray:
+    """apply_labeling_v2_1_numba with prange over events; same result for any thread count."""
+    n_events = len(t_events)
+    out = np.zeros((n_events, 3))
+    for i in prange(n_events):
+        _label_event_v2_1(i, prices_high, prices_low, slice_bid, slice_ask, offsets,
+                          t_events, pt_sl, timeout_bars, side, out)
     return out
 
+_LABELING_SIGNATURE = "(float64[::1], float64[::1], float64[::1], float64[::1], int64[::1], " \
+                      "int64[::1], float64[::1], int64, int64)"
+
+# Signatures run() calls the kernels with (see core.labeling.jit_cache)
+KERNEL_SIGNATURES = {
+    "apply_labeling_v2_1_numba": (apply_labeling_v2_1_numba, [_LABELING_SIGNATURE]),
+    "apply_labeling_v2_1_parallel": (apply_labeling_v2_1_parallel, [_LABELING_SIGNATURE]),
+}
+
+def tick_slices_csr(tick_slices: pd.DataFrame, n_bars: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Flat CSR layout (offsets, bid, ask) of tick slices with a bar_idx column.
+
+    Ticks keep their order within a bar; ticks of bars outside [0, n_bars) are dropped.
+    """
+    bar_idx = tick_slices["bar_idx"].to_numpy(dtype=np.int64)
+    bid = tick_slices["bid"].to_numpy(dtype=np.float64)
+    ask = tick_slices["ask"].to_numpy(dtype=np.float64)
+    valid = (bar_idx >= 0) & (bar_idx < n_bars)
+    if not valid.all():
+        bar_idx, bid, ask = bar_idx[valid], bid[valid], ask[valid]
+    if len(bar_idx) > 1 and (bar_idx[1:] < bar_idx[:-1]).any():
+        order = np.argsort(bar_idx, kind="stable")
+        bar_idx, bid, ask = bar_idx[order], bid[order], ask[order]
+    offsets = np.zeros(n_bars + 1, dtype=np.int64)
+    np.cumsum(np.bincount(bar_idx, minlength=n_bars), out=offsets[1:])
+    return offsets, np.ascontiguousarray(bid), np.ascontiguousarray(ask)
+
+def load_tick_slices_csr(tick_slice_file: Path, n_bars: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """CSR ticks of the first n_bars bars from a tick-slice file or a CSR store directory."""
+    if TickSliceStore.is_store(tick_slice_file):
+        store = TickSliceStore(tick_slice_file)
+        offsets, _, bid, ask = store.read_bars(0, n_bars)
+        if len(offsets) < n_bars + 1:
+            offsets = np.concatenate((offsets, np.full(n_bars + 1 - len(offsets), offsets[-1])))
+        # Writable contiguous arrays match the compiled signature (Arrow reads are read-only)
+        return offsets, np.require(bid, np.float64, ["C", "W"]), np.require(ask, np.float64, ["C", "W"])
+    return tick_slices_csr(read_table(tick_slice_file, columns=["bar_idx", "bid", "ask"]), n_bars)
+
 def calculate_daily_volatility(close_prices: pd.Series, span: int = 100) -> pd.Series:
     daily_returns = close_prices.pct_change()
     volatility = daily_returns.ewm(span=span).std()
@@ -115,9 +187,9 @@ def run(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             if not input_file.exists() or not tick_slice_file.exists():
                 raise FileNotFoundError(f"Input or tick slice file not found.")
             
-            df = pd.read_parquet(input_file)
+            df = read_input(input_file, config)
             df = standardize_ohlc_columns(df.copy())
-            tick_slices_df = pd.read_parquet(tick_slice_file)
+            slice_offsets, slice_bid, slice_ask = load_tick_slices_csr(tick_slice_file, len(df))
             monitor.update("load", "Daten geladen", 10)
             
             monitor.update("volatility", "Berechne Volatilität", 20)
@@ -136,25 +208,26 @@ def run(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 sl_mult = config.get("sl_mult", 1.0)
                 pt = volatility * tp_mult
                 sl = volatility * sl_mult
-                pt_sl = np.array([pt.mean(), sl.mean()])
+                pt_sl = np.array([pt.mean(), sl.mean()], dtype=np.float64)
             else:
-                pt_sl = np.array([tp_pips * pip_size, sl_pips * pip_size])
+                pt_sl = np.array([tp_pips * pip_size, sl_pips * pip_size], dtype=np.float64)
             
-            timeout_bars = config.get("timeout_bars", 24)
+            timeout_bars = int(config.get("timeout_bars", 24))
             side = 1 if config.get("side", "long") == "long" else -1
             
             monitor.update("labeling", "Wende Labeling an", 50)
-            prices_high = df["high"].to_numpy()
-            prices_low = df["low"].to_numpy()
+            prices_high = np.ascontiguousarray(df["high"].to_numpy(), dtype=np.float64)
+            prices_low = np.ascontiguousarray(df["low"].to_numpy(), dtype=np.float64)
             
-            # Prepare tick slices for Numba
-            tick_slices_grouped = tick_slices_df.groupby('bar_idx')
-            tick_slices_list = [np.empty((0, 2), dtype=np.float64)] * len(df)
-
-            for i, group in tick_slices_grouped:
-                tick_slices_list[i] = np.ascontiguousarray(group[["bid", "ask"]].to_numpy())
-
-            results = apply_labeling_v2_1_numba(prices_high, prices_low, tick_slices_list, t_events, pt_sl, timeout_bars, side)
+            n_threads = config.get("n_threads")
+            serial = resolve_threads(n_threads) == 1
+            startup = compile_kernels(KERNEL_SIGNATURES, ["apply_labeling_v2_1_numba" if serial
+                                                          else "apply_labeling_v2_1_parallel"])
+            t0 = time.perf_counter()
+            results = run_kernel(apply_labeling_v2_1_numba, apply_labeling_v2_1_parallel, n_threads,
+                                 prices_high, prices_low, slice_bid, slice_ask, slice_offsets,
+                                 t_events, pt_sl, timeout_bars, side)
+            startup["labeling_seconds"] = round(time.perf_counter() - t0, 6)
             
             monitor.update("dataframe", "Erstelle gelabeltes DataFrame", 80)
             df_labeled = df.copy()
@@ -170,6 +243,7 @@ def run(config: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 "n_events": len(df_labeled),
                 "label_counts": df_labeled["label"].value_counts().to_dict(),
                 "avg_return": df_labeled["ret"].mean(),
+                "startup": startup,
                 "config_used": config
             }
             report_file = out_dir / "labeling_report_v2_1.json"
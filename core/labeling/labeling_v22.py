@@ -7,18 +7,34 @@ Key v2.2 Enhancements:
 3. Timeout in seconds in addition to bar-based timeout
 4. Enhanced side support (long/short/both) with improved logic
 5. Integration with DataIngest v2.2 tick-slice exports
+6. Exact integer first-hit checks on fixed-point CSR tick slices
+7. Events labeled in parallel (prange) with a thread knob (n_threads)
+8. Kernels cached on disk with explicit signatures (see core.labeling.jit_cache)
+9. Barrier search jumps over bars that cannot touch a barrier (range index)
+10. Bid/ask first hit (barrier_prices "bid_ask"): bar-level ask/bid extremes
+    find the candidate bar, its CSR tick slice resolves the hit in one kernel
 """
 
 import pandas as pd
 import numpy as np
+import pyarrow as pa
 from pathlib import Path
 import json
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional, Tuple
-from numba import njit
+from numba import njit, prange
+import time
 import warnings
 
+from core.data_ingest.tick_store import TickSliceStore
+from core.data_ingest.fixed_point import PriceCodec
+from core.data_ingest.parquet_profiles import write_table
+from core.data_ingest.bar_store import read_input
+from core.labeling.jit_cache import compile_kernels
+from core.labeling.threads import resolve_threads, run_kernel
+
 MODULE_VERSION = "2.2"
+RANGE_BLOCK = 32  # Bars per block of the range index
 
 def _log_progress(out_dir: Path, step: str, percent: int, message: str):
     """Enhanced progress logging"""
@@ -35,7 +51,7 @@ def _log_progress(out_dir: Path, step: str, percent: int, message: str):
     with open(log_file, "a") as f:
         f.write(json.dumps(log_entry) + "\n")
 
-@njit
+@njit(cache=True)
 def _calculate_ewma_volatility(returns: np.ndarray, alpha: float = 0.94) -> np.ndarray:
     """
     Calculate EWMA volatility for dynamic scaling
@@ -59,7 +75,7 @@ def _calculate_ewma_volatility(returns: np.ndarray, alpha: float = 0.94) -> np.n
     
     return np.sqrt(ewma_var)
 
-@njit
+@njit(cache=True)
 def _first_hit_detection(tick_prices: np.ndarray, tick_times_ns: np.ndarray, 
                         entry_price: float, tp_price: float, sl_price: float,
                         side: int) -> Tuple[int, float, int]:
@@ -98,7 +114,236 @@ def _first_hit_detection(tick_prices: np.ndarray, tick_times_ns: np.ndarray,
     
     return 0, price, tick_times_ns[-1]  # No hit, return last price
 
-@njit
+@njit(cache=True)
+def _first_hit_detection_points(tick_mid2: np.ndarray, tick_times_ns: np.ndarray,
+                                tp_level: int, sl_level: int, side: int) -> Tuple[int, int]:
+    """
+    First-hit detection on fixed-point ticks with integer comparisons only
+    
+    Args:
+        tick_mid2: Array of bid + ask in points (twice the mid price)
+        tick_times_ns: Array of tick timestamps in nanoseconds
+        tp_level: Take profit level in the same units, rounded inwards
+        sl_level: Stop loss level in the same units, rounded inwards
+        side: Trade side (1 for long, -1 for short)
+    
+    Returns:
+        Tuple of (hit_type, exit_time_ns), hit_type as in _first_hit_detection
+    """
+    for i in range(len(tick_mid2)):
+        m = tick_mid2[i]
+        if side == 1:
+            if m >= tp_level:
+                return 1, tick_times_ns[i]
+            elif m <= sl_level:
+                return -1, tick_times_ns[i]
+        else:
+            if m <= tp_level:
+                return 1, tick_times_ns[i]
+            elif m >= sl_level:
+                return -1, tick_times_ns[i]
+    
+    return 0, 0
+
+@njit(cache=True)
+def _build_range_index(highs: np.ndarray, lows: np.ndarray, block: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Range max of highs / min of lows index for _first_touch
+    
+    Row 0 holds the max/min of every block of `block` bars; row k the
+    max/min of 2**k consecutive blocks starting at each block (sparse table).
+    Memory is 2 * n / block * log2(n / block) floats.
+    """
+    n = len(highs)
+    n_blocks = (n + block - 1) // block
+    levels = 1
+    while (1 << levels) <= n_blocks:
+        levels += 1
+    range_max = np.empty((levels, max(n_blocks, 1)))
+    range_min = np.empty((levels, max(n_blocks, 1)))
+    for b in range(n_blocks):
+        # NaN never touches a barrier and is left out (all-NaN block: -inf/inf)
+        hi = -np.inf
+        lo = np.inf
+        for t in range(b * block, min(b * block + block, n)):
+            if highs[t] > hi:
+                hi = highs[t]
+            if lows[t] < lo:
+                lo = lows[t]
+        range_max[0, b] = hi
+        range_min[0, b] = lo
+    for k in range(1, levels):
+        half = 1 << (k - 1)
+        for b in range(n_blocks - (1 << k) + 1):
+            range_max[k, b] = max(range_max[k - 1, b], range_max[k - 1, b + half])
+            range_min[k, b] = min(range_min[k - 1, b], range_min[k - 1, b + half])
+    return range_max, range_min
+
+@njit(cache=True)
+def _first_touch(highs: np.ndarray, lows: np.ndarray, range_max: np.ndarray, range_min: np.ndarray,
+                 block: int, start: int, end: int, upper: float, lower: float) -> int:
+    """
+    First t in [start, end] with highs[t] >= upper or lows[t] <= lower, -1 if none
+    
+    Scans to the next block boundary, skips clean blocks in O(log) with the
+    sparse table (binary lifting), then scans the first block that can hold
+    a touch: at most 2 * block values are compared one by one.
+    """
+    t = start
+    head_end = min(end + 1, (start // block + 1) * block)
+    while t < head_end:
+        if highs[t] >= upper or lows[t] <= lower:
+            return t
+        t += 1
+    if t > end:
+        return -1
+    
+    b = t // block
+    span = end // block - b  # Whole blocks before the block of end
+    for k in range(range_max.shape[0] - 1, -1, -1):
+        step = 1 << k
+        if step <= span and range_max[k, b] < upper and range_min[k, b] > lower:
+            b += step
+            span -= step
+    
+    for t in range(b * block, end + 1):
+        if highs[t] >= upper or lows[t] <= lower:
+            return t
+    return -1
+
+@njit(cache=True)
+def _barrier_event_v22(i: int, bar_prices: np.ndarray, bar_times_ns: np.ndarray,
+                       event_indices: np.ndarray, tp_levels: np.ndarray,
+                       sl_levels: np.ndarray, timeout_bars: np.ndarray,
+                       timeout_seconds: np.ndarray, sides: np.ndarray,
+                       volatilities: np.ndarray, range_max: np.ndarray, range_min: np.ndarray,
+                       results: np.ndarray):
+    """Label event i into results[i] (see _apply_triple_barrier_v22)"""
+    n_bars = len(bar_prices)
+    event_idx = event_indices[i]
+    if event_idx >= n_bars - 1:
+        return
+
+    entry_price = bar_prices[event_idx]
+    entry_time_ns = bar_times_ns[event_idx]
+    vol = volatilities[i]
+    side = sides[i]
+
+    # Calculate dynamic TP/SL levels
+    tp_distance = tp_levels[i] * vol
+    sl_distance = sl_levels[i] * vol
+
+    if side == 1:  # Long
+        tp_price = entry_price + tp_distance
+        sl_price = entry_price - sl_distance
+    elif side == -1:  # Short
+        tp_price = entry_price - tp_distance
+        sl_price = entry_price + sl_distance
+    else:  # Both sides - use the side that hits first
+        tp_price_long = entry_price + tp_distance
+        sl_price_long = entry_price - sl_distance
+        tp_price_short = entry_price - tp_distance
+        sl_price_short = entry_price + sl_distance
+
+    # Calculate timeout
+    timeout_bar_idx = min(event_idx + timeout_bars[i], n_bars - 1)
+    timeout_time_ns = entry_time_ns + timeout_seconds[i] * 1_000_000_000
+
+    # Search for hits
+    hit_type = 0
+    exit_price = entry_price
+    exit_time_ns = entry_time_ns
+
+    # Prices at or beyond these levels touch a barrier
+    if side == 1:
+        upper, lower = tp_price, sl_price
+    elif side == -1:
+        upper, lower = sl_price, tp_price
+    else:
+        upper = min(tp_price_long, sl_price_short)
+        lower = max(sl_price_long, tp_price_short)
+
+    # Bars are time-ordered: the time-based timeout is the last bar closed by then
+    last_bar = min(timeout_bar_idx, np.searchsorted(bar_times_ns, timeout_time_ns, side="right") - 1)
+    t = _first_touch(bar_prices, bar_prices, range_max, range_min, RANGE_BLOCK,
+                     event_idx + 1, last_bar, upper, lower)
+
+    if t >= 0:
+        current_time_ns = bar_times_ns[t]
+        current_price = bar_prices[t]
+
+        if side == 1:  # Long position
+            if current_price >= tp_price:
+                hit_type = 1  # TP hit
+                exit_price = tp_price
+                exit_time_ns = current_time_ns
+            elif current_price <= sl_price:
+                hit_type = -1  # SL hit
+                exit_price = sl_price
+                exit_time_ns = current_time_ns
+        elif side == -1:  # Short position
+            if current_price <= tp_price:
+                hit_type = 1  # TP hit
+                exit_price = tp_price
+                exit_time_ns = current_time_ns
+            elif current_price >= sl_price:
+                hit_type = -1  # SL hit
+                exit_price = sl_price
+                exit_time_ns = current_time_ns
+        else:  # Both sides
+            # Check long side
+            if current_price >= tp_price_long:
+                hit_type = 1
+                exit_price = tp_price_long
+                exit_time_ns = current_time_ns
+                side = 1  # Record as long trade
+            elif current_price <= sl_price_long:
+                hit_type = -1
+                exit_price = sl_price_long
+                exit_time_ns = current_time_ns
+                side = 1
+            # Check short side
+            elif current_price <= tp_price_short:
+                hit_type = 1
+                exit_price = tp_price_short
+                exit_time_ns = current_time_ns
+                side = -1  # Record as short trade
+            elif current_price >= sl_price_short:
+                hit_type = -1
+                exit_price = sl_price_short
+                exit_time_ns = current_time_ns
+                side = -1
+
+    # If no hit, use timeout exit
+    if hit_type == 0:
+        if timeout_bar_idx < n_bars:
+            exit_price = bar_prices[timeout_bar_idx]
+            exit_time_ns = bar_times_ns[timeout_bar_idx]
+        hit_type = 0  # Timeout
+
+    # Calculate return
+    if side == 1:  # Long
+        ret = (exit_price - entry_price) / entry_price
+    elif side == -1:  # Short
+        ret = (entry_price - exit_price) / entry_price
+    else:
+        ret = 0.0  # Should not happen
+
+    # Assign label
+    if hit_type == 1:
+        label = 1  # Profitable
+    elif hit_type == -1:
+        label = -1  # Loss
+    else:
+        label = 0  # Timeout/Neutral
+
+    results[i, 0] = ret
+    results[i, 1] = label
+    results[i, 2] = exit_time_ns
+    results[i, 3] = hit_type
+    results[i, 4] = vol
+
+@njit(cache=True)
 def _apply_triple_barrier_v22(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
                              event_indices: np.ndarray, tp_levels: np.ndarray, 
                              sl_levels: np.ndarray, timeout_bars: np.ndarray,
@@ -107,6 +352,10 @@ def _apply_triple_barrier_v22(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
     """
     Enhanced triple-barrier labeling with First-Hit-Logic and dynamic volatility
     
+    The range index over bar_prices is built once per call; each event then
+    jumps to its first touching bar instead of walking every bar to timeout.
+    bar_times_ns must be ascending (the time-based timeout is a searchsorted).
+    
     Args:
         bar_prices: Array of bar mid prices
         bar_times_ns: Array of bar timestamps in nanoseconds
@@ -123,130 +372,205 @@ def _apply_triple_barrier_v22(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
         [return, label, exit_time_ns, hit_type, volatility_used]
     """
     n_events = len(event_indices)
-    n_bars = len(bar_prices)
     results = np.zeros((n_events, 5))
+    range_max, range_min = _build_range_index(bar_prices, bar_prices, RANGE_BLOCK)
     
     for i in range(n_events):
-        event_idx = event_indices[i]
-        if event_idx >= n_bars - 1:
-            continue
-            
-        entry_price = bar_prices[event_idx]
-        entry_time_ns = bar_times_ns[event_idx]
-        vol = volatilities[i]
-        side = sides[i]
-        
-        # Calculate dynamic TP/SL levels
-        tp_distance = tp_levels[i] * vol
-        sl_distance = sl_levels[i] * vol
-        
-        if side == 1:  # Long
-            tp_price = entry_price + tp_distance
-            sl_price = entry_price - sl_distance
-        elif side == -1:  # Short
-            tp_price = entry_price - tp_distance
-            sl_price = entry_price + sl_distance
-        else:  # Both sides - use the side that hits first
-            tp_price_long = entry_price + tp_distance
-            sl_price_long = entry_price - sl_distance
-            tp_price_short = entry_price - tp_distance
-            sl_price_short = entry_price + sl_distance
-        
-        # Calculate timeout
-        timeout_bar_idx = min(event_idx + timeout_bars[i], n_bars - 1)
-        timeout_time_ns = entry_time_ns + timeout_seconds[i] * 1_000_000_000
-        
-        # Search for hits
-        hit_type = 0
-        exit_price = entry_price
-        exit_time_ns = entry_time_ns
-        
-        for t in range(event_idx + 1, timeout_bar_idx + 1):
-            current_time_ns = bar_times_ns[t]
-            
-            # Check time-based timeout
-            if current_time_ns > timeout_time_ns:
+        _barrier_event_v22(i, bar_prices, bar_times_ns, event_indices, tp_levels, sl_levels,
+                           timeout_bars, timeout_seconds, sides, volatilities, range_max, range_min, results)
+    
+    return results
+
+@njit(parallel=True, cache=True)
+def _apply_triple_barrier_v22_parallel(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
+                                       event_indices: np.ndarray, tp_levels: np.ndarray,
+                                       sl_levels: np.ndarray, timeout_bars: np.ndarray,
+                                       timeout_seconds: np.ndarray, sides: np.ndarray,
+                                       volatilities: np.ndarray) -> np.ndarray:
+    """
+    _apply_triple_barrier_v22 with the events spread over numba threads
+    
+    Every event only reads the shared inputs and writes its own result row,
+    so the output is identical to the serial kernel for any thread count.
+    """
+    n_events = len(event_indices)
+    results = np.zeros((n_events, 5))
+    range_max, range_min = _build_range_index(bar_prices, bar_prices, RANGE_BLOCK)
+    
+    for i in prange(n_events):
+        _barrier_event_v22(i, bar_prices, bar_times_ns, event_indices, tp_levels, sl_levels,
+                           timeout_bars, timeout_seconds, sides, volatilities, range_max, range_min, results)
+    
+    return results
+
+@njit(cache=True)
+def _barrier_event_bid_ask(i: int, bar_prices: np.ndarray, bar_times_ns: np.ndarray,
+                           ask_max: np.ndarray, bid_min: np.ndarray, offsets: np.ndarray,
+                           tick_ts: np.ndarray, tick_bid: np.ndarray, tick_ask: np.ndarray,
+                           event_indices: np.ndarray, tp_levels: np.ndarray,
+                           sl_levels: np.ndarray, timeout_bars: np.ndarray,
+                           timeout_seconds: np.ndarray, sides: np.ndarray,
+                           volatilities: np.ndarray, range_max: np.ndarray, range_min: np.ndarray,
+                           results: np.ndarray):
+    """Label event i into results[i] (see _apply_triple_barrier_bid_ask)"""
+    n_bars = len(bar_prices)
+    event_idx = event_indices[i]
+    if event_idx >= n_bars - 1:
+        return
+
+    entry_price = bar_prices[event_idx]
+    entry_time_ns = bar_times_ns[event_idx]
+    vol = volatilities[i]
+    side = sides[i]
+
+    # Long barriers are hit by the ask (TP) and bid (SL), short ones by bid (TP) and ask (SL)
+    tp_distance = tp_levels[i] * vol
+    sl_distance = sl_levels[i] * vol
+    tp_long = entry_price + tp_distance
+    sl_long = entry_price - sl_distance
+    tp_short = entry_price - tp_distance
+    sl_short = entry_price + sl_distance
+
+    # Asks at or above upper / bids at or below lower touch a barrier
+    if side == 1:
+        upper, lower = tp_long, sl_long
+    elif side == -1:
+        upper, lower = sl_short, tp_short
+    else:
+        upper = min(tp_long, sl_short)
+        lower = max(sl_long, tp_short)
+
+    timeout_bar_idx = min(event_idx + timeout_bars[i], n_bars - 1)
+    timeout_time_ns = entry_time_ns + timeout_seconds[i] * 1_000_000_000
+    last_bar = min(timeout_bar_idx, np.searchsorted(bar_times_ns, timeout_time_ns, side="right") - 1)
+
+    hit_type = 0
+    exit_price = entry_price
+    exit_time_ns = entry_time_ns
+
+    # Coarse: first bar whose ask/bid extremes reach a barrier; fine: its ticks in order
+    start = event_idx + 1
+    while hit_type == 0:
+        t = _first_touch(ask_max, bid_min, range_max, range_min, RANGE_BLOCK, start, last_bar, upper, lower)
+        if t < 0:
+            break
+        for k in range(offsets[t], offsets[t + 1]):
+            bid = tick_bid[k]
+            ask = tick_ask[k]
+            if side == 1:
+                if ask >= tp_long:
+                    hit_type, exit_price = 1, tp_long
+                elif bid <= sl_long:
+                    hit_type, exit_price = -1, sl_long
+            elif side == -1:
+                if bid <= tp_short:
+                    hit_type, exit_price = 1, tp_short
+                elif ask >= sl_short:
+                    hit_type, exit_price = -1, sl_short
+            else:
+                if ask >= tp_long:
+                    hit_type, exit_price, side = 1, tp_long, 1
+                elif bid <= sl_long:
+                    hit_type, exit_price, side = -1, sl_long, 1
+                elif bid <= tp_short:
+                    hit_type, exit_price, side = 1, tp_short, -1
+                elif ask >= sl_short:
+                    hit_type, exit_price, side = -1, sl_short, -1
+            if hit_type != 0:
+                exit_time_ns = tick_ts[k]
                 break
-                
-            current_price = bar_prices[t]
-            
-            if side == 1:  # Long position
-                if current_price >= tp_price:
-                    hit_type = 1  # TP hit
-                    exit_price = tp_price
-                    exit_time_ns = current_time_ns
-                    break
-                elif current_price <= sl_price:
-                    hit_type = -1  # SL hit
-                    exit_price = sl_price
-                    exit_time_ns = current_time_ns
-                    break
-            elif side == -1:  # Short position
-                if current_price <= tp_price:
-                    hit_type = 1  # TP hit
-                    exit_price = tp_price
-                    exit_time_ns = current_time_ns
-                    break
-                elif current_price >= sl_price:
-                    hit_type = -1  # SL hit
-                    exit_price = sl_price
-                    exit_time_ns = current_time_ns
-                    break
-            else:  # Both sides
-                # Check long side
-                if current_price >= tp_price_long:
-                    hit_type = 1
-                    exit_price = tp_price_long
-                    exit_time_ns = current_time_ns
-                    side = 1  # Record as long trade
-                    break
-                elif current_price <= sl_price_long:
-                    hit_type = -1
-                    exit_price = sl_price_long
-                    exit_time_ns = current_time_ns
-                    side = 1
-                    break
-                # Check short side
-                elif current_price <= tp_price_short:
-                    hit_type = 1
-                    exit_price = tp_price_short
-                    exit_time_ns = current_time_ns
-                    side = -1  # Record as short trade
-                    break
-                elif current_price >= sl_price_short:
-                    hit_type = -1
-                    exit_price = sl_price_short
-                    exit_time_ns = current_time_ns
-                    side = -1
-                    break
-        
-        # If no hit, use timeout exit
-        if hit_type == 0:
-            if timeout_bar_idx < n_bars:
-                exit_price = bar_prices[timeout_bar_idx]
-                exit_time_ns = bar_times_ns[timeout_bar_idx]
-            hit_type = 0  # Timeout
-        
-        # Calculate return
-        if side == 1:  # Long
-            ret = (exit_price - entry_price) / entry_price
-        elif side == -1:  # Short
-            ret = (entry_price - exit_price) / entry_price
-        else:
-            ret = 0.0  # Should not happen
-        
-        # Assign label
-        if hit_type == 1:
-            label = 1  # Profitable
-        elif hit_type == -1:
-            label = -1  # Loss
-        else:
-            label = 0  # Timeout/Neutral
-        
-        results[i] = [ret, label, exit_time_ns, hit_type, vol]
+        start = t + 1
+
+    if hit_type == 0:
+        exit_price = bar_prices[timeout_bar_idx]
+        exit_time_ns = bar_times_ns[timeout_bar_idx]
+
+    if side == 1:
+        ret = (exit_price - entry_price) / entry_price
+    elif side == -1:
+        ret = (entry_price - exit_price) / entry_price
+    else:
+        ret = 0.0
+
+    results[i, 0] = ret
+    results[i, 1] = hit_type
+    results[i, 2] = exit_time_ns
+    results[i, 3] = hit_type
+    results[i, 4] = vol
+
+@njit(cache=True)
+def _apply_triple_barrier_bid_ask(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
+                                  ask_max: np.ndarray, bid_min: np.ndarray, offsets: np.ndarray,
+                                  tick_ts: np.ndarray, tick_bid: np.ndarray, tick_ask: np.ndarray,
+                                  event_indices: np.ndarray, tp_levels: np.ndarray,
+                                  sl_levels: np.ndarray, timeout_bars: np.ndarray,
+                                  timeout_seconds: np.ndarray, sides: np.ndarray,
+                                  volatilities: np.ndarray) -> np.ndarray:
+    """
+    Two-level bid/ask triple-barrier labeling over a CSR tick-slice store
+    
+    Barriers are placed as in _apply_triple_barrier_v22 (bar mid entry,
+    volatility-scaled distances) but hit by executable prices: ask for a
+    long TP and a short SL, bid for a long SL and a short TP. The range
+    index over the per-bar ask max / bid min (TickSliceStore.bar_extremes)
+    finds the first bar that can touch a barrier; only that bar's ticks
+    (offsets[t]:offsets[t + 1]) are scanned for the first hit, whose tick
+    time is the exit time. Bars whose extremes are out of reach are never
+    read tick by tick.
+    
+    Returns:
+        Array of shape (n_events, 5) as _apply_triple_barrier_v22
+    """
+    n_events = len(event_indices)
+    results = np.zeros((n_events, 5))
+    range_max, range_min = _build_range_index(ask_max, bid_min, RANGE_BLOCK)
+    
+    for i in range(n_events):
+        _barrier_event_bid_ask(i, bar_prices, bar_times_ns, ask_max, bid_min, offsets, tick_ts, tick_bid,
+                               tick_ask, event_indices, tp_levels, sl_levels, timeout_bars, timeout_seconds,
+                               sides, volatilities, range_max, range_min, results)
     
     return results
 
+@njit(parallel=True, cache=True)
+def _apply_triple_barrier_bid_ask_parallel(bar_prices: np.ndarray, bar_times_ns: np.ndarray,
+                                           ask_max: np.ndarray, bid_min: np.ndarray, offsets: np.ndarray,
+                                           tick_ts: np.ndarray, tick_bid: np.ndarray, tick_ask: np.ndarray,
+                                           event_indices: np.ndarray, tp_levels: np.ndarray,
+                                           sl_levels: np.ndarray, timeout_bars: np.ndarray,
+                                           timeout_seconds: np.ndarray, sides: np.ndarray,
+                                           volatilities: np.ndarray) -> np.ndarray:
+    """_apply_triple_barrier_bid_ask with the events spread over numba threads"""
+    n_events = len(event_indices)
+    results = np.zeros((n_events, 5))
+    range_max, range_min = _build_range_index(ask_max, bid_min, RANGE_BLOCK)
+    
+    for i in prange(n_events):
+        _barrier_event_bid_ask(i, bar_prices, bar_times_ns, ask_max, bid_min, offsets, tick_ts, tick_bid,
+                               tick_ask, event_indices, tp_levels, sl_levels, timeout_bars, timeout_seconds,
+                               sides, volatilities, range_max, range_min, results)
+    
+    return results
+
+_BARRIER_SIGNATURE = "(float64[::1], int64[::1], int64[::1], float64[::1], float64[::1], " \
+                     "int64[::1], int64[::1], int64[::1], float64[::1])"
+_BID_ASK_SIGNATURE = "(float64[::1], int64[::1], float64[::1], float64[::1], int64[::1], int64[::1], " \
+                     "float64[::1], float64[::1], int64[::1], float64[::1], float64[::1], int64[::1], " \
+                     "int64[::1], int64[::1], float64[::1])"
+
+# Signatures run() calls the kernels with (see core.labeling.jit_cache)
+KERNEL_SIGNATURES = {
+    "_calculate_ewma_volatility": (_calculate_ewma_volatility, ["(float64[::1], float64)"]),
+    "_first_hit_detection": (_first_hit_detection,
+                             ["(float64[::1], int64[::1], float64, float64, float64, int64)"]),
+    "_first_hit_detection_points": (_first_hit_detection_points,
+                                    ["(int64[::1], int64[::1], int64, int64, int64)"]),
+    "_apply_triple_barrier_v22": (_apply_triple_barrier_v22, [_BARRIER_SIGNATURE]),
+    "_apply_triple_barrier_v22_parallel": (_apply_triple_barrier_v22_parallel, [_BARRIER_SIGNATURE]),
+    "_apply_triple_barrier_bid_ask": (_apply_triple_barrier_bid_ask, [_BID_ASK_SIGNATURE]),
+    "_apply_triple_barrier_bid_ask_parallel": (_apply_triple_barrier_bid_ask_parallel, [_BID_ASK_SIGNATURE]),
+}
+
 def _load_tick_slices(slice_dir: Path, event_ids: List[int]) -> Dict[int, pd.DataFrame]:
     """
     Load tick slices for specified events
@@ -258,6 +582,9 @@ def _load_tick_slices(slice_dir: Path, event_ids: List[int]) -> Dict[int, pd.Dat
     Returns:
         Dictionary mapping event_id to tick slice DataFrame
     """
+    if TickSliceStore.is_store(slice_dir):
+        return _load_tick_slices_csr(slice_dir, event_ids)
+    
     tick_slices = {}
     
     for event_id in event_ids:
@@ -272,15 +599,81 @@ def _load_tick_slices(slice_dir: Path, event_ids: List[int]) -> Dict[int, pd.Dat
     
     return tick_slices
 
+def _load_tick_slices_csr(slice_dir: Path, event_ids: List[int]) -> Dict[int, pd.DataFrame]:
+    """
+    Load tick slices for specified events from a consolidated CSR store
+    
+    All requested events are fetched with a single read of the row groups
+    covering their bar range; per-event frames are views into that read.
+    Fixed-point stores add a mid2_points column (bid + ask in points).
+    """
+    store = TickSliceStore(slice_dir)
+    ids = sorted({int(e) for e in event_ids if 0 <= int(e) < store.n_bars})
+    if not ids:
+        return {}
+    
+    first = ids[0]
+    fixed = store.codec is not None
+    offsets, ts, bid, ask = store.read_bars(first, ids[-1] + 1, points=fixed)
+    mid2 = bid.astype(np.int64) + ask if fixed else None
+    if fixed:
+        bid, ask = store.codec.decode(bid), store.codec.decode(ask)
+    tick_slices = {}
+    for event_id in ids:
+        s, e = offsets[event_id - first], offsets[event_id - first + 1]
+        if e <= s:
+            continue
+        tick_slices[event_id] = pd.DataFrame({
+            "ts_ns": ts[s:e], "bid": bid[s:e], "ask": ask[s:e],
+            "mid_price": (bid[s:e] + ask[s:e]) / 2
+        })
+        if fixed:
+            tick_slices[event_id]["mid2_points"] = mid2[s:e]
+    
+    return tick_slices
+
+def _load_bid_ask_slices(slice_dir: Path, n_bars: int, event_indices: np.ndarray,
+                         max_timeout_bars: int) -> Tuple[np.ndarray, ...]:
+    """
+    Inputs of _apply_triple_barrier_bid_ask from a CSR tick-slice store
+    
+    Returns (ask_max, bid_min, offsets, ts_ns, bid, ask) for bars [0, n_bars).
+    The extremes come from the store's per-bar index; the ticks are fetched
+    with a single read of the bars the events can reach (first event to its
+    last timeout bar), and bars outside that range (or beyond the store)
+    have no ticks in offsets. Store bar i must be bar i of the bar file
+    (run() checks the bar counts and the frame).
+    """
+    store = TickSliceStore(slice_dir)
+    ask_max = np.full(n_bars, -np.inf)
+    bid_min = np.full(n_bars, np.inf)
+    store_ask_max, store_bid_min = store.bar_extremes()
+    m = min(n_bars, store.n_bars)
+    ask_max[:m] = store_ask_max[:m]
+    bid_min[:m] = store_bid_min[:m]
+    
+    offsets = np.zeros(n_bars + 1, dtype=np.int64)
+    if len(event_indices) == 0:
+        return ask_max, bid_min, offsets, np.zeros(0, np.int64), np.zeros(0), np.zeros(0)
+    first = int(event_indices.min()) + 1
+    local, ts, bid, ask = store.read_bars(first, min(int(event_indices.max()) + max_timeout_bars + 1, n_bars))
+    offsets[first:first + len(local)] = local
+    offsets[first + len(local):] = local[-1]
+    # Writable contiguous arrays match the compiled signature (Arrow reads are read-only)
+    return (ask_max, bid_min, offsets, np.require(ts, np.int64, ["C", "W"]),
+            np.require(bid, np.float64, ["C", "W"]), np.require(ask, np.float64, ["C", "W"]))
+
 def _enhance_with_tick_slices(results: np.ndarray, tick_slices: Dict[int, pd.DataFrame],
                             event_indices: np.ndarray, bar_prices: np.ndarray,
                             tp_levels: np.ndarray, sl_levels: np.ndarray,
-                            sides: np.ndarray, volatilities: np.ndarray) -> np.ndarray:
+                            sides: np.ndarray, volatilities: np.ndarray,
+                            codec: Optional[PriceCodec] = None) -> np.ndarray:
     """
     Enhance results with tick-level first-hit detection
     
     This function refines the bar-level results using tick-slice data
-    for more precise exit timing and price determination.
+    for more precise exit timing and price determination. With the codec of
+    a fixed-point slice store the barrier checks are integer comparisons.
     """
     enhanced_results = results.copy()
     
@@ -310,12 +703,22 @@ def _enhance_with_tick_slices(results: np.ndarray, tick_slices: Dict[int, pd.Dat
             continue  # Skip both-sided for tick enhancement
         
         # Apply first-hit detection
-        tick_prices = tick_slice['mid_price'].values
         tick_times = tick_slice['ts_ns'].values
         
-        hit_type, exit_price, exit_time_ns = _first_hit_detection(
-            tick_prices, tick_times, entry_price, tp_price, sl_price, side
-        )
+        if codec is not None and 'mid2_points' in tick_slice:
+            # Barriers rounded inwards to the integer grid of bid + ask
+            if side == 1:
+                tp_level, sl_level = codec.at_least(tp_price, 2), codec.at_most(sl_price, 2)
+            else:
+                tp_level, sl_level = codec.at_most(tp_price, 2), codec.at_least(sl_price, 2)
+            hit_type, exit_time_ns = _first_hit_detection_points(
+                tick_slice['mid2_points'].values, tick_times, tp_level, sl_level, side
+            )
+            exit_price = tp_price if hit_type == 1 else sl_price
+        else:
+            hit_type, exit_price, exit_time_ns = _first_hit_detection(
+                tick_slice['mid_price'].values, tick_times, entry_price, tp_price, sl_price, side
+            )
         
         if hit_type != 0:  # Update if we found a hit
             # Calculate refined return
@@ -336,7 +739,8 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         config: Configuration dictionary with the following keys:
-            - bars_path: Path to bar data (parquet file)
+            - bars_path: Path to bar data (parquet file or partitioned bar store root)
+            - symbol, frame, start, end: Selection when bars_path is a bar store
             - tick_slices_dir: Path to tick slices directory (optional)
             - out_dir: Output directory
             - events: List of event configurations or path to events file
@@ -348,9 +752,15 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
             - vol_lookback: Lookback period for volatility calculation (default: 20)
             - vol_alpha: EWMA alpha for volatility (default: 0.94)
             - use_tick_slices: Whether to use tick slices for first-hit (default: True)
+            - barrier_prices: "mid" (bar mid vs barriers, then tick refinement of
+              the event bar) or "bid_ask" (two-level bid/ask first hit over the
+              CSR store in tick_slices_dir, see _apply_triple_barrier_bid_ask)
+              (default: "mid")
+            - n_threads: Threads for the event loop, 1 = serial (default: all cores)
     
     Returns:
-        Dictionary with results and metadata
+        Dictionary with results and metadata; "startup" has the kernel
+        compile/cache-load times and the labeling kernel time
     """
     
     # Setup
@@ -365,7 +775,7 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         raise FileNotFoundError(f"Bars file not found: {bars_path}")
     
     _log_progress(out_dir, "load_bars", 10, f"Loading bars from {bars_path}")
-    bars_df = pd.read_parquet(bars_path)
+    bars_df = read_input(bars_path, config)
     
     # Ensure required columns
     required_cols = ["t_open_ns", "t_close_ns", "o", "h", "l", "c"]
@@ -401,7 +811,7 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         raise ValueError("No events to process")
     
     # Extract event indices
-    event_indices = np.array([event.get("index", event.get("bar_index", 0)) for event in events])
+    event_indices = np.array([event.get("index", event.get("bar_index", 0)) for event in events], dtype=np.int64)
     event_indices = event_indices[event_indices < len(bars_df) - 1]  # Ensure valid indices
     
     _log_progress(out_dir, "volatility", 30, "Calculating dynamic volatility")
@@ -410,8 +820,34 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     vol_lookback = config.get("vol_lookback", 20)
     vol_alpha = config.get("vol_alpha", 0.94)
     
-    returns = bars_df["returns"].values
-    ewma_vol = _calculate_ewma_volatility(returns, vol_alpha)
+    # Load or compile the kernels of this run before the first call
+    use_tick_slices = config.get("use_tick_slices", True)
+    tick_slices_dir = config.get("tick_slices_dir")
+    n_threads = config.get("n_threads")
+    barrier_prices = config.get("barrier_prices", "mid")
+    if barrier_prices not in ("mid", "bid_ask"):
+        raise ValueError(f"Unknown barrier_prices: {barrier_prices}")
+    bid_ask = barrier_prices == "bid_ask"
+    if bid_ask and not (tick_slices_dir and TickSliceStore.is_store(Path(tick_slices_dir))):
+        raise ValueError("barrier_prices 'bid_ask' needs a CSR tick-slice store as tick_slices_dir")
+    if bid_ask:
+        # The store has no bar times, so its bars must be the bars of this run one to one
+        store = TickSliceStore(Path(tick_slices_dir))
+        if store.n_bars != len(bars_df):
+            raise ValueError(f"Tick-slice store has {store.n_bars} bars, bars_path has {len(bars_df)}")
+        store_frame = store.manifest.get("frame_name")
+        if config.get("frame") is not None and store_frame != config["frame"]:
+            raise ValueError(f"Tick-slice store is for frame {store_frame!r}, not {config['frame']!r}")
+    barrier_kernel = "_apply_triple_barrier_bid_ask" if bid_ask else "_apply_triple_barrier_v22"
+    if resolve_threads(n_threads) != 1:
+        barrier_kernel += "_parallel"
+    kernels = ["_calculate_ewma_volatility", barrier_kernel]
+    if use_tick_slices and tick_slices_dir and not bid_ask:
+        kernels += ["_first_hit_detection", "_first_hit_detection_points"]
+    startup = compile_kernels(KERNEL_SIGNATURES, kernels)
+    
+    returns = np.ascontiguousarray(bars_df["returns"].values, dtype=np.float64)
+    ewma_vol = _calculate_ewma_volatility(returns, float(vol_alpha))
     
     # Get volatility for each event
     event_volatilities = np.array([
@@ -432,36 +868,47 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     side = config.get("side", 0)
     
     # Prepare arrays for numba function
-    bar_prices = bars_df["mid"].values
-    bar_times_ns = bars_df["t_close_ns"].values
-    tp_levels = np.full(len(event_indices), tp_vol_multiple)
-    sl_levels = np.full(len(event_indices), sl_vol_multiple)
-    timeout_bars_array = np.full(len(event_indices), timeout_bars)
-    timeout_seconds_array = np.full(len(event_indices), timeout_seconds)
-    sides_array = np.full(len(event_indices), side)
+    bar_prices = np.ascontiguousarray(bars_df["mid"].values, dtype=np.float64)
+    bar_times_ns = np.ascontiguousarray(bars_df["t_close_ns"].values, dtype=np.int64)
+    tp_levels = np.full(len(event_indices), tp_vol_multiple, dtype=np.float64)
+    sl_levels = np.full(len(event_indices), sl_vol_multiple, dtype=np.float64)
+    timeout_bars_array = np.full(len(event_indices), timeout_bars, dtype=np.int64)
+    timeout_seconds_array = np.full(len(event_indices), round(timeout_seconds), dtype=np.int64)
+    sides_array = np.full(len(event_indices), side, dtype=np.int64)
     
     _log_progress(out_dir, "labeling", 50, "Applying triple-barrier labeling")
     
     # Apply triple-barrier labeling
-    results = _apply_triple_barrier_v22(
-        bar_prices, bar_times_ns, event_indices, tp_levels, sl_levels,
-        timeout_bars_array, timeout_seconds_array, sides_array, event_volatilities
-    )
-    
-    # Enhance with tick slices if available
-    use_tick_slices = config.get("use_tick_slices", True)
-    tick_slices_dir = config.get("tick_slices_dir")
+    if bid_ask:
+        slices = _load_bid_ask_slices(Path(tick_slices_dir), len(bar_prices), event_indices,
+                                      int(timeout_bars_array.max(initial=0)))
+        t0 = time.perf_counter()
+        results = run_kernel(
+            _apply_triple_barrier_bid_ask, _apply_triple_barrier_bid_ask_parallel, n_threads,
+            bar_prices, bar_times_ns, *slices, event_indices, tp_levels, sl_levels,
+            timeout_bars_array, timeout_seconds_array, sides_array, event_volatilities
+        )
+    else:
+        t0 = time.perf_counter()
+        results = run_kernel(
+            _apply_triple_barrier_v22, _apply_triple_barrier_v22_parallel, n_threads,
+            bar_prices, bar_times_ns, event_indices, tp_levels, sl_levels,
+            timeout_bars_array, timeout_seconds_array, sides_array, event_volatilities
+        )
+    startup["labeling_seconds"] = round(time.perf_counter() - t0, 6)
     
-    if use_tick_slices and tick_slices_dir:
+    # Enhance with tick slices if available (bid_ask results are tick-resolved already)
+    if use_tick_slices and tick_slices_dir and not bid_ask:
         _log_progress(out_dir, "tick_enhancement", 70, "Enhancing with tick-slice first-hit")
         
         tick_slices_path = Path(tick_slices_dir)
         if tick_slices_path.exists():
             tick_slices = _load_tick_slices(tick_slices_path, event_indices.tolist())
+            codec = TickSliceStore(tick_slices_path).codec if TickSliceStore.is_store(tick_slices_path) else None
             if tick_slices:
                 results = _enhance_with_tick_slices(
                     results, tick_slices, event_indices, bar_prices,
-                    tp_levels, sl_levels, sides_array, event_volatilities
+                    tp_levels, sl_levels, sides_array, event_volatilities, codec
                 )
                 _log_progress(out_dir, "tick_enhancement", 75, f"Enhanced {len(tick_slices)} events with tick data")
             else:
@@ -492,7 +939,7 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     _log_progress(out_dir, "save", 90, "Saving results")
     
     results_path = out_dir / "labeled_events.parquet"
-    results_df.to_parquet(results_path, index=False)
+    write_table(pa.Table.from_pandas(results_df, preserve_index=False), results_path, "labels")
     
     # Generate summary statistics
     summary_stats = {
@@ -504,13 +951,14 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         "avg_return": float(results_df["return"].mean()),
         "avg_duration_seconds": float(results_df["duration_seconds"].mean()),
         "avg_volatility": float(results_df["volatility_used"].mean()),
-        "tick_enhanced_events": len(tick_slices) if use_tick_slices and tick_slices_dir else 0
+        "tick_enhanced_events": (int((results_df["hit_type"] != 0).sum()) if bid_ask
+                                 else len(tick_slices) if use_tick_slices and tick_slices_dir else 0)
     }
     
     # Save summary
     summary_path = out_dir / "labeling_summary.json"
     with open(summary_path, "w") as f:
-        json.dump(summary_stats, f, indent=2)
+        json.dump({**summary_stats, "startup": startup}, f, indent=2)
     
     # Save configuration
     config_path = out_dir / "config_used.json"
@@ -523,7 +971,9 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
         "results_path": str(results_path),
         "summary_path": str(summary_path),
         "summary_stats": summary_stats,
+        "startup": startup,
         "module_version": MODULE_VERSION,
         "events_processed": len(results_df),
-        "tick_enhanced": use_tick_slices and tick_slices_dir is not None
+        "tick_enhanced": use_tick_slices and tick_slices_dir is not None,
+        "barrier_prices": barrier_prices
     }
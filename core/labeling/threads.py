@@ -0,0 +1,53 @@
+"""
+Thread control for the parallel labeling kernels
+
+The labeling modules have a serial and a prange kernel for the same event
+loop. n_threads from the config picks between them: 1 runs the serial
+kernel, None/0 uses every numba thread, any other value caps the thread
+count for the call (numba's setting is restored afterwards). Events are
+independent and write only their own result row, so the results do not
+depend on the thread count or scheduling.
+
+The ingest modules fork worker processes (batch and multi-symbol ingest);
+after a parallel kernel has started numba's tbb pool, the parent hangs at
+exit once it has forked. Unless NUMBA_THREADING_LAYER is set, the omp and
+workqueue layers are therefore preferred over tbb.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+import numba
+
+if "NUMBA_THREADING_LAYER" not in os.environ:
+    numba.config.THREADING_LAYER_PRIORITY = ["omp", "workqueue", "tbb"]
+
+
+def resolve_threads(n_threads: Optional[int]) -> int:
+    """Threads a parallel kernel will use: n_threads capped at NUMBA_NUM_THREADS (None/0: all)."""
+    available = numba.config.NUMBA_NUM_THREADS
+    if n_threads is None or int(n_threads) == 0:
+        return available
+    if int(n_threads) < 0:
+        raise ValueError(f"Invalid n_threads: {n_threads}")
+    return min(int(n_threads), available)
+
+
+@contextmanager
+def numba_threads(n_threads: int) -> Iterator[int]:
+    """Run the enclosed parallel kernels on n_threads threads."""
+    previous = numba.get_num_threads()
+    numba.set_num_threads(n_threads)
+    try:
+        yield n_threads
+    finally:
+        numba.set_num_threads(previous)
+
+
+def run_kernel(serial: Callable, parallel: Callable, n_threads: Optional[int], *args: Any):
+    """Call the serial kernel for one thread, else the parallel one on resolve_threads(n_threads)."""
+    threads = resolve_threads(n_threads)
+    if threads == 1:
+        return serial(*args)
+    with numba_threads(threads):
+        return parallel(*args)
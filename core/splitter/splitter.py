@@ -22,6 +22,9 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional, Tuple, Union
 import warnings
 
+from core.data_ingest.bar_store import is_bar_store, read_input
+from core.data_ingest.ipc_cache import IPC_SUFFIX
+
 MODULE_VERSION = "1.0"
 
 def _log_progress(out_dir: Path, step: str, percent: int, message: str):
@@ -394,7 +397,8 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         config: Configuration dictionary with the following keys:
-            - data_path: Path to input data (parquet file)
+            - data_path: Path to input data (parquet file or partitioned bar store root)
+            - symbol, frame, start, end: Selection when data_path is a bar store
             - out_dir: Output directory
             - split_method: 'time_based', 'walk_forward', 'session_aware', or 'rolling_window'
             - time_column: Name of timestamp column (default: 'timestamp')
@@ -418,13 +422,11 @@ def run(config: Dict[str, Any]) -> Dict[str, Any]:
     
     _log_progress(out_dir, "load_data", 10, f"Loading data from {data_path}")
     
-    if data_path.suffix == '.parquet':
-            data = pd.read_parquet(data_path)
-    time_column = config.get("time_column", "timestamp")
-    if time_column in data.columns and pd.api.types.is_integer_dtype(data[time_column]):
-              data[time_column] = pd.to_datetime(data[time_column], unit='ns', utc=True)
-
-
+    if data_path.suffix in ('.parquet', IPC_SUFFIX) or is_bar_store(data_path):
+        data = read_input(data_path, config)
+        time_column = config.get("time_column", "timestamp")
+        if time_column in data.columns and pd.api.types.is_integer_dtype(data[time_column]):
+            data[time_column] = pd.to_datetime(data[time_column], unit='ns', utc=True)
     elif data_path.suffix == '.csv':
         data = pd.read_csv(data_path)
     else:
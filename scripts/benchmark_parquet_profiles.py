@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+File size and read speed of the Parquet writer profiles (core/data_ingest/parquet_profiles)
+against the writer settings used before them.
+
+Usage: python scripts/benchmark_parquet_profiles.py [n_ticks] [--json out.json]
+"""
+import sys, json, time, tempfile, pathlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.data_ingest.bar_engine import BarEngine, tick_slice_table
+from core.data_ingest.parquet_profiles import write_table
+
+# Settings before the profiles: pandas to_parquet defaults + zstd for ticks,
+# bars and labels, use_dictionary=False for the streaming part files
+LEGACY = {
+    "ticks": {"compression": "zstd"},
+    "bars": {"compression": "zstd", "use_dictionary": False},
+    "slices": {"compression": "zstd", "use_dictionary": False},
+    "labels": {"compression": "snappy"},
+}
+
+
+def _tables(n_ticks: int) -> dict:
+    rng = np.random.default_rng(0)
+    ts = (1_735_722_000_000_000_000 + np.cumsum(rng.integers(1, 2_000_000_000, n_ticks))).astype(np.int64)
+    mid = np.round(1.1 + np.cumsum(rng.normal(0, 1e-5, n_ticks)), 5)
+    bid, ask = mid - 5e-5, mid + 5e-5
+    ticks = pa.table({
+        "timestamp": pa.array(pd.to_datetime(ts, utc=True).strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
+        "bid": bid, "ask": ask, "ts_ns": ts,
+    })
+    engine = BarEngine("EURUSD", [{"type": "time", "unit": "1m"}, {"type": "tick", "count": 100}])
+    parts = list(engine.add_batch(ts, bid, ask).values()) + list(engine.finish().values())
+    bars = pa.concat_tables(parts)
+    n = bars.num_rows
+    labels = pa.table({
+        "return": rng.normal(0, 1e-3, n), "label": rng.integers(-1, 2, n).astype(np.float64),
+        "exit_time_ns": bars.column("t_close_ns"), "event_index": np.arange(n),
+        "entry_price": bars.column("c"), "symbol": bars.column("symbol"),
+    })
+    return {"ticks": ticks, "bars": bars, "slices": tick_slice_table(ts, bid, ask, 0, 1000), "labels": labels}
+
+
+def _time(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    args = sys.argv[1:]
+    out_json = None
+    if "--json" in args:
+        out_json = args[args.index("--json") + 1]
+        args = args[:args.index("--json")]
+    n_ticks = int(args[0]) if args else 2_000_000
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        for profile, table in _tables(n_ticks).items():
+            for variant in ("legacy", "profile"):
+                path = tmp / f"{profile}-{variant}.parquet"
+                if variant == "legacy":
+                    write = lambda: pq.write_table(table, path, **LEGACY[profile])
+                else:
+                    write = lambda: write_table(table, path, profile)
+                t_write = _time(write, 1)
+                t_read = _time(lambda: pq.read_table(path))
+                meta = pq.ParquetFile(path).metadata
+                rows.append({
+                    "profile": profile, "variant": variant, "rows": table.num_rows,
+                    "size_mb": round(path.stat().st_size / 1e6, 3),
+                    "write_s": round(t_write, 4), "read_s": round(t_read, 4),
+                    "row_groups": meta.num_row_groups,
+                })
+
+    print(f"{'profile':8} {'variant':8} {'rows':>10} {'size MB':>9} {'write s':>8} {'read s':>8} {'groups':>6}")
+    for r in rows:
+        print(f"{r['profile']:8} {r['variant']:8} {r['rows']:>10,} {r['size_mb']:>9} {r['write_s']:>8} "
+              f"{r['read_s']:>8} {r['row_groups']:>6}")
+    if out_json:
+        with open(out_json, "w", encoding="utf-8") as f:
+            json.dump({"n_ticks": n_ticks, "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+"""
+Tests for the vectorized bar engine (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.data_ingest.bar_engine import BarEngine, VecTickBarAgg, VecTimeBarAgg, parse_bar_frames
+from core.data_ingest.data_ingest_streaming import MinuteBarAgg, TickBarAgg
+from core.data_ingest import batch_ingest, data_ingest_parquet, data_ingest_v22
+
+
+def _legacy_bars(ts, bid, ask):
+    """Reference output of the tick-by-tick aggregators."""
+    agg_1m = MinuteBarAgg("EURUSD", "1m")
+    agg_100t = TickBarAgg("EURUSD", 100)
+    agg_1000t = TickBarAgg("EURUSD", 1000)
+    out = {"1m": [], "100t": [], "1000t": []}
+    for i in range(len(ts)):
+        t, b, a = int(ts[i]), float(bid[i]), float(ask[i])
+        if agg_1m.open_ns is not None and agg_1m.should_flush(t):
+            out["1m"].append(agg_1m.flush())
+        agg_1m.add_tick(t, b, a, i)
+        if agg_100t.add_tick(t, b, a, i):
+            out["100t"].append(agg_100t.flush("100t"))
+        if agg_1000t.add_tick(t, b, a, i):
+            out["1000t"].append(agg_1000t.flush("1000t"))
+    last = agg_1m.flush()
+    if last:
+        out["1m"].append(last)
+    return {k: pd.DataFrame(v) for k, v in out.items()}
+
+
+def _engine_bars(engine, ts, bid, ask, batch_sizes):
+    tables = {frame: [] for frame in engine.frames}
+    pos = 0
+    for size in batch_sizes:
+        for frame, table in engine.add_batch(ts[pos:pos + size], bid[pos:pos + size], ask[pos:pos + size]).items():
+            tables[frame].append(table)
+        pos += size
+    for frame, table in engine.finish().items():
+        tables[frame].append(table)
+    return {k: pa.concat_tables(v).to_pandas() for k, v in tables.items() if v}
+
+
+def _engine_bars_open(engine, ts, bid, ask):
+    """Completed bars of one batch, leaving the open bars in the engine."""
+    return {k: v.to_pandas() for k, v in engine.add_batch(ts, bid, ask).items()}
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(7)
+    n = 25_000
+    ts = 1_735_722_000_000_000_000 + np.cumsum(rng.integers(1, 3_000_000_000, n))
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    spread = rng.uniform(5e-5, 2e-4, n)
+    return ts.astype(np.int64), mid - spread / 2, mid + spread / 2
+
+
+class TestBarEngine:
+
+    @pytest.mark.parametrize("engine", ["numpy", "numba"])
+    @pytest.mark.parametrize("batch_size", [1, 97, 1000, 4096, 25_000])
+    def test_parity_with_legacy_aggregators(self, ticks, batch_size, engine):
+        ts, bid, ask = ticks
+        expected = _legacy_bars(ts, bid, ask)
+        sizes = [batch_size] * (len(ts) // batch_size + 1)
+        got = _engine_bars(BarEngine.default("EURUSD", engine), ts, bid, ask, sizes)
+
+        for frame in ("1m", "100t", "1000t"):
+            exp, res = expected[frame], got[frame]
+            assert len(exp) == len(res)
+            for col in ("t_open_ns", "t_close_ns", "n_ticks", "tick_first_id", "tick_last_id"):
+                np.testing.assert_array_equal(exp[col].to_numpy(), res[col].to_numpy())
+            for col in ("o", "h", "l", "c", "o_bid", "o_ask", "c_bid", "c_ask", "spread_mean"):
+                np.testing.assert_allclose(exp[col].to_numpy(), res[col].to_numpy(), rtol=1e-12)
+
+    def test_irregular_batches_carry_state(self, ticks):
+        ts, bid, ask = ticks
+        rng = np.random.default_rng(1)
+        sizes = rng.integers(0, 3000, 40)
+        sizes = np.append(sizes, len(ts))
+        a = _engine_bars(BarEngine.default("EURUSD"), ts, bid, ask, sizes)
+        b = _engine_bars(BarEngine.default("EURUSD"), ts, bid, ask, [len(ts)])
+        for frame in a:
+            pd.testing.assert_frame_equal(a[frame], b[frame], check_exact=False, rtol=1e-12)
+
+    def test_numba_matches_numpy_engine(self, ticks):
+        ts, bid, ask = ticks
+        sizes = [3333] * 8
+        a = _engine_bars(BarEngine.default("EURUSD", "numpy"), ts, bid, ask, sizes)
+        b = _engine_bars(BarEngine.default("EURUSD", "numba"), ts, bid, ask, sizes)
+        for frame in a:
+            pd.testing.assert_frame_equal(a[frame], b[frame], check_exact=False, rtol=1e-12)
+
+    @pytest.mark.parametrize("engines", [("numpy", "numba"), ("numba", "numpy"), ("numba", "numba")])
+    def test_state_round_trip(self, ticks, engines):
+        ts, bid, ask = ticks
+        expected = _engine_bars(BarEngine.default("EURUSD"), ts, bid, ask, [len(ts)])
+        cut = 12_345
+        first = BarEngine.default("EURUSD", engines[0])
+        head = _engine_bars_open(first, ts[:cut], bid[:cut], ask[:cut])
+        state = json.loads(json.dumps(first.get_state()))
+        assert state["next_tick_id"] == cut
+        second = BarEngine.default("EURUSD", engines[1]).set_state(state)
+        tail = _engine_bars(second, ts[cut:], bid[cut:], ask[cut:], [len(ts) - cut])
+        for frame, ref in expected.items():
+            got = pd.concat([head[frame], tail[frame]], ignore_index=True)
+            pd.testing.assert_frame_equal(got, ref, check_exact=False, rtol=1e-12)
+        with pytest.raises(ValueError):
+            BarEngine("EURUSD", [{"type": "tick", "count": 10}]).set_state(state)
+
+    @pytest.mark.parametrize("basis", ["mid", "bid", "ask"])
+    def test_arbitrary_frames_single_pass(self, ticks, basis):
+        ts, bid, ask = ticks
+        frames = [{"type": "time", "unit": u} for u in ("30s", "1m", "5m", "15m", "1h")] + \
+                 [{"type": "tick", "count": c} for c in (50, 250, 2000)]
+        sizes = [4000] * 7
+        a = _engine_bars(BarEngine("EURUSD", frames, "numpy", basis), ts, bid, ask, sizes)
+        b = _engine_bars(BarEngine("EURUSD", frames, "numba", basis, buffer_bars=64), ts, bid, ask, sizes)
+        assert list(a) == ["30s", "1m", "5m", "15m", "1h", "50t", "250t", "2000t"]
+        for frame in a:
+            pd.testing.assert_frame_equal(a[frame], b[frame], check_exact=False, rtol=1e-12)
+            assert a[frame]["n_ticks"].sum() == len(ts)
+        px = {"mid": (bid + ask) / 2, "bid": bid, "ask": ask}[basis]
+        assert a["50t"]["h"].iloc[0] == px[:50].max()
+
+    def test_parse_bar_frames(self):
+        specs = parse_bar_frames([{"type": "time", "unit": "1h"}, {"type": "tick", "count": 100},
+                                  {"type": "tick", "count": 100}])
+        assert [name for name, _, _ in specs] == ["1h", "100t"]
+        assert specs[0][2] == 3600 * 1_000_000_000
+        with pytest.raises(ValueError):
+            parse_bar_frames([{"type": "time", "unit": "1w"}])
+        with pytest.raises(ValueError):
+            parse_bar_frames([{"type": "tick", "count": 0}])
+
+    def test_unknown_engine_rejected(self):
+        with pytest.raises(ValueError):
+            BarEngine.default("EURUSD", "cython")
+
+    def test_tick_bar_remainder(self):
+        agg = VecTickBarAgg("EURUSD", 10)
+        ts = np.arange(25, dtype=np.int64)
+        px = np.full(25, 1.1)
+        assert agg.add_batch(ts, px, px, 0).num_rows == 2
+        last = agg.finish()
+        assert last.num_rows == 1
+        assert last.column("n_ticks")[0].as_py() == 5
+        assert last.column("tick_first_id")[0].as_py() == 20
+
+    def test_time_bar_spanning_batches(self):
+        agg = VecTimeBarAgg("EURUSD", "1m")
+        ts = np.array([0, 30, 59, 60, 61], dtype=np.int64) * 1_000_000_000
+        px = np.array([1.0, 3.0, 2.0, 4.0, 5.0])
+        assert agg.add_batch(ts[:2], px[:2], px[:2], 0) is None
+        first = agg.add_batch(ts[2:], px[2:], px[2:], 2)
+        assert first.num_rows == 1
+        assert first.column("n_ticks")[0].as_py() == 3
+        assert first.column("h")[0].as_py() == 3.0
+        assert first.column("c")[0].as_py() == 2.0
+        assert agg.finish().column("n_ticks")[0].as_py() == 2
+
+    @pytest.mark.parametrize("engine", ["numpy", "numba"])
+    def test_parquet_ingest_uses_engine(self, ticks, tmp_path, engine):
+        ts, bid, ask = ticks
+        src = tmp_path / "ticks.parquet"
+        pq.write_table(pa.table({
+            "timestamp": pa.array(ts, pa.timestamp("ns", tz="UTC")),
+            "bid": bid, "ask": ask,
+        }), src)
+        out_dir = tmp_path / "out"
+        data_ingest_parquet.run({
+            "out_dir": str(out_dir), "parquet": {"path": str(src)},
+            "chunksize": 3000, "flush_every_bars": 50, "engine": engine,
+        })
+        expected = _legacy_bars(ts, bid, ask)
+        for frame in ("1m", "100t", "1000t"):
+            bars = pq.read_table(out_dir / f"bars_{frame}").to_pandas().sort_values("t_open_ns")
+            np.testing.assert_array_equal(bars["tick_first_id"].to_numpy(), expected[frame]["tick_first_id"].to_numpy())
+        slices = pq.read_table(out_dir / "tick_slices_1000t")
+        assert slices.num_rows == len(ts)
+
+
+INFO_FRAMES = [{"type": "volume", "threshold": 400}, {"type": "dollar", "threshold": 450},
+               {"type": "tick_imbalance", "expected_ticks": 100}, {"type": "tick_run", "expected_ticks": 50}]
+
+
+def _engine_bars_volume(engine, ts, bid, ask, volume, batch_sizes):
+    tables = {frame: [] for frame in engine.frames}
+    pos = 0
+    for size in batch_sizes:
+        sl = slice(pos, pos + size)
+        for frame, table in engine.add_batch(ts[sl], bid[sl], ask[sl], volume[sl]).items():
+            tables[frame].append(table)
+        pos += size
+    for frame, table in engine.finish().items():
+        tables[frame].append(table)
+    return {k: pa.concat_tables(v).to_pandas() for k, v in tables.items() if v}
+
+
+class TestInformationBars:
+
+    @pytest.fixture
+    def volume(self, ticks):
+        return np.random.default_rng(2).integers(1, 10, len(ticks[0])).astype(np.float64)
+
+    def test_engines_and_batching_agree(self, ticks, volume):
+        ts, bid, ask = ticks
+        a = _engine_bars_volume(BarEngine("EURUSD", INFO_FRAMES, "numpy"), ts, bid, ask, volume, [len(ts)])
+        b = _engine_bars_volume(BarEngine("EURUSD", INFO_FRAMES, "numba", buffer_bars=16), ts, bid, ask, volume,
+                                [997] * 26)
+        c = _engine_bars_volume(BarEngine("EURUSD", INFO_FRAMES, "numpy"), ts, bid, ask, volume, [333] * 76)
+        assert list(a) == ["400vol", "450dol", "100tib", "50trb"]
+        for frame in a:
+            pd.testing.assert_frame_equal(a[frame], b[frame])
+            pd.testing.assert_frame_equal(a[frame], c[frame])
+            assert a[frame]["n_ticks"].sum() == len(ts)
+            assert a[frame]["v_sum"].sum() == pytest.approx(volume.sum())
+            # Contiguous tick ranges: the tick-slice linkage of every frame
+            np.testing.assert_array_equal(a[frame]["tick_first_id"].to_numpy()[1:],
+                                          a[frame]["tick_last_id"].to_numpy()[:-1] + 1)
+
+    def test_volume_and_dollar_thresholds(self, ticks, volume):
+        ts, bid, ask = ticks
+        bars = _engine_bars_volume(BarEngine("EURUSD", INFO_FRAMES[:2]), ts, bid, ask, volume, [len(ts)])
+        # Every completed bar ends where the running volume crosses the next multiple of the threshold
+        cum = np.cumsum(bars["400vol"]["v_sum"].to_numpy())[:-1]
+        before = cum - bars["400vol"]["v_sum"].to_numpy()[:-1]
+        assert (np.floor(cum / 400) > np.floor(before / 400)).all()
+        assert bars["400vol"]["v_sum"].iloc[:-1].mean() == pytest.approx(400, rel=0.01)
+        # Without a volume column every tick is one unit and v_sum stays 0
+        unit = _engine_bars(BarEngine("EURUSD", [{"type": "volume", "threshold": 250}]), ts, bid, ask, [7000] * 4)
+        assert (unit["250vol"]["n_ticks"].iloc[:-1] == 250).all() and (unit["250vol"]["v_sum"] == 0).all()
+
+    def test_adaptive_thresholds_stay_bounded(self, ticks):
+        ts, bid, ask = ticks
+        bars = _engine_bars(BarEngine("EURUSD", INFO_FRAMES[2:]), ts, bid, ask, [len(ts)])
+        for frame, expected in (("100tib", 100), ("50trb", 50)):
+            mean = bars[frame]["n_ticks"].mean()
+            assert expected / 5 < mean < expected * 10
+
+    @pytest.mark.parametrize("engines", [("numpy", "numba"), ("numba", "numpy")])
+    def test_state_round_trip(self, ticks, volume, engines):
+        ts, bid, ask = ticks
+        expected = _engine_bars_volume(BarEngine("EURUSD", INFO_FRAMES), ts, bid, ask, volume, [len(ts)])
+        cut = 12_345
+        first = BarEngine("EURUSD", INFO_FRAMES, engines[0])
+        head = {k: v.to_pandas() for k, v in first.add_batch(ts[:cut], bid[:cut], ask[:cut], volume[:cut]).items()}
+        state = json.loads(json.dumps(first.get_state()))
+        assert set(state["frame_state"]) == set(expected)
+        second = BarEngine("EURUSD", INFO_FRAMES, engines[1]).set_state(state)
+        tail = _engine_bars_volume(second, ts[cut:], bid[cut:], ask[cut:], volume[cut:], [len(ts) - cut])
+        for frame, ref in expected.items():
+            pd.testing.assert_frame_equal(pd.concat([head[frame], tail[frame]], ignore_index=True), ref)
+
+    def test_parse_info_frames(self):
+        specs = parse_bar_frames([{"type": "dollar", "threshold": 2.5e6},
+                                  {"type": "tick_run", "expected_ticks": 100, "ewma_span": 50}])
+        assert [name for name, _, _ in specs] == ["2500000dol", "100trb_s50"]
+        assert specs[1][2] == (100.0, 2 / 51)
+        with pytest.raises(ValueError):
+            parse_bar_frames([{"type": "volume"}])
+        with pytest.raises(ValueError):
+            parse_bar_frames([{"type": "tick_imbalance", "expected_ticks": 100, "ewma_span": 0}])
+
+    def test_ingest_with_volume_column(self, ticks, volume, tmp_path):
+        ts, bid, ask = ticks
+        csv_path = tmp_path / "ticks.csv"
+        pd.DataFrame({"timestamp": pd.to_datetime(ts, utc=True).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                      "bid": bid, "ask": ask, "volume": volume}).to_csv(csv_path, index=False)
+        config = {"csv_path": str(csv_path), "bar_frames": INFO_FRAMES, "slice_format": "csr"}
+        results = {}
+        for streaming in (False, True):
+            out_dir = tmp_path / f"out_{streaming}"
+            data_ingest_v22.run({**config, "out_dir": str(out_dir), "streaming": streaming})
+            results[streaming] = {f: pd.read_parquet(out_dir / f"bars_{f}.parquet") for f in ("400vol", "100tib")}
+            assert pd.read_parquet(out_dir / "raw_norm.parquet")["volume"].sum() == volume.sum()
+        for frame, bars in results[False].items():
+            pd.testing.assert_frame_equal(bars, results[True][frame])
+            assert bars["v_sum"].sum() == pytest.approx(volume.sum())
+        with pytest.raises(ValueError, match="single pass"):
+            batch_ingest.run({"files": [str(csv_path)], "out_dir": str(tmp_path / "batch"),
+                              "bar_frames": INFO_FRAMES, "workers": 1})
+
+
+PRICE_FRAMES = [{"type": "range", "pips": 3}, {"type": "renko", "pips": 2}]
+
+
+class TestPriceBars:
+
+    def test_engines_and_batching_agree(self, ticks):
+        ts, bid, ask = ticks
+        a = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES, "numpy"), ts, bid, ask, [len(ts)])
+        b = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES, "numba", buffer_bars=16), ts, bid, ask, [997] * 26)
+        c = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES, "numpy"), ts, bid, ask, [333] * 76)
+        assert list(a) == ["3rng", "2rnk"]
+        for frame in a:
+            assert len(a[frame]) > 10
+            pd.testing.assert_frame_equal(a[frame], b[frame])
+            pd.testing.assert_frame_equal(a[frame], c[frame])
+            assert a[frame]["n_ticks"].sum() == len(ts)
+            np.testing.assert_array_equal(a[frame]["tick_first_id"].to_numpy()[1:],
+                                          a[frame]["tick_last_id"].to_numpy()[:-1] + 1)
+
+    def test_range_bars_span_the_range(self, ticks):
+        ts, bid, ask = ticks
+        bars = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES[:1]), ts, bid, ask, [len(ts)])["3rng"]
+        span = (bars["h"] - bars["l"]).to_numpy()
+        assert (span[:-1] >= 3e-4 * (1 - 1e-9)).all()
+        # Before its last tick a completed bar is still inside the range
+        mid = (bid + ask) / 2
+        for first, last in bars[["tick_first_id", "tick_last_id"]].to_numpy()[:-1][:50]:
+            if last > first:
+                assert np.ptp(mid[first:last]) < 3e-4
+
+    def test_renko_bricks(self):
+        mid = np.round(np.array([1.1000, 1.1001, 1.1002, 1.1003, 1.1001, 1.1000, 1.0998, 1.0997, 1.1004]), 5)
+        ts = np.arange(len(mid), dtype=np.int64) * 1_000_000_000
+        for engine in ("numpy", "numba"):
+            bars = _engine_bars(BarEngine("EURUSD", [{"type": "renko", "pips": 2}], engine), ts, mid, mid,
+                                [len(mid)])["2rnk"]
+            # Up brick at 1.1002, reversal needs two bricks (1.0998), a jump over several bricks is one bar
+            assert bars["tick_last_id"].tolist() == [2, 6, 8]
+            assert bars["c"].tolist()[:3] == [1.1002, 1.0998, 1.1004]
+
+    def test_state_round_trip(self, ticks):
+        ts, bid, ask = ticks
+        expected = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES), ts, bid, ask, [len(ts)])
+        cut = 9_876
+        first = BarEngine("EURUSD", PRICE_FRAMES, "numba")
+        head = _engine_bars_open(first, ts[:cut], bid[:cut], ask[:cut])
+        state = json.loads(json.dumps(first.get_state()))
+        second = BarEngine("EURUSD", PRICE_FRAMES, "numpy").set_state(state)
+        tail = _engine_bars(second, ts[cut:], bid[cut:], ask[cut:], [len(ts) - cut])
+        for frame, ref in expected.items():
+            pd.testing.assert_frame_equal(pd.concat([head[frame], tail[frame]], ignore_index=True), ref)
+
+    def test_parse_price_frames(self):
+        specs = parse_bar_frames([{"type": "range", "pips": 10}, {"type": "renko", "pips": 2.5},
+                                  {"type": "renko", "pips": 5, "pip_size": 0.01}], pip_size=0.0001)
+        assert [name for name, _, _ in specs] == ["10rng", "2.5rnk", "5rnk_p0.01"]
+        assert specs[0][2] == pytest.approx((0.001, 0.0)) and specs[1][2] == pytest.approx((0.00025, 0.0))
+        # A frame's own pip_size keeps it apart from the same pips at the default size
+        specs = parse_bar_frames([{"type": "renko", "pips": 5}, {"type": "renko", "pips": 5, "pip_size": 0.01},
+                                  {"type": "renko", "pips": 5, "pip_size": 0.0001}], pip_size=0.0001)
+        assert [(name, param) for name, _, param in specs] == [("5rnk", (0.0005, 0.0)), ("5rnk_p0.01", (0.05, 0.0))]
+        assert parse_bar_frames([{"type": "renko", "pips": 5}], pip_size=0.01)[0][2] == pytest.approx((0.05, 0.0))
+        with pytest.raises(ValueError):
+            parse_bar_frames([{"type": "range"}])
+
+    def test_ingest_uses_pip_size(self, ticks, tmp_path):
+        ts, bid, ask = ticks
+        csv_path = tmp_path / "ticks.csv"
+        pd.DataFrame({"timestamp": pd.to_datetime(ts, utc=True).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+                      "bid": bid * 100, "ask": ask * 100}).to_csv(csv_path, index=False)
+        out_dir = tmp_path / "out"
+        data_ingest_v22.run({"csv_path": str(csv_path), "out_dir": str(out_dir), "pip_size": 0.01,
+                             "bar_frames": [{"type": "range", "pips": 3}], "export_slices": False})
+        bars = pd.read_parquet(out_dir / "bars_3rng.parquet")
+        expected = _engine_bars(BarEngine("EURUSD", PRICE_FRAMES[:1]), ts, bid, ask, [len(ts)])["3rng"]
+        assert len(bars) == len(expected)
+        np.testing.assert_array_equal(bars["tick_last_id"], expected["tick_last_id"])
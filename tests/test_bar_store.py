@@ -0,0 +1,102 @@
+"""
+Tests for the hive-partitioned bar store (Module 1)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from core.data_ingest import data_ingest_v22
+from core.data_ingest.bar_engine import BarEngine
+from core.data_ingest.bar_store import bar_filter, is_bar_store, read_bars, read_input, write_bars
+
+FRAMES = [{"type": "time", "unit": "15m"}, {"type": "tick", "count": 500}]
+
+
+def _bars(symbol, seed):
+    """Bars over Jan-Mar 2025 from one tick per ~40 s."""
+    rng = np.random.default_rng(seed)
+    n = 200_000
+    ts = pd.Timestamp("2025-01-01", tz="UTC").value + np.cumsum(rng.integers(1, 80, n)) * 1_000_000_000
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    engine = BarEngine(symbol, FRAMES)
+    tables = {frame: [table] for frame, table in engine.add_batch(ts.astype(np.int64), mid - 5e-5, mid + 5e-5).items()}
+    for frame, table in engine.finish().items():
+        tables[frame].append(table)
+    return {frame: pa.concat_tables(parts).to_pandas() for frame, parts in tables.items()}
+
+
+@pytest.fixture
+def store(tmp_path):
+    root = tmp_path / "bars"
+    bars = {"EURUSD": _bars("EURUSD", 1), "GBPUSD": _bars("GBPUSD", 2)}
+    for by_frame in bars.values():
+        for frame_bars in by_frame.values():
+            write_bars(frame_bars, root, row_group_rows=1_000)
+    return root, bars
+
+
+class TestBarStore:
+
+    def test_layout_and_round_trip(self, store):
+        root, bars = store
+        assert is_bar_store(root)
+        months = sorted(p.name for p in (root / "symbol=EURUSD" / "frame=15m" / "year=2025").iterdir())
+        assert months[:3] == ["month=1", "month=2", "month=3"]
+        got = read_bars(root, "EURUSD", "15m")
+        pd.testing.assert_frame_equal(got, bars["EURUSD"]["15m"])
+        assert set(read_bars(root, frame="500t", columns=["symbol", "t_open_ns"])["symbol"]) == {"EURUSD", "GBPUSD"}
+
+    def test_time_range_pushdown(self, store):
+        root, bars = store
+        start, end = "2025-02-03 12:00", "2025-02-20"
+        got = read_bars(root, "GBPUSD", "500t", start, end)
+        ref = bars["GBPUSD"]["500t"]
+        t0, t1 = pd.Timestamp(start, tz="UTC").value, pd.Timestamp(end, tz="UTC").value
+        expected = ref[(ref["t_open_ns"] >= t0) & (ref["t_open_ns"] < t1)].reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected)
+
+        dataset = ds.dataset(str(root), format="parquet", partitioning="hive")
+        fragments = list(dataset.get_fragments(filter=bar_filter("GBPUSD", "500t", start, end)))
+        assert fragments and all("month=2" in f.path and "symbol=GBPUSD" in f.path for f in fragments)
+        # Sorted rows: row-group statistics on t_open_ns are disjoint and ascending
+        feb_15m = next(dataset.get_fragments(filter=bar_filter("EURUSD", "15m", start, end)))
+        meta = pq.ParquetFile(feb_15m.path).metadata
+        col = meta.schema.names.index("t_open_ns")
+        stats = [meta.row_group(i).column(col).statistics for i in range(meta.num_row_groups)]
+        assert meta.num_row_groups > 1 and all(s.has_min_max for s in stats)
+        assert all(a.max <= b.min for a, b in zip(stats, stats[1:]))
+
+    def test_overwrite_replaces_touched_months_only(self, store):
+        root, bars = store
+        ref = bars["EURUSD"]["15m"]
+        feb = ref[pd.to_datetime(ref["t_open_ns"], utc=True).dt.month == 2].copy()
+        feb["v_sum"] = 1.0
+        write_bars(feb, root)
+        got = read_bars(root, "EURUSD", "15m")
+        assert len(got) == len(ref)
+        assert (got["v_sum"] == 1.0).sum() == len(feb)
+        with pytest.raises(ValueError):
+            write_bars(feb, root, mode="upsert")
+
+    def test_ingest_writes_store_and_inputs_read_it(self, tmp_path):
+        rng = np.random.default_rng(4)
+        n = 5_000
+        ts = pd.Timestamp("2025-01-31 20:00", tz="UTC") + pd.to_timedelta(np.arange(n) * 30 + 1, unit="s")
+        mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+        csv_path = tmp_path / "ticks.csv"
+        pd.DataFrame({"timestamp": ts, "bid": mid - 5e-5, "ask": mid + 5e-5}).to_csv(csv_path, index=False)
+        root = tmp_path / "store"
+        result = data_ingest_v22.run({
+            "csv_path": str(csv_path), "out_dir": str(tmp_path / "out"), "symbol": "EURUSD",
+            "bar_frames": [{"type": "time", "unit": "1m"}], "export_slices": False, "bar_store": str(root),
+        })
+        assert result["frames"]["1m"]["bar_store"]["frame"] == "1m"
+        bars = pd.read_parquet(tmp_path / "out" / result["frames"]["1m"]["path"])
+        got = read_input(root, {"symbol": "EURUSD", "frame": "1m", "start": "2025-02-01"})
+        pd.testing.assert_frame_equal(got, bars[bars["t_open_ns"] >= pd.Timestamp("2025-02-01", tz="UTC").value]
+                                      .reset_index(drop=True), check_dtype=False)
+        assert len(read_input(tmp_path / "out" / result["frames"]["1m"]["path"], {})) == len(bars)
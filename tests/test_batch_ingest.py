@@ -0,0 +1,132 @@
+"""
+Tests for the parallel multi-file batch ingest (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.data_ingest import batch_ingest
+from core.data_ingest.bar_engine import BarEngine
+from core.data_ingest.bar_store import read_bars
+
+BAR_FRAMES = [{"type": "time", "unit": "1m"}, {"type": "time", "unit": "5m"},
+              {"type": "tick", "count": 100}, {"type": "tick", "count": 1000}]
+
+
+@pytest.fixture
+def tick_files(tmp_path):
+    """One tick stream split into three CSV files at mid-bar boundaries."""
+    rng = np.random.default_rng(11)
+    n = 6_000
+    # Sub-ms offset keeps every CSV timestamp in the same (fractional) format
+    ts = pd.Timestamp("2025-01-02 09:00:00.000001", tz="UTC") + pd.to_timedelta(
+        np.cumsum(rng.integers(200, 2_000, n)), unit="ms")
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    spread = rng.uniform(5e-5, 2e-4, n)
+    df = pd.DataFrame({"timestamp": ts, "bid": mid - spread / 2, "ask": mid + spread / 2})
+    paths = []
+    # Cuts are neither minute- nor tick-count-aligned
+    for i, part in enumerate(np.split(df, [1_234, 4_321])):
+        path = tmp_path / f"day{i}.csv"
+        part.to_csv(path, index=False)
+        paths.append(path)
+    # Listed out of order on purpose
+    return [paths[2], paths[0], paths[1]]
+
+
+def _single_pass(paths):
+    df = pd.concat([batch_ingest._load_ticks(p) for p in sorted(paths)], ignore_index=True)
+    engine = BarEngine("EURUSD", BAR_FRAMES)
+    tables = {frame: [] for frame in engine.frames}
+    for frame, table in engine.add_batch(df["ts_ns"].to_numpy(), df["bid"].to_numpy(), df["ask"].to_numpy()).items():
+        tables[frame].append(table)
+    for frame, table in engine.finish().items():
+        tables[frame].append(table)
+    return {k: pa.concat_tables(v).to_pandas() for k, v in tables.items()}
+
+
+class TestBatchIngest:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_single_pass(self, tick_files, tmp_path, workers):
+        out_dir = tmp_path / f"out_{workers}"
+        manifest = batch_ingest.run({
+            "files": [str(p) for p in tick_files], "out_dir": str(out_dir),
+            "symbol": "EURUSD", "bar_frames": BAR_FRAMES, "workers": workers,
+        })
+        expected = _single_pass(tick_files)
+        assert [i["tick_offset"] for i in manifest["inputs"]] == [0, 1_234, 4_321]
+        for frame, ref in expected.items():
+            got = pq.read_table(out_dir / manifest["outputs"][frame]["path"]).to_pandas()
+            assert len(got) == len(ref) == manifest["outputs"][frame]["n_bars"]
+            for col in ref.columns:
+                if ref[col].dtype.kind == "f":
+                    np.testing.assert_allclose(got[col], ref[col], rtol=1e-12)
+                else:
+                    assert (got[col] == ref[col]).all(), (frame, col)
+
+        raw = pq.read_table(out_dir / "raw_norm").to_pandas()
+        assert raw["ts_ns"].is_monotonic_increasing and len(raw) == 6_000
+        with open(out_dir / "quality_report.json") as f:
+            report = json.load(f)
+        assert report["n_raw_rows"] == 6_000
+        assert report["frame_stats"]["100t"]["n_bars"] == len(expected["100t"])
+        assert not (out_dir / batch_ingest.STAGING_DIR).exists()
+
+    def test_glob_input(self, tick_files, tmp_path):
+        manifest = batch_ingest.run({
+            "glob": str(tmp_path / "day*.csv"), "out_dir": str(tmp_path / "out"),
+            "bar_frames": BAR_FRAMES, "workers": 1,
+        })
+        assert manifest["performance"]["total_ticks_processed"] == 6_000
+
+    def test_overlapping_files_raise(self, tick_files, tmp_path):
+        overlap = tmp_path / "overlap.csv"
+        pd.read_csv(tick_files[1]).iloc[-50:].to_csv(overlap, index=False)
+        with pytest.raises(ValueError, match="UNSORTED_INPUT"):
+            batch_ingest.run({
+                "files": [str(p) for p in tick_files] + [str(overlap)],
+                "out_dir": str(tmp_path / "out"), "workers": 1,
+            })
+        with pytest.raises(ValueError, match="IO_ERROR"):
+            batch_ingest.run({"files": [], "out_dir": str(tmp_path / "out")})
+
+    @pytest.mark.parametrize("engine", ["numpy", "numba"])
+    def test_append_runs_match_single_pass(self, tick_files, tmp_path, engine):
+        out_dir = tmp_path / "out"
+        day0, day1, day2 = sorted(tick_files)
+        # Re-delivery of the tail of day1 together with day2
+        redelivered = tmp_path / "redelivered.csv"
+        pd.concat([pd.read_csv(day1).iloc[-300:], pd.read_csv(day2)]).to_csv(redelivered, index=False)
+        config = {"out_dir": str(out_dir), "symbol": "EURUSD", "bar_frames": BAR_FRAMES,
+                  "engine": engine, "workers": 1, "append": True, "bar_store": str(tmp_path / "store")}
+        batch_ingest.run({**config, "files": [str(day0)]})
+        batch_ingest.run({**config, "files": [str(day1)]})
+        manifest = batch_ingest.run({**config, "files": [str(redelivered)]})
+
+        assert manifest["run"] == 2
+        assert manifest["performance"]["skipped_ticks"] == 300
+        state = batch_ingest.load_state(out_dir)
+        assert state["next_tick_id"] == 6_000
+        expected = _single_pass(tick_files)
+        for frame, ref in expected.items():
+            got = pq.read_table(out_dir / manifest["outputs"][frame]["path"]).to_pandas()
+            assert len(got) == len(ref) == manifest["outputs"][frame]["n_bars"]
+            assert (got["tick_first_id"].to_numpy() == ref["tick_first_id"].to_numpy()).all()
+            assert (got["n_ticks"].to_numpy() == ref["n_ticks"].to_numpy()).all()
+            np.testing.assert_allclose(got["spread_mean"], ref["spread_mean"], rtol=1e-12)
+            np.testing.assert_allclose(got[["o", "h", "l", "c"]], ref[["o", "h", "l", "c"]], rtol=0)
+            # The store holds completed bars only; the open bar stays in the tail file
+            stored = read_bars(tmp_path / "store", "EURUSD", frame)
+            n_open = int(state["open_bars"][frame] is not None)
+            assert len(stored) == len(ref) - n_open
+            assert (stored["tick_first_id"].to_numpy() == ref["tick_first_id"].to_numpy()[:len(stored)]).all()
+        with open(out_dir / "quality_report.json") as f:
+            assert json.load(f)["n_raw_rows"] == 6_000
+
+        with pytest.raises(ValueError, match="does not match"):
+            batch_ingest.run({**config, "files": [str(day2)], "price_basis": "bid"})
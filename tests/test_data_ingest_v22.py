@@ -258,6 +258,134 @@ class TestDataIngestV22:
             slice_info = result["frames"]["1m"]["tick_slices"]
             assert slice_info["enabled"] == False
 
+    def test_single_pass_multi_frame(self, sample_tick_data, temp_workspace):
+        """Test arbitrary time and tick frames built in one scan"""
+        
+        csv_path = temp_workspace / "test_data.csv"
+        sample_tick_data.to_csv(csv_path, index=False)
+        
+        config = {
+            "csv_path": str(csv_path),
+            "out_dir": str(temp_workspace / "output"),
+            "symbol": "EURUSD",
+            "export_slices": False,
+            "bar_frames": [
+                {"type": "time", "unit": "1m"}, {"type": "time", "unit": "5m"},
+                {"type": "time", "unit": "15m"}, {"type": "tick", "count": 50},
+                {"type": "tick", "count": 250}
+            ]
+        }
+        
+        for engine in ("numpy", "numba"):
+            config["engine"] = engine
+            result = di_v22.run(config)
+            out_dir = pathlib.Path(config["out_dir"])
+            assert set(result["frames"]) == {"1m", "5m", "15m", "50t", "250t"}
+            
+            for frame, info in result["frames"].items():
+                bars = pd.read_parquet(out_dir / info["path"])
+                assert bars["n_ticks"].sum() == len(sample_tick_data)
+                assert (bars["frame"] == frame).all()
+            
+            # 1000 ticks at 1s spacing from 09:00:00 -> 17 minute bars, 4 of 5m
+            assert len(pd.read_parquet(out_dir / "bars_1m.parquet")) == 17
+            assert len(pd.read_parquet(out_dir / "bars_5m.parquet")) == 4
+            bars_50 = pd.read_parquet(out_dir / "bars_50tick.parquet")
+            assert len(bars_50) == 20
+            mid = (sample_tick_data["bid"] + sample_tick_data["ask"]) / 2
+            assert np.isclose(bars_50["h"].iloc[0], mid.iloc[:50].max())
+
+    def test_ipc_cache(self, sample_tick_data, temp_workspace):
+        """Test Arrow IPC siblings are written and preferred by read_table"""
+        from core.data_ingest.ipc_cache import read_arrow, read_table
+
+        csv_path = temp_workspace / "test_data.csv"
+        sample_tick_data.to_csv(csv_path, index=False)
+        out_dir = temp_workspace / "output"
+
+        result = di_v22.run({
+            "csv_path": str(csv_path),
+            "out_dir": str(out_dir),
+            "export_slices": False,
+            "ipc_cache": True,
+            "bar_frames": [{"type": "time", "unit": "1m"}, {"type": "tick", "count": 100}]
+        })
+
+        assert (out_dir / "raw_norm.arrow").exists()
+        for frame, info in result["frames"].items():
+            parquet_path = out_dir / info["path"]
+            assert (out_dir / info["ipc_path"]) == parquet_path.with_suffix(".arrow")
+            pd.testing.assert_frame_equal(read_table(parquet_path), pd.read_parquet(parquet_path))
+
+        raw = read_arrow(out_dir / "raw_norm.parquet", columns=["ts_ns", "bid"])
+        assert raw.column_names == ["ts_ns", "bid"]
+        assert raw.num_rows == len(sample_tick_data)
+
+        with open(out_dir / "manifest.json") as f:
+            assert json.load(f)["ipc_cache"] is True
+
+    @pytest.mark.parametrize("slice_format", ["per_event", "csr"])
+    def test_streaming_matches_in_memory(self, sample_tick_data, temp_workspace, slice_format):
+        """Test the out-of-core path on unsorted input with duplicates"""
+
+        # Shuffled ticks plus duplicates force the external merge and dedupe
+        data = pd.concat([sample_tick_data, sample_tick_data.iloc[::7]])
+        data = data.sample(frac=1, random_state=3)
+        csv_path = temp_workspace / "test_data.csv"
+        data.to_csv(csv_path, index=False)
+
+        outputs = {}
+        for streaming in (False, True):
+            out_dir = temp_workspace / f"output_{streaming}"
+            outputs[streaming] = out_dir
+            di_v22.run({
+                "csv_path": str(csv_path),
+                "out_dir": str(out_dir),
+                "slice_format": slice_format,
+                "streaming": streaming,
+                # ~250 rows per chunk, i.e. several sorted runs
+                "memory_limit_mb": 0.125,
+                "max_gap_seconds": 0.5,
+                "bar_frames": [{"type": "time", "unit": "1m"}, {"type": "tick", "count": 64}]
+            })
+
+        mem, stream = outputs[False], outputs[True]
+        for name in ("raw_norm.parquet", "bars_1m.parquet", "bars_64tick.parquet"):
+            pd.testing.assert_frame_equal(pd.read_parquet(mem / name), pd.read_parquet(stream / name))
+
+        with open(mem / "quality_report.json") as f:
+            q_mem = json.load(f)
+        with open(stream / "quality_report.json") as f:
+            q_stream = json.load(f)
+        assert q_stream["n_raw_rows"] == len(sample_tick_data)
+        for key in ("n_raw_rows", "gap_items", "gap_coverage_percent", "time_range"):
+            assert q_stream[key] == q_mem[key]
+        for key, value in q_mem["spread_stats"].items():
+            assert np.isclose(q_stream["spread_stats"][key], value, rtol=1e-9)
+
+        for frame in ("1m", "64t"):
+            with open(mem / f"tick_slices_{frame}" / "slice_manifest.json") as f:
+                m_mem = json.load(f)
+            with open(stream / f"tick_slices_{frame}" / "slice_manifest.json") as f:
+                m_stream = json.load(f)
+            assert m_stream["statistics"] == m_mem["statistics"]
+            assert m_stream.get("files") == m_mem.get("files")
+        assert not list(stream.glob(".sort-*"))
+
+    def test_tick_window_grows_and_drops(self):
+        """The streaming slice window keeps ticks by id across resizes and drops"""
+        window = di_v22._TickWindow(capacity=4)
+        ts = np.arange(100, dtype=np.int64)
+        for s in range(0, 100, 7):
+            window.append(ts[s:s + 7], ts[s:s + 7] * 0.5, ts[s:s + 7] * 2.0)
+            kept = window.slice(window.start, min(s + 7, 100))
+            if s % 21 == 0:
+                window.drop_before(max(s - 3, 0))
+            np.testing.assert_array_equal(kept[0], ts[kept[0][0]:min(s + 7, 100)])
+            np.testing.assert_array_equal(kept[1], kept[0] * 0.5)
+        assert window.start == 81
+        np.testing.assert_array_equal(window.slice(81, 100)[2], ts[81:] * 2.0)
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v"])
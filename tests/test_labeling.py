@@ -13,7 +13,11 @@ import json
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.labeling.labeling import run as run_labeling, apply_labeling_v2_1_numba, calculate_daily_volatility
+from core.labeling.labeling import (run as run_labeling, apply_labeling_v2_1_numba, apply_labeling_v2_1_parallel,
+                                    calculate_daily_volatility, load_tick_slices_csr, tick_slices_csr,
+                                    KERNEL_SIGNATURES)
+from core.labeling.jit_cache import compile_kernels
+from core.data_ingest.tick_store import TickSliceStoreWriter
 
 
 @pytest.fixture
@@ -59,25 +63,28 @@ class TestLabelingCore:
     def test_apply_labeling_numba(self):
         """Test the Numba-optimized labeling function with clear cases."""
         # Prices: 100 -> 104 (TP) -> 98 (SL) -> 100 (Timeout)
-        prices = np.array([100, 101, 102, 104, 103, 101, 98, 99, 100])
+        prices = np.array([100, 101, 102, 104, 103, 101, 98, 99, 100], dtype=np.float64)
         t_events = np.array([0, 2, 6]) # Events at start, mid, and near end
-        pt_sl = np.array([0.03, 0.02])  # 3% TP, 2% SL
-        timeout_bars = 3
+        pt_sl = np.array([3.0, 2.0])  # TP 3 above, SL 2 below the entry price
+        timeout_bars = 4
 
-        results = apply_labeling_v2_1_numba(prices, prices, [], t_events, pt_sl, timeout_bars, 1)
+        # One tick per bar at the bar price
+        offsets = np.arange(len(prices) + 1, dtype=np.int64)
+        results = apply_labeling_v2_1_numba(prices, prices, prices, prices, offsets, t_events, pt_sl, timeout_bars, 1)
 
         # Event 1 (index 0, price 100): TP at 103, SL at 98
         # Should hit TP at index 3 (price 104)
         assert results[0, 1] == 1  # Label: Take Profit
         assert results[0, 2] == 3  # Final time
+        assert results[0, 0] == pytest.approx(0.03)
 
-        # Event 2 (index 2, price 102): TP at 105.06, SL at 99.96
+        # Event 2 (index 2, price 102): TP at 105, SL at 100
         # Should hit SL at index 6 (price 98)
         assert results[1, 1] == -1 # Label: Stop Loss
         assert results[1, 2] == 6  # Final time
 
-        # Event 3 (index 6, price 98): TP at 100.94, SL at 96.04
-        # Should time out at index 6+3=9 (or end of array)
+        # Event 3 (index 6, price 98): TP at 101, SL at 96
+        # Should time out at index 6+4=10 (or end of array)
         assert results[2, 1] == 0  # Label: Timeout
         assert results[2, 2] == 8  # Final time is end of array
 
@@ -131,6 +138,77 @@ class TestLabelingCore:
         assert "0" in report["label_counts"] # Timeout
 
 
+class TestTickSlicesCSR:
+    """Tests for the flat CSR tick layout of labeling v2.1."""
+
+    @pytest.fixture
+    def tick_slices(self):
+        rng = np.random.default_rng(3)
+        bar_idx = np.repeat(np.arange(50), rng.integers(0, 8, 50))
+        mid = 1.1 + np.cumsum(rng.normal(0, 2e-4, len(bar_idx)))
+        return pd.DataFrame({"bar_idx": bar_idx, "bid": mid - 5e-5, "ask": mid + 5e-5})
+
+    def test_layout(self, tick_slices):
+        shuffled = tick_slices.sample(frac=1.0, random_state=1)
+        extra = pd.DataFrame({"bar_idx": [-1, 60], "bid": [0.0, 0.0], "ask": [0.0, 0.0]})
+        offsets, bid, ask = tick_slices_csr(pd.concat([shuffled, extra]), 55)
+        assert len(offsets) == 56 and offsets[-1] == len(tick_slices)
+        for i, group in shuffled.groupby("bar_idx"):
+            np.testing.assert_array_equal(bid[offsets[i]:offsets[i + 1]], group["bid"].to_numpy())
+            np.testing.assert_array_equal(ask[offsets[i]:offsets[i + 1]], group["ask"].to_numpy())
+        assert (offsets[51:] == offsets[50]).all()
+
+    def test_first_hit_matches_per_bar_loop(self, tick_slices):
+        offsets, bid, ask = tick_slices_csr(tick_slices, 50)
+        mid = np.array([(bid[s:e].mean() + ask[s:e].mean()) / 2 if e > s else 1.1
+                        for s, e in zip(offsets[:-1], offsets[1:])])
+        pt_sl = np.array([6e-4, 4e-4])
+        for side in (1, -1):
+            results = apply_labeling_v2_1_numba(mid, mid, bid, ask, offsets, np.arange(50), pt_sl, 10, side)
+            for i in range(50):
+                tp = mid[i] + side * pt_sl[0]
+                sl = mid[i] - side * pt_sl[1]
+                label, t_final = 0, min(i + 10, 49)
+                for t in range(i + 1, t_final + 1):
+                    hits = [(1 if (a >= tp if side == 1 else b <= tp) else
+                             -1 if (b <= sl if side == 1 else a >= sl) else 0)
+                            for b, a in zip(bid[offsets[t]:offsets[t + 1]], ask[offsets[t]:offsets[t + 1]])]
+                    hits = [h for h in hits if h]
+                    if hits:
+                        label, t_final = hits[0], t
+                        break
+                assert (results[i, 1], results[i, 2]) == (label, t_final)
+
+    def test_parallel_kernel_matches_serial(self, tick_slices):
+        offsets, bid, ask = tick_slices_csr(tick_slices, 50)
+        mid = np.full(50, 1.1)
+        pt_sl = np.array([6e-4, 4e-4])
+        for side in (1, -1):
+            args = (mid, mid, bid, ask, offsets, np.arange(50), pt_sl, 10, side)
+            np.testing.assert_array_equal(apply_labeling_v2_1_parallel(*args), apply_labeling_v2_1_numba(*args))
+
+    def test_csr_store_input(self, tick_slices, tmp_path):
+        offsets, bid, ask = tick_slices_csr(tick_slices, 50)
+        writer = TickSliceStoreWriter(tmp_path / "slices", "1m")
+        writer.append(np.arange(len(bid), dtype=np.int64), bid, ask, np.diff(offsets))
+        writer.close()
+        tick_slices.to_parquet(tmp_path / "slices.parquet")
+        for source in (tmp_path / "slices", tmp_path / "slices.parquet"):
+            got = load_tick_slices_csr(source, 52)
+            np.testing.assert_array_equal(got[0], np.concatenate((offsets, offsets[-1:], offsets[-1:])))
+            np.testing.assert_array_equal(got[1], bid)
+            np.testing.assert_array_equal(got[2], ask)
+        
+        # Store reads are passed to the kernel without compiling a new specialization
+        compile_kernels(KERNEL_SIGNATURES, ["apply_labeling_v2_1_numba"])
+        n_signatures = len(apply_labeling_v2_1_numba.signatures)
+        offsets, bid, ask = load_tick_slices_csr(tmp_path / "slices", 50)
+        mid = np.full(50, 1.1)
+        apply_labeling_v2_1_numba(mid, mid, bid, ask, offsets, np.arange(50, dtype=np.int64),
+                                  np.array([1.0, 1.0]), 10, 1)
+        assert len(apply_labeling_v2_1_numba.signatures) == n_signatures
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
 
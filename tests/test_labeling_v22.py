@@ -326,6 +326,156 @@ class TestLabelingV22:
         results_df = pd.read_parquet(result["results_path"])
         assert len(results_df) > 0
 
+    def test_parallel_kernel_matches_serial(self, sample_bars_data, temp_workspace):
+        """prange kernel and n_threads give the serial results"""
+        rng = np.random.default_rng(5)
+        n = len(sample_bars_data)
+        prices = sample_bars_data["c"].to_numpy()
+        times = sample_bars_data["t_open_ns"].to_numpy()
+        events = np.arange(10, n - 1, 3)
+        args = (prices, times, events, rng.uniform(1, 3, len(events)), rng.uniform(1, 3, len(events)),
+                np.full(len(events), 30), np.full(len(events), 1200.0),
+                rng.choice([-1, 1], len(events)), np.full(len(events), 2e-4))
+        serial = labeling_v22._apply_triple_barrier_v22(*args)
+        np.testing.assert_array_equal(labeling_v22._apply_triple_barrier_v22_parallel(*args), serial)
+
+        bars_path = temp_workspace / "bars_1m.parquet"
+        sample_bars_data.to_parquet(bars_path, index=False)
+        frames = []
+        for n_threads in (1, None):
+            config = {"bars_path": str(bars_path), "out_dir": str(temp_workspace / f"out_{n_threads}"),
+                      "events": [{"index": i} for i in range(10, 900, 7)], "n_threads": n_threads}
+            frames.append(pd.read_parquet(labeling_v22.run(config)["results_path"]))
+        pd.testing.assert_frame_equal(frames[0], frames[1])
+
+        from core.labeling.threads import resolve_threads
+        with pytest.raises(ValueError):
+            resolve_threads(-1)
+        assert 1 <= resolve_threads(None) == resolve_threads(0) >= resolve_threads(2)
+
+    def test_startup_report_and_kernel_cache(self, sample_bars_data, temp_workspace):
+        """Kernel compile/load times are reported and the disk cache is reused"""
+        import os, subprocess, sys
+        from core.labeling.jit_cache import compile_kernels
+        bars_path = temp_workspace / "bars_1m.parquet"
+        sample_bars_data.to_parquet(bars_path, index=False)
+        config = {"bars_path": str(bars_path), "out_dir": str(temp_workspace / "output"),
+                  "events": [{"index": i} for i in range(10, 100, 10)], "tp_vol_multiple": 2, "n_threads": 1}
+        kernels = {name: labeling_v22.KERNEL_SIGNATURES[name][0]
+                   for name in ("_calculate_ewma_volatility", "_apply_triple_barrier_v22")}
+        compile_kernels(labeling_v22.KERNEL_SIGNATURES, kernels)
+        compiled = {name: list(kernel.signatures) for name, kernel in kernels.items()}
+        result = labeling_v22.run(config)
+        startup = result["startup"]
+        assert set(startup["kernels"]) == set(kernels)
+        assert startup["labeling_seconds"] >= 0
+        # run() casts its inputs to the listed signatures: no further specializations
+        assert {name: list(kernel.signatures) for name, kernel in kernels.items()} == compiled
+        with open(result["summary_path"]) as f:
+            assert json.load(f)["startup"]["kernels"].keys() == startup["kernels"].keys()
+        
+        code = ("import json; from core.labeling import labeling_v22 as v; "
+                "from core.labeling.jit_cache import compile_kernels; "
+                "print(json.dumps(compile_kernels(v.KERNEL_SIGNATURES, ['_calculate_ewma_volatility'])))")
+        env = {**os.environ, "NUMBA_CACHE_DIR": str(temp_workspace / "numba_cache")}
+        runs = [json.loads(subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True,
+                                          text=True, cwd=pathlib.Path(__file__).parent.parent).stdout)
+                for _ in range(2)]
+        assert runs[0]["kernels"]["_calculate_ewma_volatility"]["cache_misses"] == 1
+        assert runs[1]["kernels"]["_calculate_ewma_volatility"]["cache_hits"] == 1
+        assert runs[1]["cache_dir"] == env["NUMBA_CACHE_DIR"]
+
+    def test_range_index_first_touch(self):
+        """Range-index jump finds the same first touching bar as a scan"""
+        rng = np.random.default_rng(11)
+        values = 1.1 + np.cumsum(rng.normal(0, 1e-4, 5000))
+        values[rng.integers(0, 5000, 40)] = np.nan
+        block = labeling_v22.RANGE_BLOCK
+        range_max, range_min = labeling_v22._build_range_index(values, values, block)
+        for _ in range(500):
+            start = int(rng.integers(0, 5000))
+            end = int(rng.integers(start - 5, 5000))
+            center = values[start] if not np.isnan(values[start]) else 1.1
+            upper = center + rng.uniform(0, 5e-3)
+            lower = center - rng.uniform(0, 5e-3)
+            window = values[start:end + 1]
+            touched = np.flatnonzero((window >= upper) | (window <= lower))
+            expected = start + touched[0] if len(touched) else -1
+            assert labeling_v22._first_touch(values, values, range_max, range_min, block,
+                                             start, end, upper, lower) == expected
+
+    def test_bid_ask_first_hit(self, temp_workspace):
+        """Two-level bid/ask kernel matches a tick-by-tick scan and run() uses it"""
+        from core.data_ingest.tick_store import TickSliceStoreWriter
+        rng = np.random.default_rng(21)
+        n_bars = 600
+        lengths = rng.integers(0, 12, n_bars)
+        mid = 1.1 + np.cumsum(rng.normal(0, 3e-5, lengths.sum()))
+        half_spread = rng.uniform(2e-5, 8e-5, len(mid))
+        bid, ask = mid - half_spread, mid + half_spread
+        t_close = (np.arange(n_bars, dtype=np.int64) + 1) * 60_000_000_000
+        ts = np.repeat(t_close, lengths) - rng.integers(1, 60_000_000_000, len(mid))
+        writer = TickSliceStoreWriter(temp_workspace / "slices", "1m", row_group_ticks=500)
+        writer.append(ts, bid, ask, lengths)
+        writer.close()
+        offsets = np.concatenate(([0], np.cumsum(lengths)))
+        bar_mid = np.array([mid[s:e].mean() if e > s else np.nan for s, e in zip(offsets[:-1], offsets[1:])])
+        bar_mid = pd.Series(bar_mid).ffill().bfill().to_numpy()
+        
+        events = np.arange(0, n_bars - 1, 3, dtype=np.int64)
+        sides = rng.choice([-1, 0, 1], len(events)).astype(np.int64)
+        tp, sl = rng.uniform(1, 4, len(events)), rng.uniform(1, 4, len(events))
+        vol = np.full(len(events), 1e-4)
+        timeout_bars = rng.integers(1, 100, len(events)).astype(np.int64)
+        timeout_seconds = rng.integers(600, 7200, len(events)).astype(np.int64)
+        slices = labeling_v22._load_bid_ask_slices(temp_workspace / "slices", n_bars, events, 100)
+        results = labeling_v22._apply_triple_barrier_bid_ask(bar_mid, t_close, *slices, events, tp, sl,
+                                                              timeout_bars, timeout_seconds, sides, vol)
+        parallel = labeling_v22._apply_triple_barrier_bid_ask_parallel(bar_mid, t_close, *slices, events, tp, sl,
+                                                                        timeout_bars, timeout_seconds, sides, vol)
+        np.testing.assert_array_equal(results, parallel)
+        
+        for i, e in enumerate(events):
+            entry = bar_mid[e]
+            levels = {1: (entry + tp[i] * 1e-4, entry - sl[i] * 1e-4), -1: (entry - tp[i] * 1e-4, entry + sl[i] * 1e-4)}
+            last = min(e + timeout_bars[i], n_bars - 1)
+            last = min(last, np.searchsorted(t_close, t_close[e] + timeout_seconds[i] * 10**9, side="right") - 1)
+            hit, exit_ns = 0, t_close[min(e + timeout_bars[i], n_bars - 1)]
+            for k in range(offsets[e + 1], offsets[last + 1]):
+                for s in ((1, -1) if sides[i] == 0 else (sides[i],)):
+                    take, stop = levels[s]
+                    if s == 1 and (ask[k] >= take or bid[k] <= stop):
+                        hit = 1 if ask[k] >= take else -1
+                    elif s == -1 and (bid[k] <= take or ask[k] >= stop):
+                        hit = 1 if bid[k] <= take else -1
+                    if hit:
+                        break
+                if hit:
+                    exit_ns = ts[k]
+                    break
+            assert (results[i, 3], results[i, 2]) == (hit, exit_ns)
+        assert (results[:, 3] != 0).any() and (results[:, 3] == 0).any()
+        
+        bars = pd.DataFrame({"t_open_ns": t_close - 60_000_000_000, "t_close_ns": t_close,
+                             "o": bar_mid, "h": bar_mid, "l": bar_mid, "c": bar_mid})
+        bars.to_parquet(temp_workspace / "bars.parquet", index=False)
+        config = {"bars_path": str(temp_workspace / "bars.parquet"), "out_dir": str(temp_workspace / "out"),
+                  "tick_slices_dir": str(temp_workspace / "slices"), "events": [{"index": 5}, {"index": 50}],
+                  "barrier_prices": "bid_ask", "side": 1}
+        result = labeling_v22.run(config)
+        assert result["barrier_prices"] == "bid_ask"
+        assert "_apply_triple_barrier_bid_ask" in "".join(result["startup"]["kernels"])
+        with pytest.raises(ValueError):
+            labeling_v22.run({**config, "tick_slices_dir": None})
+        
+        # Bars that are not the store's bars one to one are rejected
+        bars.iloc[100:].to_parquet(temp_workspace / "bars_tail.parquet", index=False)
+        with pytest.raises(ValueError, match="bars"):
+            labeling_v22.run({**config, "bars_path": str(temp_workspace / "bars_tail.parquet")})
+        with pytest.raises(ValueError, match="frame"):
+            labeling_v22.run({**config, "frame": "5m"})
+        assert labeling_v22.run({**config, "frame": "1m"})["barrier_prices"] == "bid_ask"
+
 if __name__ == "__main__":
     # Run tests
     pytest.main([__file__, "-v"])
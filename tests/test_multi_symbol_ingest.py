@@ -0,0 +1,90 @@
+"""
+Tests for the multi-symbol ingest and the aligned bar panel (Module 1)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from core.data_ingest import data_ingest_v22, multi_symbol_ingest
+from core.data_ingest.multi_symbol_ingest import read_panel
+
+BAR_FRAMES = [{"type": "time", "unit": "1m"}, {"type": "tick", "count": 100}]
+
+
+@pytest.fixture
+def symbol_files(tmp_path):
+    """Three symbols with different trading hours and price levels."""
+    files = {}
+    for i, (symbol, start, level) in enumerate((("EURUSD", "09:00", 1.1), ("GBPUSD", "09:30", 1.3),
+                                                ("USDJPY", "10:00", 150.0))):
+        rng = np.random.default_rng(i)
+        n = 3_000
+        ts = pd.Timestamp(f"2025-01-02 {start}:00.000001", tz="UTC") + pd.to_timedelta(
+            np.cumsum(rng.integers(100, 3_000, n)), unit="ms")
+        mid = level * (1 + np.cumsum(rng.normal(0, 1e-5, n)))
+        path = tmp_path / f"{symbol}.csv"
+        pd.DataFrame({"timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"), "bid": mid - 1e-4 * level,
+                      "ask": mid + 1e-4 * level}).to_csv(path, index=False)
+        files[symbol] = path
+    return files
+
+
+class TestMultiSymbolIngest:
+
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_matches_single_symbol_runs(self, symbol_files, tmp_path, workers):
+        out_dir = tmp_path / f"out_{workers}"
+        manifest = multi_symbol_ingest.run({
+            "symbols": {"EURUSD": str(symbol_files["EURUSD"]), "GBPUSD": str(symbol_files["GBPUSD"]),
+                        "USDJPY": {"csv_path": str(symbol_files["USDJPY"]), "pip_size": 0.01}},
+            "out_dir": str(out_dir), "bar_frames": BAR_FRAMES, "export_slices": False, "workers": workers})
+        assert manifest["symbols"] == ["EURUSD", "GBPUSD", "USDJPY"]
+        single = tmp_path / "single"
+        data_ingest_v22.run({"csv_path": str(symbol_files["GBPUSD"]), "out_dir": str(single), "symbol": "GBPUSD",
+                             "bar_frames": BAR_FRAMES, "export_slices": False})
+        for name in ("bars_1m.parquet", "bars_100tick.parquet"):
+            pd.testing.assert_frame_equal(pd.read_parquet(out_dir / "GBPUSD" / name),
+                                          pd.read_parquet(single / name))
+        jpy = pd.read_json(out_dir / "USDJPY" / "manifest.json", typ="series")
+        assert jpy["pip_size"] == 0.01 and jpy["symbol"] == "USDJPY"
+
+    def test_panel_alignment(self, symbol_files, tmp_path):
+        out_dir = tmp_path / "out"
+        manifest = multi_symbol_ingest.run({
+            "symbols": {s: str(p) for s, p in symbol_files.items()}, "out_dir": str(out_dir),
+            "bar_frames": [{"type": "tick", "count": 100}], "export_slices": False, "workers": 1})
+        panel_path = out_dir / manifest["outputs"]["panel"]["path"]
+        assert panel_path.name == "panel_1m.parquet"
+        panel = read_panel(panel_path)
+        minutes = {}
+        for symbol in symbol_files:
+            bars = pd.read_parquet(out_dir / symbol / "bars_1m.parquet")
+            minutes[symbol] = pd.to_datetime(bars["t_open_ns"] // 60_000_000_000 * 60_000_000_000, utc=True)
+            aligned = panel.loc[pd.DatetimeIndex(minutes[symbol]), ("c", symbol)]
+            np.testing.assert_array_equal(aligned.to_numpy(), bars["c"].to_numpy())
+            assert panel[("n_ticks", symbol)].sum() == bars["n_ticks"].sum()
+        # Union of the traded minutes, sorted; a symbol that did not trade has NaN prices
+        expected = pd.DatetimeIndex(sorted(set().union(*[set(m) for m in minutes.values()])))
+        assert panel.index.equals(expected)
+        before_jpy = panel.index < minutes["USDJPY"].iloc[0]
+        assert panel.loc[before_jpy, ("c", "USDJPY")].isna().all()
+        assert (panel.loc[before_jpy, ("n_ticks", "USDJPY")] == 0).all()
+        assert list(panel["c"].columns) == ["EURUSD", "GBPUSD", "USDJPY"]
+
+    def test_read_panel_projection(self, symbol_files, tmp_path):
+        out_dir = tmp_path / "out"
+        multi_symbol_ingest.run({"symbols": {s: str(p) for s, p in symbol_files.items()}, "out_dir": str(out_dir),
+                                 "bar_frames": BAR_FRAMES, "export_slices": False, "workers": 1,
+                                 "panel_frame": "5m", "panel_fields": ["c", "n_ticks"]})
+        assert "c.EURUSD" in pq.read_schema(out_dir / "panel_5m.parquet").names
+        panel = read_panel(out_dir / "panel_5m.parquet", symbols=["EURUSD", "USDJPY"], fields=["c"])
+        assert list(panel.columns) == [("c", "EURUSD"), ("c", "USDJPY")]
+        assert (panel.index.minute % 5 == 0).all()
+
+    def test_missing_inputs(self, tmp_path):
+        with pytest.raises(ValueError, match="IO_ERROR"):
+            multi_symbol_ingest.run({"symbols": {}, "out_dir": str(tmp_path)})
+        with pytest.raises(ValueError, match="IO_ERROR"):
+            multi_symbol_ingest.run({"symbols": {"EURUSD": {"pip_size": 0.0001}}, "out_dir": str(tmp_path)})
@@ -0,0 +1,90 @@
+"""
+Tests for the Parquet writer profiles (Module 1)
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.data_ingest import data_ingest_v22
+from core.data_ingest.bar_engine import BarEngine
+from core.data_ingest.bar_store import read_bars, write_bars
+from core.data_ingest.parquet_profiles import PROFILES, open_writer, row_group_rows, write_table, writer_options
+
+
+@pytest.fixture
+def bars():
+    rng = np.random.default_rng(3)
+    n = 100_000
+    ts = (pd.Timestamp("2025-01-02", tz="UTC").value + np.cumsum(rng.integers(1, 5_000, n)) * 1_000_000).astype(np.int64)
+    mid = np.round(1.1 + np.cumsum(rng.normal(0, 1e-5, n)), 5)
+    engine = BarEngine("EURUSD", [{"type": "time", "unit": "1m"}])
+    parts = list(engine.add_batch(ts, mid - 5e-5, mid + 5e-5).values()) + list(engine.finish().values())
+    return pa.concat_tables(parts)
+
+
+def _encodings(path, name):
+    meta = pq.ParquetFile(path).metadata
+    i = meta.schema.to_arrow_schema().get_field_index(name)
+    return set(meta.row_group(0).column(i).encodings)
+
+
+class TestParquetProfiles:
+
+    def test_bar_encodings_and_round_trip(self, bars, tmp_path):
+        path = tmp_path / "bars.parquet"
+        write_table(bars, path, "bars")
+        assert "RLE_DICTIONARY" in _encodings(path, "symbol")
+        assert "RLE_DICTIONARY" in _encodings(path, "c")
+        assert "DELTA_BINARY_PACKED" in _encodings(path, "t_open_ns")
+        assert "BYTE_STREAM_SPLIT" in _encodings(path, "spread_mean")
+        assert pq.read_table(path).equals(bars)
+        # Page index and statistics are written for pushdown readers
+        f = pq.ParquetFile(path)
+        assert f.metadata.row_group(0).column(0).has_offset_index
+        assert f.metadata.row_group(0).column(0).statistics.has_min_max
+
+    def test_tick_profile(self, tmp_path):
+        ts = np.arange(10_000, dtype=np.int64) * 1_000_000
+        table = pa.table({"timestamp": pa.array(pd.to_datetime(ts, utc=True).strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
+                          "bid": np.full(10_000, 1.1), "ask": np.full(10_000, 1.1001), "ts_ns": ts})
+        opts = writer_options(table.schema, "ticks")
+        assert opts["use_dictionary"] == []
+        assert opts["column_encoding"] == {"timestamp": "DELTA_BYTE_ARRAY", "bid": "PLAIN", "ask": "PLAIN",
+                                           "ts_ns": "DELTA_BINARY_PACKED"}
+        path = tmp_path / "ticks.parquet"
+        with open_writer(path, table.schema, "ticks") as writer:
+            writer.write_table(table)
+        assert pq.read_table(path).equals(table)
+        assert "DELTA_BYTE_ARRAY" in _encodings(path, "timestamp")
+
+    def test_row_groups_sized_in_bytes(self, bars, tmp_path, monkeypatch):
+        monkeypatch.setitem(PROFILES["bars"], "row_group_bytes", bars.nbytes // 4)
+        rows = row_group_rows(bars, "bars")
+        assert rows == pytest.approx(bars.num_rows / 4, rel=0.01)
+        path = tmp_path / "bars.parquet"
+        write_table(bars, path, "bars")
+        assert pq.ParquetFile(path).metadata.num_row_groups in (4, 5)
+        write_table(bars, path, "bars", row_group_size=bars.num_rows)
+        assert pq.ParquetFile(path).metadata.num_row_groups == 1
+
+    def test_unknown_profile(self, bars):
+        with pytest.raises(ValueError, match="Unknown Parquet profile"):
+            writer_options(bars.schema, "quotes")
+
+    def test_outputs_use_profiles(self, bars, tmp_path):
+        root = tmp_path / "store"
+        write_bars(bars, root)
+        part = next(root.rglob("*.parquet"))
+        assert "DELTA_BINARY_PACKED" in _encodings(part, "t_open_ns")
+        assert len(read_bars(root, "EURUSD", "1m")) == bars.num_rows
+
+        csv_path = tmp_path / "ticks.csv"
+        ts = pd.date_range("2025-01-02", periods=5_000, freq="750ms", tz="UTC")
+        pd.DataFrame({"timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"), "bid": 1.1, "ask": 1.1001}) \
+            .to_csv(csv_path, index=False)
+        data_ingest_v22.run({"csv_path": str(csv_path), "out_dir": str(tmp_path / "out"),
+                             "bar_frames": [{"type": "time", "unit": "1m"}], "export_slices": False})
+        assert "DELTA_BINARY_PACKED" in _encodings(tmp_path / "out" / "raw_norm.parquet", "ts_ns")
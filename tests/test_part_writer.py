@@ -0,0 +1,100 @@
+"""
+Tests for the long-lived part writer used by the streaming ingestors (Module 1)
+"""
+
+import pathlib
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from core.data_ingest import data_ingest_parquet, data_ingest_streaming
+from core.data_ingest.bar_engine import tick_slice_table
+from core.data_ingest.part_writer import RollingParquetWriter
+from core.data_ingest.schema import TICKS_SLICE_SCHEMA
+
+
+def _slices(start, n):
+    ts = np.arange(start, start + n, dtype=np.int64) * 1_000_000
+    return tick_slice_table(ts, np.full(n, 1.1), np.full(n, 1.1001), start, 1000)
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    rng = np.random.default_rng(4)
+    n = 20_000
+    ts = pd.Timestamp("2025-01-02 09:00:00") + pd.to_timedelta(np.cumsum(rng.integers(0, 4, n)), unit="s")
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    path = tmp_path / "ticks.csv"
+    pd.DataFrame({"symbol": "EURUSD", "timestamp": ts.strftime("%Y%m%d %H:%M:%S"),
+                  "bid": mid - 5e-5, "ask": mid + 5e-5}).to_csv(path, index=False, header=False)
+    return path
+
+
+class TestRollingParquetWriter:
+
+    def test_row_groups_and_atomic_finalize(self, tmp_path):
+        writer = RollingParquetWriter(tmp_path / "slices", TICKS_SLICE_SCHEMA, "slices", row_group_rows=1_000)
+        for start in range(0, 3_500, 700):
+            writer.write(_slices(start, 700))
+        # The open part is only visible under its .tmp name
+        assert [p.name for p in (tmp_path / "slices").iterdir()][0].startswith(".tmp-")
+        files = writer.close()
+        assert [pathlib.Path(f).name for f in files] == ["part-00000.parquet"]
+        meta = pq.ParquetFile(files[0]).metadata
+        assert [meta.row_group(i).num_rows for i in range(meta.num_row_groups)] == [1_000, 1_000, 1_000, 500]
+        assert pq.read_table(files[0]).column("tick_id").to_pylist() == list(range(3_500))
+        assert not list((tmp_path / "slices").glob(".tmp-*"))
+
+    def test_roll_by_size_and_numbering(self, tmp_path):
+        writer = RollingParquetWriter(tmp_path / "slices", TICKS_SLICE_SCHEMA, "slices",
+                                      row_group_rows=5_000, max_file_bytes=1)
+        for start in range(0, 20_000, 5_000):
+            writer.write(_slices(start, 5_000))
+        assert len(writer.files) == 4
+        assert writer.roll() is None
+        # A second writer on the same directory continues the numbering
+        later = RollingParquetWriter(tmp_path / "slices", TICKS_SLICE_SCHEMA, "slices")
+        later.write(_slices(20_000, 10))
+        assert pathlib.Path(later.close()[0]).name == "part-00004.parquet"
+        assert pq.read_table(tmp_path / "slices").num_rows == 20_010
+
+
+class TestIngestorParts:
+
+    def test_streaming_one_part_per_output(self, csv_file, tmp_path):
+        manifest = data_ingest_streaming.run({"csv": {"path": str(csv_file)}, "out_dir": str(tmp_path / "out"),
+                                              "chunk_bytes": 8192, "checkpoint_every_batches": 0,
+                                              "flush_every_bars": 50})
+        for name, output in manifest["outputs"].items():
+            if name == "quality_report":
+                continue
+            parts = sorted(pq.ParquetDataset(output["path"]).files)
+            assert len(parts) == 1 and parts[0].endswith("part-00000.parquet")
+        meta = pq.ParquetFile(tmp_path / "out" / "bars_100t" / "part-00000.parquet").metadata
+        assert meta.num_rows == 200 and meta.row_group(0).num_rows == 50
+
+    def test_checkpoints_and_size_roll_parts(self, csv_file, tmp_path):
+        out_dir = tmp_path / "out"
+        data_ingest_streaming.run({"csv": {"path": str(csv_file)}, "out_dir": str(out_dir),
+                                   "chunk_bytes": 8192, "checkpoint_every_batches": 20})
+        n_batches = -(-csv_file.stat().st_size // 8192)
+        parts = list((out_dir / "tick_slices_1000t").glob("part-*.parquet"))
+        assert len(parts) == n_batches // 20 + 1
+        assert pq.read_table(out_dir / "tick_slices_1000t").num_rows == 20_000
+
+        data_ingest_parquet.run({"parquet": {"path": str(self._to_parquet(csv_file, tmp_path))},
+                                 "out_dir": str(tmp_path / "pq"), "chunksize": 1_000,
+                                 "flush_every_bars": 20, "max_part_bytes": 1})
+        bars = pq.read_table(tmp_path / "pq" / "bars_100t").to_pandas().sort_values("tick_first_id")
+        parts = list((tmp_path / "pq" / "bars_100t").glob("part-*.parquet"))
+        assert len(parts) == len(bars) // 20 == 10
+        assert bars["tick_first_id"].tolist() == list(range(0, 20_000, 100))
+
+    @staticmethod
+    def _to_parquet(csv_file, tmp_path):
+        df = pd.read_csv(csv_file, header=None, names=["symbol", "timestamp", "bid", "ask"])
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="%Y%m%d %H:%M:%S", utc=True)
+        path = tmp_path / "ticks.parquet"
+        df[["timestamp", "bid", "ask"]].to_parquet(path)
+        return path
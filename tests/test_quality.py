@@ -0,0 +1,132 @@
+"""
+Tests for the incremental quality report engine (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from core.data_ingest.quality import QualityAccumulator, gap_items, SPREAD_QUANTILES
+from core.data_ingest.external_sort import external_quantiles
+from core.data_ingest import data_ingest_parquet
+
+
+@pytest.fixture
+def ticks():
+    rng = np.random.default_rng(5)
+    n = 50_000
+    steps = rng.exponential(2.0, n)
+    steps[rng.choice(n, 40, replace=False)] = rng.uniform(400, 4000, 40)
+    ts = (1_735_722_000 + np.cumsum(steps)) * 1e9
+    mid = 1.1 + np.cumsum(rng.normal(0, 1e-5, n))
+    spread = rng.integers(1, 25, n) * 1e-5
+    return ts.astype(np.int64), mid - spread / 2, mid + spread / 2
+
+
+def _reference_gaps(ts, max_gap_s):
+    """The original per-diff loop of data_ingest_v22."""
+    diffs = np.diff(ts) / 1_000_000_000
+    gaps = []
+    for i, gap_s in enumerate(diffs):
+        if gap_s > max_gap_s:
+            gaps.append({
+                "start": pd.to_datetime(ts[i], unit="ns", utc=True).isoformat(),
+                "end": pd.to_datetime(ts[i + 1], unit="ns", utc=True).isoformat(),
+                "duration_seconds": float(gap_s),
+            })
+    return gaps
+
+
+class TestQualityAccumulator:
+
+    def test_gap_items_match_loop(self, ticks):
+        ts, _, _ = ticks
+        gaps, seconds = gap_items(ts, 300)
+        assert gaps == _reference_gaps(ts, 300)
+        assert np.isclose(seconds, sum(g["duration_seconds"] for g in gaps))
+
+    @pytest.mark.parametrize("spill", [False, True])
+    def test_chunked_equals_one_shot(self, ticks, tmp_path, spill):
+        ts, bid, ask = ticks
+        one = QualityAccumulator(300)
+        one.update(ts, bid, ask)
+        expected = one.report()
+
+        acc = QualityAccumulator(300, tmp_path / "spread.bin" if spill else None, quantile_rows=5_000)
+        for s in range(0, len(ts), 7_777):
+            acc.update(ts[s:s + 7_777], bid[s:s + 7_777], ask[s:s + 7_777])
+        got = acc.report()
+
+        for key in ("n_raw_rows", "gap_items", "neg_spread_found", "time_range"):
+            assert got[key] == expected[key]
+        assert np.isclose(got["gap_coverage_percent"], expected["gap_coverage_percent"])
+        spread = pd.Series(ask - bid)
+        for key, value in {"mean": spread.mean(), "std": spread.std(), "p50": spread.quantile(0.5),
+                           "p95": spread.quantile(0.95), "p99": spread.quantile(0.99)}.items():
+            assert np.isclose(got["spread_stats"][key], value, rtol=1e-12)
+            assert np.isclose(expected["spread_stats"][key], value, rtol=1e-12)
+
+    def test_external_quantiles_tied_spreads(self, tmp_path):
+        """Ranks inside a large block of equal spreads (locked quotes) resolve exactly"""
+        rng = np.random.default_rng(5)
+        zero_heavy = np.where(rng.random(20_000) < 0.6, 0.0, rng.uniform(0, 3e-4, 20_000))
+        rounded = np.round(rng.uniform(0, 5e-4, 20_000), 5)
+        qs = (0.0, 0.01) + SPREAD_QUANTILES
+        for name, spread in (("zero_heavy", zero_heavy), ("rounded", rounded)):
+            path = tmp_path / f"{name}.bin"
+            spread.tofile(path)
+            got = external_quantiles(path, qs, max_rows=1_000)
+            np.testing.assert_allclose(got, pd.Series(spread).quantile(list(qs)).to_numpy(), rtol=1e-12)
+
+        acc = QualityAccumulator(300, tmp_path / "spread.bin", quantile_rows=1_000)
+        ts = np.arange(len(zero_heavy), dtype=np.int64) * 1_000_000_000
+        bid, ask = np.full(len(ts), 1.1), 1.1 + zero_heavy
+        acc.update(ts, bid, ask)
+        stats = acc.report()["spread_stats"]
+        for q in SPREAD_QUANTILES:
+            assert np.isclose(stats[f"p{round(q * 100)}"], np.quantile(ask - bid, q), rtol=1e-12)
+
+    def test_merge_partitions(self, ticks, tmp_path):
+        ts, bid, ask = ticks
+        cut = 20_000
+        # A gap straddling the partition boundary must still be reported
+        ts = ts.copy()
+        ts[cut:] += 3_600 * 1_000_000_000
+        whole = QualityAccumulator(300)
+        whole.update(ts, bid, ask)
+        left = QualityAccumulator(300, tmp_path / "left.bin")
+        left.update(ts[:cut], bid[:cut], ask[:cut])
+        right = QualityAccumulator(300, tmp_path / "right.bin")
+        right.update(ts[cut:], bid[cut:], ask[cut:])
+
+        merged = left.merge(right).report()
+        expected = whole.report()
+        assert merged["gap_items"] == expected["gap_items"]
+        assert merged["time_range"] == expected["time_range"]
+        for key, value in expected["spread_stats"].items():
+            assert np.isclose(merged["spread_stats"][key], value, rtol=1e-12)
+
+    def test_negative_spread_flagged(self):
+        acc = QualityAccumulator(300)
+        acc.update(np.arange(3, dtype=np.int64), np.array([1.0, 1.0, 1.0]), np.array([1.1, 0.9, 1.1]))
+        assert acc.report()["neg_spread_found"] is True
+
+    def test_parquet_ingest_writes_quality_report(self, ticks, tmp_path):
+        ts, bid, ask = ticks
+        src = tmp_path / "ticks.parquet"
+        pq.write_table(pa.table({
+            "timestamp": pa.array(ts, pa.timestamp("ns", tz="UTC")), "bid": bid, "ask": ask,
+        }), src)
+        out_dir = tmp_path / "out"
+        manifest = data_ingest_parquet.run({
+            "out_dir": str(out_dir), "parquet": {"path": str(src)}, "chunksize": 4096,
+        })
+        with open(manifest["outputs"]["quality_report"]["path"]) as f:
+            report = json.load(f)
+        assert report["n_raw_rows"] == len(ts)
+        assert report["gap_items"] == _reference_gaps(ts, 300)
+        assert np.isclose(report["spread_stats"]["p95"], np.quantile(ask - bid, 0.95))
+        assert not (out_dir / ".quality-spread.bin").exists()
@@ -0,0 +1,86 @@
+"""
+Tests for the mergeable KLL quantile sketch (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+
+from core.data_ingest.sketch import QuantileSketch
+from core.data_ingest.quality import QualityAccumulator
+from core.feature_engine.feature_engine import add_institutional_features
+
+
+def _rank_error(sorted_values, value, q):
+    return abs(np.searchsorted(sorted_values, value) / len(sorted_values) - q)
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(9).lognormal(-9, 0.5, 400_000)
+
+
+class TestQuantileSketch:
+
+    def test_rank_error_and_bounded_size(self, values):
+        sketch = QuantileSketch()
+        for chunk in np.array_split(values, 97):
+            sketch.update(chunk)
+        srt = np.sort(values)
+        for q, v in zip((0.5, 0.95, 0.99), sketch.quantiles([0.5, 0.95, 0.99])):
+            assert _rank_error(srt, v, q) < 0.02
+        assert sum(len(level) for level in sketch.levels) < 2_000
+        assert sketch.n == len(values)
+        assert sketch.quantiles([0, 1]) == [srt[0], srt[-1]]
+
+    def test_merge_and_serialize(self, values):
+        parts = [QuantileSketch(seed=i).update(chunk) for i, chunk in enumerate(np.array_split(values, 4))]
+        # Round-trip through JSON as a worker would hand it over
+        merged = QuantileSketch.from_dict(json.loads(json.dumps(parts[0].to_dict())))
+        for part in parts[1:]:
+            merged.merge(QuantileSketch.from_dict(json.loads(json.dumps(part.to_dict()))))
+        srt = np.sort(values)
+        assert merged.n == len(values)
+        assert _rank_error(srt, merged.quantile(0.95), 0.95) < 0.02
+
+    def test_discrete_values_are_exact(self):
+        spreads = np.random.default_rng(2).integers(1, 20, 200_000) * 1e-5
+        sketch = QuantileSketch().update(spreads)
+        assert sketch.quantiles([0.5, 0.95]) == list(np.quantile(spreads, [0.5, 0.95]))
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            QuantileSketch(k=2)
+        with pytest.raises(ValueError):
+            QuantileSketch(k=100).merge(QuantileSketch(k=200))
+
+    def test_quality_accumulator_sketch_mode(self, values):
+        ts = np.arange(len(values), dtype=np.int64) * 1_000_000_000
+        bid = np.full(len(values), 1.1)
+        acc = QualityAccumulator(300, method="sketch")
+        for s in range(0, len(values), 50_000):
+            acc.update(ts[s:s + 50_000], bid[s:s + 50_000], bid[s:s + 50_000] + values[s:s + 50_000])
+        acc.update_bars("1m", pd.DataFrame({
+            "n_ticks": [60, 30], "spread_mean": [1e-4, 2e-4],
+            "t_open_ns": [0, 60_000_000_000], "t_close_ns": [59_000_000_000, 89_000_000_000],
+        }))
+        report = acc.report()
+        assert report["quantile_method"] == "sketch"
+        assert _rank_error(np.sort(values), report["spread_stats"]["p95"], 0.95) < 0.02
+        assert np.isclose(report["spread_stats"]["mean"], values.mean())
+        assert report["frame_stats"]["1m"]["n_bars"] == 2
+        assert set(report["frame_stats"]["1m"]["tick_rate"]) == {"p50", "p95", "p99"}
+        assert QuantileSketch.from_dict(report["sketches"]["spread"]).n == len(values)
+        with pytest.raises(ValueError):
+            QualityAccumulator(300, method="tdigest")
+
+    def test_liquidity_stress_from_sketch(self):
+        df = pd.DataFrame({"spread_mean": np.linspace(1e-5, 1e-4, 100)})
+        history = QuantileSketch().update(np.linspace(1e-5, 5e-5, 10_000))
+        out = add_institutional_features(df.copy(), {"spread_sketch": history.to_dict()})
+        # Threshold from the full history (p95 ~ 4.8e-5), not from the loaded slice
+        assert out["liquidity_stress"].sum() == (df["spread_mean"] > history.quantile(0.95)).sum()
+        assert out["liquidity_stress"].sum() > 40
+        fixed = add_institutional_features(df.copy(), {"liquidity_stress_threshold": 9e-5})
+        assert fixed["liquidity_stress"].sum() == (df["spread_mean"] > 9e-5).sum()
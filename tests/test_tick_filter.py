@@ -0,0 +1,142 @@
+"""
+Tests for the time zone, session calendar and outlier tick filters (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from core.data_ingest import data_ingest_streaming, data_ingest_v22
+from core.data_ingest.tick_filter import SessionCalendar, TickFilter, ZScoreFilter, localize_ns
+
+
+def _utc(*stamps):
+    return pd.to_datetime(list(stamps), utc=True, format="mixed").asi8
+
+
+@pytest.fixture
+def ticks():
+    """Thu 2025-03-06 to Wed 2025-03-12 (US DST starts Sun 03-09), one tick every 20 s, with spikes."""
+    rng = np.random.default_rng(5)
+    ts = pd.date_range("2025-03-06", "2025-03-12", freq="20s", tz="UTC")
+    mid = 1.08 + np.cumsum(rng.normal(0, 1e-5, len(ts)))
+    spikes = rng.choice(np.arange(2_000, len(ts)), 20, replace=False)
+    mid[spikes] += rng.choice([-1, 1], 20) * 0.01
+    return ts, mid - 5e-5, mid + 5e-5, np.sort(spikes)
+
+
+class TestSessionCalendar:
+
+    def test_weekend_follows_new_york_close(self):
+        cal = SessionCalendar()
+        # Winter: 17:00 New York = 22:00 UTC; summer (DST): 21:00 UTC
+        keep = cal.open_mask(_utc("2025-01-03 21:59:59", "2025-01-03 22:00", "2025-01-05 21:59:59",
+                                  "2025-01-05 22:00", "2025-07-04 20:59:59", "2025-07-04 21:00",
+                                  "2025-07-06 20:59:59", "2025-07-06 21:00"))
+        assert keep.tolist() == [True, False, False, True, True, False, False, True]
+
+    def test_holidays_and_unsorted_input(self):
+        cal = SessionCalendar(trim_weekend=False, holidays=["2025-12-25"])
+        ts = _utc("2025-12-25 12:00", "2025-12-24 21:59", "2025-12-24 22:00", "2025-12-25 22:00",
+                  "2025-12-27 12:00")
+        assert cal.open_mask(ts).tolist() == [False, True, False, True, True]
+        # Cached boundaries are extended for later batches
+        assert cal.open_mask(_utc("2026-12-25 12:00")).tolist() == [True]
+
+    def test_localize_ns(self):
+        local = pd.to_datetime(["2025-03-09 01:30", "2025-03-09 03:30", "2025-11-02 01:30",
+                                "2025-11-02 02:30", "2025-07-01 12:00"]).asi8
+        utc = localize_ns(local, "America/New_York")
+        assert (pd.to_datetime(utc, utc=True) == pd.to_datetime(
+            ["2025-03-09 06:30", "2025-03-09 07:30", "2025-11-02 05:30", "2025-11-02 07:30",
+             "2025-07-01 16:00"], utc=True)).all()
+        np.testing.assert_array_equal(localize_ns(local, "UTC"), local)
+
+
+class TestZScoreFilter:
+
+    def test_spikes_dropped(self, ticks):
+        ts, bid, ask, spikes = ticks
+        keep = ZScoreFilter(8.0).mask(bid, ask)
+        np.testing.assert_array_equal(np.flatnonzero(~keep), spikes)
+
+    def test_batches_and_state_match_single_pass(self, ticks):
+        ts, bid, ask, _ = ticks
+        full = TickFilter.from_config({"trim_weekend": True, "outlier_zscore": 8.0}).mask(ts.asi8, bid, ask)
+        first = TickFilter.from_config({"trim_weekend": True, "outlier_zscore": 8.0})
+        parts = [first.mask(ts.asi8[:10_000], bid[:10_000], ask[:10_000])]
+        state = json.loads(json.dumps(first.get_state()))
+        second = TickFilter.from_config({"trim_weekend": True, "outlier_zscore": 8.0}).set_state(state)
+        for s in range(10_000, len(ts), 7_777):
+            parts.append(second.mask(ts.asi8[s:s + 7_777], bid[s:s + 7_777], ask[s:s + 7_777]))
+        np.testing.assert_array_equal(np.concatenate(parts), full)
+        assert second.report()["outliers_dropped"] == 20
+        assert second.report()["calendar_dropped"] == (~SessionCalendar().open_mask(ts.asi8)).sum()
+
+    def test_level_shift_accepted(self):
+        mid = np.concatenate((1.1 + np.random.default_rng(1).normal(0, 1e-5, 2_000), np.full(50, 1.2)))
+        keep = ZScoreFilter(8.0, span=500, max_run=5).mask(mid, mid)
+        assert np.flatnonzero(~keep).tolist() == list(range(2_000, 2_005))
+
+    def test_disabled_and_invalid(self):
+        assert TickFilter.from_config({"trim_weekend": False, "outlier_zscore": None}) is None
+        with pytest.raises(ValueError):
+            ZScoreFilter(0.0)
+
+
+class TestIngestFilters:
+
+    @pytest.fixture
+    def csv_path(self, ticks, tmp_path):
+        ts, bid, ask, _ = ticks
+        path = tmp_path / "ticks.csv"
+        pd.DataFrame({"timestamp": ts.strftime("%Y-%m-%dT%H:%M:%S.%fZ"), "bid": bid, "ask": ask}) \
+            .to_csv(path, index=False)
+        return path
+
+    def test_v22_paths_agree(self, ticks, csv_path, tmp_path):
+        ts, bid, ask, _ = ticks
+        config = {"csv_path": str(csv_path), "trim_weekend": True, "outlier_zscore": 8.0,
+                  "bar_frames": [{"type": "time", "unit": "1m"}, {"type": "tick", "count": 100}],
+                  "slice_format": "csr"}
+        expected = TickFilter.from_config(config)
+        keep = expected.mask(ts.asi8, bid, ask)
+        results = {}
+        for streaming in (False, True):
+            out_dir = tmp_path / f"out_{streaming}"
+            data_ingest_v22.run({**config, "out_dir": str(out_dir), "streaming": streaming,
+                                 "memory_limit_mb": 1})
+            manifest = json.loads((out_dir / "manifest.json").read_text())
+            assert manifest["filters"] == expected.report()
+            raw = pd.read_parquet(out_dir / "raw_norm.parquet")
+            np.testing.assert_array_equal(raw["ts_ns"].to_numpy(), ts.asi8[keep])
+            results[streaming] = pd.read_parquet(out_dir / "bars_1m.parquet")
+        pd.testing.assert_frame_equal(results[False], results[True])
+        opens = pd.to_datetime(results[False]["t_open_ns"], utc=True)
+        assert not ((opens > "2025-03-07 22:00") & (opens < "2025-03-09 21:00")).any()
+
+    def test_time_zone_in(self, tmp_path):
+        path = tmp_path / "local.csv"
+        local = pd.date_range("2025-07-01 09:00", periods=600, freq="1s")
+        pd.DataFrame({"timestamp": local.strftime("%Y-%m-%d %H:%M:%S"), "bid": 1.1, "ask": 1.1001}) \
+            .to_csv(path, index=False)
+        data_ingest_v22.run({"csv_path": str(path), "out_dir": str(tmp_path / "out"), "export_slices": False,
+                             "time_zone_in": "Europe/Berlin", "bar_frames": [{"type": "time", "unit": "1m"}]})
+        bars = pd.read_parquet(tmp_path / "out" / "bars_1m.parquet")
+        assert pd.Timestamp(bars["t_open_ns"].iloc[0], tz="UTC") == pd.Timestamp("2025-07-01 07:00", tz="UTC")
+
+    def test_streaming_ingestor(self, ticks, tmp_path):
+        ts, bid, ask, _ = ticks
+        path = tmp_path / "ticks.csv"
+        pd.DataFrame({"symbol": "EURUSD", "timestamp": ts.strftime("%Y%m%d %H:%M:%S"), "bid": bid, "ask": ask}) \
+            .to_csv(path, index=False, header=False)
+        config = {"csv": {"path": str(path)}, "chunk_bytes": 65_536, "checkpoint_every_batches": 5,
+                  "trim_weekend": True, "outlier_zscore": 8.0}
+        manifest = data_ingest_streaming.run({**config, "out_dir": str(tmp_path / "out")})
+        expected = TickFilter.from_config(config)
+        keep = expected.mask(ts.asi8, bid, ask)
+        assert manifest["filters"] == expected.report()
+        slices = pq.read_table(tmp_path / "out" / "tick_slices_1000t").to_pandas().sort_values("tick_id")
+        np.testing.assert_array_equal(slices["timestamp"].to_numpy(), ts.asi8[keep])
@@ -0,0 +1,201 @@
+"""
+Tests for the consolidated CSR tick-slice store
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from core.data_ingest.tick_store import TickSliceStore, TickSliceStoreWriter
+from core.data_ingest.fixed_point import PriceCodec, price_scale
+from core.data_ingest.ipc_cache import read_table
+from core.data_ingest import data_ingest_v22 as di_v22
+from core.labeling import labeling_v22
+
+
+@pytest.fixture
+def bars_and_ticks():
+    rng = np.random.default_rng(3)
+    lengths = rng.integers(1, 60, 500)
+    n = int(lengths.sum())
+    ts = np.cumsum(rng.integers(1, 10**9, n)).astype(np.int64)
+    bid = 1.1 + rng.normal(0, 1e-4, n)
+    return lengths, ts, bid, bid + 1e-4
+
+
+class TestTickSliceStore:
+
+    def test_roundtrip_and_row_group_alignment(self, bars_and_ticks, tmp_path):
+        lengths, ts, bid, ask = bars_and_ticks
+        writer = TickSliceStoreWriter(tmp_path / "store", "1m", row_group_ticks=2000)
+        # Append in uneven chunks of whole bars
+        pos_b = pos_t = 0
+        for k in (7, 150, 1, 342):
+            n = int(lengths[pos_b:pos_b + k].sum())
+            writer.append(ts[pos_t:pos_t + n], bid[pos_t:pos_t + n], ask[pos_t:pos_t + n], lengths[pos_b:pos_b + k])
+            pos_b += k; pos_t += n
+        stats = writer.close()
+        assert stats["total_events"] == len(lengths)
+        assert stats["total_ticks"] == len(ts)
+
+        store = TickSliceStore(tmp_path / "store")
+        assert store.n_bars == len(lengths)
+        rg_bars = store.manifest["row_groups"]
+        assert len(rg_bars) > 1
+        meta = pq.ParquetFile(tmp_path / "store" / "ticks.parquet").metadata
+        for i, (b0, b1) in enumerate(rg_bars):
+            assert meta.row_group(i).num_rows == store.offsets[b1] - store.offsets[b0]
+
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        for bar in (0, 1, 137, 499):
+            t, b, a = store.ticks(bar)
+            np.testing.assert_array_equal(t, ts[bounds[bar]:bounds[bar + 1]])
+            np.testing.assert_array_equal(a, ask[bounds[bar]:bounds[bar + 1]])
+
+        offsets, t, b, a = store.read_bars(100, 300)
+        np.testing.assert_array_equal(t, ts[bounds[100]:bounds[300]])
+        np.testing.assert_array_equal(offsets, bounds[100:301] - bounds[100])
+
+        store.load()
+        offsets2, t2, _, _ = store.read_bars(100, 300)
+        np.testing.assert_array_equal(t2, t)
+        np.testing.assert_array_equal(offsets2, offsets)
+
+    def test_bar_extremes(self, bars_and_ticks, tmp_path):
+        lengths, ts, bid, ask = bars_and_ticks
+        lengths = lengths.copy()
+        lengths[[3, 4]] = 0
+        n = int(lengths.sum())
+        ts, bid, ask = ts[:n], bid[:n].copy(), ask[:n].copy()
+        ask[5] = np.nan
+        writer = TickSliceStoreWriter(tmp_path / "store", "1m", row_group_ticks=2000)
+        writer.append(ts, bid, ask, lengths)
+        writer.close()
+
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        expected_ask = np.array([np.nanmax(ask[s:e]) if e > s else -np.inf for s, e in zip(bounds[:-1], bounds[1:])])
+        expected_bid = np.array([bid[s:e].min() if e > s else np.inf for s, e in zip(bounds[:-1], bounds[1:])])
+        store = TickSliceStore(tmp_path / "store")
+        for _ in range(2):
+            ask_max, bid_min = store.bar_extremes()
+            np.testing.assert_array_equal(ask_max, expected_ask)
+            np.testing.assert_array_equal(bid_min, expected_bid)
+            # Stores without extremes.npy compute them from the ticks
+            (tmp_path / "store" / "extremes.npy").unlink(missing_ok=True)
+
+    def test_rejects_partial_bars(self, tmp_path):
+        writer = TickSliceStoreWriter(tmp_path / "store", "1m")
+        with pytest.raises(ValueError):
+            writer.append(np.arange(5), np.ones(5), np.ones(5), np.array([2, 2]))
+        writer.close()
+
+    def test_ingest_and_labeling_with_csr_slices(self, tmp_path):
+        n = 3000
+        rng = np.random.default_rng(11)
+        mid = 1.1 + np.cumsum(rng.normal(0, 5e-5, n))
+        pd.DataFrame({
+            "timestamp": pd.date_range("2025-01-01 09:00:00", periods=n, freq="1s", tz="UTC"),
+            "bid": mid - 5e-5, "ask": mid + 5e-5,
+        }).to_csv(tmp_path / "ticks.csv", index=False)
+
+        results = {}
+        for fmt in ("per_event", "csr"):
+            out = tmp_path / fmt
+            res = di_v22.run({
+                "csv_path": str(tmp_path / "ticks.csv"), "out_dir": str(out),
+                "symbol": "EURUSD", "slice_format": fmt,
+                "bar_frames": [{"type": "time", "unit": "1m"}],
+            })
+            slice_dir = out / res["frames"]["1m"]["tick_slices"]["slice_directory"]
+            assert TickSliceStore.is_store(slice_dir) == (fmt == "csr")
+            lab = labeling_v22.run({
+                "bars_path": str(out / "bars_1m.parquet"), "out_dir": str(out / "labeling"),
+                "tick_slices_dir": str(slice_dir), "events": [{"index": i} for i in range(0, 45, 3)],
+                "tp_vol_multiple": 0.5, "sl_vol_multiple": 0.5, "side": 1,
+            })
+            results[fmt] = pd.read_parquet(lab["results_path"])
+
+        assert not list((tmp_path / "csr" / "tick_slices_1m").glob("ticks_event_*.parquet"))
+        with open(tmp_path / "csr" / "manifest.json") as f:
+            assert json.load(f)["slice_format"] == "csr"
+        pd.testing.assert_frame_equal(results["per_event"], results["csr"])
+
+    def test_fixed_point_store(self, bars_and_ticks, tmp_path):
+        lengths, ts, bid, ask = bars_and_ticks
+        bid, ask = np.round(bid, 5), np.round(ask, 5)
+        for name, codec in (("float", None), ("fixed", PriceCodec.for_pip_size(0.0001))):
+            writer = TickSliceStoreWriter(tmp_path / name, "1m", row_group_ticks=2000, codec=codec)
+            writer.append(ts, bid, ask, lengths)
+            writer.close()
+
+        store = TickSliceStore(tmp_path / "fixed")
+        assert store.codec.scale == 100_000 and store.manifest["price_encoding"] == "fixed"
+        offsets, t, b, a = store.read_bars(10, 400)
+        _, t_ref, b_ref, a_ref = TickSliceStore(tmp_path / "float").read_bars(10, 400)
+        np.testing.assert_array_equal(t, t_ref)
+        np.testing.assert_array_equal(b, b_ref)
+        np.testing.assert_array_equal(a, a_ref)
+        _, _, b_pts, a_pts = store.load().read_bars(10, 400, points=True)
+        assert b_pts.dtype == np.int32
+        np.testing.assert_array_equal(a_pts - b_pts, 10)
+        np.testing.assert_array_equal(store.ticks(5)[1], TickSliceStore(tmp_path / "float").ticks(5)[1])
+        with pytest.raises(ValueError):
+            TickSliceStore(tmp_path / "float").read_bars(0, 1, points=True)
+
+        meta = pq.ParquetFile(tmp_path / "fixed" / "ticks.parquet").metadata
+        assert "DELTA_BINARY_PACKED" in meta.row_group(0).column(0).encodings
+        size = {name: (tmp_path / name / "ticks.parquet").stat().st_size for name in ("float", "fixed")}
+        assert size["fixed"] < size["float"]
+
+    def test_price_codec(self):
+        assert price_scale(0.0001) == 100_000 and price_scale(0.01) == 1_000
+        codec = PriceCodec(100_000)
+        prices = np.array([1.10005, 1.1, 1.23456, 0.99999])
+        points = codec.encode(prices)
+        assert codec.base == 110_005 and points.dtype == np.int32
+        np.testing.assert_array_equal(codec.decode(points), prices)
+        assert codec.at_least(1.100051) == 1 and codec.at_most(1.100051) == 0
+        assert codec.at_least(1.10006) == codec.at_most(1.10006) == 1
+        with pytest.raises(ValueError):
+            codec.encode(np.array([1.100051]))
+        assert PriceCodec.from_metadata(codec.metadata()).base == codec.base
+
+    @pytest.mark.parametrize("streaming", [False, True])
+    def test_fixed_point_ingest_and_labeling(self, tmp_path, streaming):
+        n = 3000
+        rng = np.random.default_rng(11)
+        mid = np.round(1.1 + np.cumsum(rng.normal(0, 5e-5, n)), 5)
+        pd.DataFrame({
+            "timestamp": pd.date_range("2025-01-01 09:00:00", periods=n, freq="1s", tz="UTC"),
+            "bid": mid - 5e-5, "ask": mid + 5e-5,
+        }).to_csv(tmp_path / "ticks.csv", index=False)
+
+        results, raw = {}, {}
+        for enc in ("float64", "fixed"):
+            out = tmp_path / enc
+            res = di_v22.run({
+                "csv_path": str(tmp_path / "ticks.csv"), "out_dir": str(out), "symbol": "EURUSD",
+                "slice_format": "csr", "price_encoding": enc, "streaming": streaming, "ipc_cache": True,
+                "bar_frames": [{"type": "time", "unit": "1m"}],
+            })
+            slice_dir = out / res["frames"]["1m"]["tick_slices"]["slice_directory"]
+            lab = labeling_v22.run({
+                "bars_path": str(out / "bars_1m.parquet"), "out_dir": str(out / "labeling"),
+                "tick_slices_dir": str(slice_dir), "events": [{"index": i} for i in range(0, 45, 3)],
+                "tp_vol_multiple": 0.1, "sl_vol_multiple": 0.1, "side": 1,
+            })
+            results[enc] = pd.read_parquet(lab["results_path"])
+            raw[enc] = read_table(out / "raw_norm.parquet")
+
+        assert (results["fixed"]["hit_type"] != 0).sum() > 10
+        pd.testing.assert_frame_equal(results["float64"], results["fixed"])
+        pd.testing.assert_frame_equal(raw["float64"], raw["fixed"], check_dtype=False)
+        assert pq.read_schema(tmp_path / "fixed" / "raw_norm.parquet").field("bid").type == "int32"
+        with open(tmp_path / "fixed" / "manifest.json") as f:
+            manifest = json.load(f)
+        assert manifest["price_encoding"] == "fixed" and manifest["price_scale"] == 100_000
+        with pytest.raises(ValueError):
+            di_v22.run({"csv_path": str(tmp_path / "ticks.csv"), "out_dir": str(tmp_path / "bad"),
+                        "price_encoding": "fixed"})
@@ -0,0 +1,106 @@
+"""
+Tests for timestamp format detection and parsing (Module 1)
+"""
+
+import json
+import pytest
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from core.data_ingest import data_ingest_streaming, data_ingest_v22
+from core.data_ingest.sample_loader import sample_loader
+from core.data_ingest.timestamps import COMPACT, TimestampParser, detect_format, parse_timestamps
+
+
+@pytest.fixture
+def times():
+    rng = np.random.default_rng(5)
+    ns = pd.Timestamp("2024-02-27", tz="UTC").value + np.cumsum(rng.integers(1, 90_000, 5_000)) * 1_000_000
+    return pd.DatetimeIndex(ns.astype("datetime64[ns]"), tz="UTC")
+
+
+class TestTimestampParsing:
+
+    @pytest.mark.parametrize("fmt, render", [
+        ("iso8601", lambda t: t.strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
+        ("iso8601", lambda t: t.strftime("%Y-%m-%d %H:%M:%S+00:00")),
+        ("iso8601_naive", lambda t: t.strftime("%Y-%m-%d %H:%M:%S.%f")),
+        (COMPACT, lambda t: t.strftime("%Y%m%d %H:%M:%S.%f").str[:-3]),
+        (COMPACT, lambda t: t.strftime("%Y%m%d %H:%M:%S")),
+        ("epoch_ms", lambda t: t.asi8 // 1_000_000),
+        ("epoch_ns", lambda t: t.asi8.astype(str)),
+        ("datetime", lambda t: t),
+    ])
+    def test_detect_and_match_pandas(self, times, fmt, render):
+        values = pd.Series(render(times))
+        assert detect_format(values) == fmt
+        unit = "ms" if fmt == "epoch_ms" else None
+        expected = pd.to_datetime(values.astype("int64") if fmt == "epoch_ns" else values, utc=True, unit=unit)
+        got = parse_timestamps(values)
+        np.testing.assert_array_equal(got, expected.astype("int64").to_numpy())
+        # Arrow input takes the same path
+        np.testing.assert_array_equal(parse_timestamps(pa.array(values), fmt), got)
+
+    def test_compact_variable_width_and_calendar(self):
+        values = pd.Series(["20240229 23:59:59.5", "20240301 00:00:00", " 20240301 00:00:00.123456789"])
+        got = parse_timestamps(values)
+        assert list(got) == [pd.Timestamp("2024-02-29 23:59:59.5", tz="UTC").value,
+                             pd.Timestamp("2024-03-01", tz="UTC").value,
+                             pd.Timestamp("2024-03-01 00:00:00.123456789", tz="UTC").value]
+        with pytest.raises(ValueError, match="TIMEZONE_ERROR"):
+            parse_timestamps(pd.Series(["20230229 23:59:59.500", "20230301 00:00:00.100"]))
+
+    def test_mixed_fraction_iso(self):
+        values = pd.Series(["2025-01-02 09:00:00", "2025-01-02 09:00:00.250", "2025-01-02T09:00:01Z"])
+        got = parse_timestamps(values)
+        assert np.diff(got).tolist() == [250_000_000, 750_000_000]
+
+    def test_parser_keeps_format_across_chunks(self, times):
+        parser = TimestampParser()
+        assert len(parser(pd.Series([], dtype=object))) == 0 and parser.format is None
+        ms = pd.Series(times.asi8 // 1_000_000)
+        parser(ms[:10])
+        assert parser.format == "epoch_ms"
+        # A later chunk that would look like seconds on its own stays in ms
+        np.testing.assert_array_equal(parser(pd.Series([86_400_000])), [86_400_000_000_000])
+        with pytest.raises(ValueError):
+            TimestampParser("%d.%m.%Y")
+
+    def test_invalid_values_raise(self):
+        with pytest.raises(ValueError, match="TIMEZONE_ERROR"):
+            parse_timestamps(pd.Series(["2025-01-02T09:00:00Z", "not a time"]))
+        with pytest.raises(ValueError, match="TIMEZONE_ERROR"):
+            parse_timestamps(pd.Series(["2025-01-02T09:00:00Z", None]))
+
+
+class TestTimestampIntegration:
+
+    def test_v22_manifest_records_format(self, times, tmp_path):
+        csv_path = tmp_path / "ticks.csv"
+        pd.DataFrame({"timestamp": times.strftime("%Y%m%d %H:%M:%S.%f"), "bid": 1.1, "ask": 1.1001}) \
+            .to_csv(csv_path, index=False)
+        result = data_ingest_v22.run({"csv_path": str(csv_path), "out_dir": str(tmp_path / "out"),
+                                      "bar_frames": [{"type": "time", "unit": "1m"}], "export_slices": False})
+        manifest = json.loads(open(result["manifest"]).read())
+        assert manifest["input"]["timestamp_format"] == COMPACT
+        raw = pd.read_parquet(tmp_path / "out" / "raw_norm.parquet")
+        np.testing.assert_array_equal(raw["ts_ns"].to_numpy(), times.asi8)
+
+    def test_streaming_parses_fractional_seconds(self, times, tmp_path):
+        csv_path = tmp_path / "ticks.csv"
+        pd.DataFrame({"symbol": "EURUSD", "timestamp": times.strftime("%Y%m%d %H:%M:%S.%f").str[:-3],
+                      "bid": 1.1, "ask": 1.1001}).to_csv(csv_path, index=False, header=False)
+        manifest = data_ingest_streaming.run({"csv": {"path": str(csv_path)}, "out_dir": str(tmp_path / "out"),
+                                              "chunk_bytes": 16_384})
+        assert manifest["input"]["timestamp_format"] == COMPACT
+        slices = pd.read_parquet(manifest["outputs"]["tick_slices_1000t"]["path"]).sort_values("tick_id")
+        np.testing.assert_array_equal(slices["timestamp"].to_numpy(), times.asi8)
+
+    def test_sample_loader_reports_format(self, times, tmp_path):
+        csv_path = tmp_path / "sample.csv"
+        pd.DataFrame({"timestamp": times.strftime("%Y-%m-%dT%H:%M:%S.%fZ"), "bid": 1.1, "ask": 1.1001}) \
+            .to_csv(csv_path, index=False)
+        validation = sample_loader.load_sample(str(csv_path))["validation"]
+        assert validation["timestamp_format"] == "iso8601"
+        assert validation["timestamp_valid"] and validation["timezone_info"] == "UTC (Z)"